@@ -0,0 +1,50 @@
+"""
+importer 基准: 流式导入 Lean 打印的声明文件, 报告每秒导入的声明数和峰值内存.
+
+--copies N 把文件内容重复 N 次 (逐行生成, 不在内存中拼接), 峰值内存应当与 N 无关.
+
+python benchmarks/bench_import.py query_const.lean SimpLemmas.lean [--copies 10] [--tracemalloc]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lean4_lambda_calculator.importer import read_lean
+
+
+def lines(path: str, copies: int):
+    for _ in range(copies):
+        with open(path, "r") as f:
+            yield from f
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importer throughput benchmark")
+    parser.add_argument("paths", type=str, nargs="+")
+    parser.add_argument("--copies", type=int, default=1)
+    parser.add_argument("--tracemalloc", action="store_true", help="Report peak memory (slower)")
+    args = parser.parse_args()
+
+    print(f"{'file':<20} {'decls':>8} {'errors':>7} {'seconds':>9} {'decls/s':>10} {'peak KiB':>9}")
+    for path in args.paths:
+        if args.tracemalloc:
+            tracemalloc.start()
+        count = errors = 0
+        start = time.perf_counter()
+        for _, item in read_lean(lines(path, args.copies)):
+            count += 1
+            errors += isinstance(item, str)
+        elapsed = time.perf_counter() - start
+        peak = "-"
+        if args.tracemalloc:
+            peak = f"{tracemalloc.get_traced_memory()[1] / 1024:.0f}"
+            tracemalloc.stop()
+        print(f"{os.path.basename(path):<20} {count:>8} {errors:>7} {elapsed:>9.3f} {count / elapsed:>10.0f} {peak:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Universe level 基准: 对 SimpLemmas.lean 中出现的每个 Sort, 比较原生 level 引擎与旧的 sympy 实现.
+
+python benchmarks/bench_level.py [--file SimpLemmas.lean] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lean4_lambda_calculator.level import Level, SuccLevel, MaxLevel, IMaxLevel
+
+
+def _tokenize(code: str) -> list[str]:
+    return re.findall(r"[()+]|[A-Za-z0-9_.']+", code)
+
+
+def _parse_lean_level(tokens: list[str]) -> tuple:
+    # Lean 的 level 语法: u | 0 | (a + 1) | (max a b) | (imax a b)
+    token = tokens.pop(0)
+    if token == "(":
+        if tokens[0] in ("max", "imax"):
+            op = tokens.pop(0)
+            left = _parse_lean_level(tokens)
+            right = _parse_lean_level(tokens)
+            node = (op, left, right)
+        else:
+            node = _parse_lean_level(tokens)
+            while tokens[0] == "+":
+                tokens.pop(0)
+                node = ("succ", node, int(tokens.pop(0)))
+        assert tokens.pop(0) == ")"
+        return node
+    if token.isdigit():
+        return ("const", int(token))
+    return ("param", token)
+
+
+def collect_sorts(path: str) -> list[tuple]:
+    with open(path, "r") as f:
+        code = f.read()
+    sorts = []
+    for match in re.finditer(r"\bSort\s+(\([^:=]*?\)(?=\s*(?:->|\)|\}|:=|$))|[A-Za-z0-9_']+)|\bType\b|\bProp\b", code):
+        text = match.group(0)
+        if text == "Type":
+            sorts.append(("const", 1))
+        elif text == "Prop":
+            sorts.append(("const", 0))
+        else:
+            sorts.append(_parse_lean_level(_tokenize(match.group(1))))
+    return sorts
+
+
+def build_native(node: tuple) -> Level:
+    kind = node[0]
+    if kind == "const":
+        return Level(node[1])
+    if kind == "param":
+        return Level(node[1])
+    if kind == "succ":
+        level = build_native(node[1])
+        for _ in range(node[2]):
+            level = SuccLevel(level)
+        return level
+    left, right = build_native(node[1]), build_native(node[2])
+    return MaxLevel(left, right) if kind == "max" else IMaxLevel(left, right)
+
+
+def build_sympy(node: tuple, sympy):
+    # 旧实现: level 是 sympy 表达式, 每次构造都调用 simplify
+    kind = node[0]
+    if kind == "const":
+        return sympy.Integer(node[1])
+    if kind == "param":
+        return sympy.symbols(node[1], integer=True, nonnegative=True)
+    if kind == "succ":
+        return sympy.simplify(build_sympy(node[1], sympy) + node[2])
+    left, right = build_sympy(node[1], sympy), build_sympy(node[2], sympy)
+    if kind == "max":
+        return sympy.simplify(sympy.Max(left, right))
+    return sympy.simplify(sympy.Piecewise((0, sympy.Eq(right, 0)), (sympy.Max(left, right), True)))
+
+
+def run_native(sorts: list[tuple]) -> int:
+    hits = 0
+    for node in sorts:
+        level = build_native(node)
+        # DefEq 路径上的比较: 与自身, 以及与它的后继
+        hits += level == build_native(node)
+        hits += level == SuccLevel(level)
+    return hits
+
+
+def run_sympy(sorts: list[tuple], sympy) -> int:
+    hits = 0
+    for node in sorts:
+        level = build_sympy(node, sympy)
+        hits += bool(sympy.satisfiable(sympy.Eq(level, build_sympy(node, sympy))))
+        hits += bool(sympy.satisfiable(sympy.Eq(level, sympy.simplify(level + 1))))
+    return hits
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Universe level benchmark")
+    parser.add_argument("--file", type=str, default="./SimpLemmas.lean", help="Lean file to collect Sorts from")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions, the best time is reported")
+    args = parser.parse_args()
+
+    sorts = collect_sorts(args.file)
+    print(f"Sorts in {args.file}: {len(sorts)}")
+    native_time = timed(lambda: run_native(sorts), args.repeat)
+    print(f"  native  {native_time * 1000:10.2f} ms  ({native_time / len(sorts) * 1e6:.1f} us/Sort)")
+    try:
+        import sympy
+    except ImportError:
+        print("  sympy is not installed, skipping the reference implementation")
+        return
+    sympy_time = timed(lambda: run_sympy(sorts, sympy), args.repeat)
+    print(f"  sympy   {sympy_time * 1000:10.2f} ms  ({sympy_time / len(sorts) * 1e6:.1f} us/Sort)")
+    print(f"  speedup {sympy_time / native_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+内存基准: 统计每种 Expr 节点的字节数, 以及把定理库加载进 Shell.type_pool 后的峰值内存.
+
+python benchmarks/bench_memory.py --history history.txt [--limit 100] [--tracemalloc]
+"""
+import argparse
+import contextlib
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lean4_lambda_calculator.expr import Expr, Sort, Const, BoundVar, Arg, Forall, Lambda, App, ARG, FORALL, LAMBDA, APP
+
+
+def node_size(node: object) -> int:
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def sample_nodes() -> dict[str, Expr]:
+    nat = Const("Nat")
+    return {
+        "Sort": Sort(0),
+        "Const": nat,
+        "BoundVar": BoundVar(0),
+        "Arg": Arg(nat, "n"),
+        "Forall": Forall(nat, nat),
+        "Lambda": Lambda(nat, BoundVar(0)),
+        "App": App(nat, BoundVar(0)),
+    }
+
+
+def collect_nodes(exprs) -> tuple[set[int], int]:
+    # 按对象 id 统计共享后的节点数, 同时统计展开成树时的节点数
+    seen: dict[int, Expr] = {}
+    tree_size = 0
+    stack = list(exprs)
+    while stack:
+        expr = stack.pop()
+        tree_size += 1
+        seen[id(expr)] = expr
+        if expr.tag == ARG:
+            stack.append(expr.type)
+        elif expr.tag in (FORALL, LAMBDA):
+            stack.append(expr.var_type)
+            stack.append(expr.body)
+        elif expr.tag == APP:
+            stack.append(expr.func)
+            stack.append(expr.arg)
+    return seen, tree_size
+
+
+def load_corpus(history: str, limit: int | None):
+    from lean4_lambda_calculator.shell import Shell
+
+    with open(history, "r") as f:
+        lines = f.readlines()
+    if limit is not None:
+        lines = lines[:limit]
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "history.txt")
+        with open(path, "w") as f:
+            f.writelines(lines)
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                shell = Shell(history_file=path)
+        finally:
+            os.chdir(cwd)
+    return shell, len(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expr memory benchmark")
+    parser.add_argument("--history", type=str, default="./history.txt", help="Path to the declaration file")
+    parser.add_argument("--limit", type=int, default=None, help="Only load the first N lines")
+    parser.add_argument("--tracemalloc", action="store_true", help="Trace Python allocations (slow)")
+    args = parser.parse_args()
+
+    print("Bytes per node:")
+    for name, node in sample_nodes().items():
+        print(f"  {name:<8} {node_size(node):>4} B")
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    shell, num_lines = load_corpus(args.history, args.limit)
+    duration = time.perf_counter() - start
+    exprs = list(shell.type_pool.values()) + list(shell.def_pool.values())
+    nodes, tree_size = collect_nodes(exprs)
+    total_bytes = sum(node_size(node) for node in nodes.values())
+
+    print(f"Corpus: {args.history} ({num_lines} lines, {len(shell.type_pool)} constants) loaded in {duration:.2f} s")
+    print(f"  Unique nodes     {len(nodes)}")
+    print(f"  Tree nodes       {tree_size}")
+    print(f"  Node bytes       {total_bytes} B ({total_bytes / max(len(nodes), 1):.1f} B/node)")
+    if args.tracemalloc:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  Peak traced      {peak / 1024 / 1024:.1f} MiB")
+    # Linux 上 ru_maxrss 的单位是 KiB
+    print(f"  Peak RSS         {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+beta 化简基准: 比较代入式化简 (calc 的默认路径) 与环境机 (machine.py).
+
+测试项是深度为 n 的 beta-redex 链 (x1 : A => (x2 : A => ... (xn : A => f xn (f ... x1)) a ...) a) a,
+代入式化简对每一层都复制一次函数体, 耗时随 n 平方增长; 环境机只在环境中绑定闭包.
+
+第二组测试展开定义 dup := (x : A) => f x x 构成的 dup (dup (... a)), 参数在展开后被使用两次:
+按名调用 (call-by-name) 的环境机耗时随 n 指数增长, 按需调用 (call-by-need) 共享参数, 耗时线性增长.
+
+python benchmarks/bench_normalize.py [--sizes 50 100 200 400] [--share-sizes 8 12 16 200] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.setrecursionlimit(1000000)
+
+from lean4_lambda_calculator import calculator
+from lean4_lambda_calculator.calculator import calc
+from lean4_lambda_calculator.cache import VersionedPool
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, Lambda, App, BoundVar
+from lean4_lambda_calculator.machine import normalize
+
+A = Const("A")
+
+
+def make_pools():
+    type_pool = VersionedPool({
+        "A": Sort(1),
+        "a": A,
+        "f": Forall(Arg(A), Forall(Arg(A), A)),
+    })
+    return type_pool, VersionedPool()
+
+
+def redex_chain(n: int):
+    # 最内层: f #0 (f #1 (... #(n-1))), 引用所有的绑定变量
+    body = BoundVar(n - 1)
+    for index in range(n - 2, -1, -1):
+        body = App(App(Const("f"), BoundVar(index)), body)
+    for _ in range(n):
+        body = App(Lambda(Arg(A), body), Const("a"))
+    return body
+
+
+def dup_tower(n: int):
+    expr = Const("a")
+    for _ in range(n):
+        expr = App(Const("dup"), expr)
+    return expr
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        calculator.calc_cache.clear()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalizer benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400], help="Depths of the redex chain")
+    parser.add_argument("--share-sizes", type=int, nargs="+", default=[8, 12, 16, 200], help="Depths of the dup tower")
+    parser.add_argument("--max-by-name", type=int, default=16, help="Largest dup tower normalized by name")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of repetitions, the best time is reported")
+    args = parser.parse_args()
+
+    type_pool, def_pool = make_pools()
+    print(f"{'n':>6} {'calc/subst ms':>14} {'calc/machine ms':>16} {'normalize ms':>13}")
+    for n in args.sizes:
+        expr = redex_chain(n)
+        results = []
+        for normalizer in ("subst", "machine"):
+            calculator.NORMALIZER = normalizer
+            results.append(calc(expr, None, type_pool, def_pool)[0])
+            results.append(timed(lambda: calc(expr, None, type_pool, def_pool), args.repeat))
+        calculator.NORMALIZER = "subst"
+        assert results[0] is results[2] is normalize(expr)
+        normalize_time = timed(lambda: normalize(expr), args.repeat)
+        print(f"{n:>6} {results[1] * 1000:>14.2f} {results[3] * 1000:>16.2f} {normalize_time * 1000:>13.2f}")
+
+    dup_pool = {"dup": Lambda(Arg(A), App(App(Const("f"), BoundVar(0)), BoundVar(0)))}
+    print()
+    print(f"{'n':>6} {'by-name ms':>14} {'by-need ms':>16}")
+    for n in args.share_sizes:
+        expr = dup_tower(n)
+        need_time = timed(lambda: normalize(expr, dup_pool, sharing=True), args.repeat)
+        if n <= args.max_by_name:
+            assert normalize(expr, dup_pool) is normalize(expr, dup_pool, sharing=True)
+            name_time = f"{timed(lambda: normalize(expr, dup_pool), args.repeat) * 1000:>14.2f}"
+        else:
+            name_time = f"{'-':>14}"
+        print(f"{n:>6} {name_time} {need_time * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+解析器基准: lark 路径 (解析树, ExprTransformer, const_to_boundvar, set_boundvar_name) 与手写的 Pratt 解析器.
+
+- history: history.txt 中的所有行
+- telescope: (x0 : A) -> ... -> (x{n-1} : A) -> f x0 x{n-1}, 很长的 Forall 链
+
+python benchmarks/bench_parser.py [--history history.txt] [--sizes 100 1000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lean4_lambda_calculator.parser import Parser
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser benchmark")
+    parser.add_argument("--history", type=str, default=os.path.join(os.path.dirname(__file__), "..", "history.txt"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.history) as f:
+        lines = [line.strip() for line in f if line.strip() and line.strip() != ".giveup"]
+    cases = [("history", lines)]
+    for n in args.sizes:
+        cases.append((f"telescope {n}", [" -> ".join(f"(x{i} : A)" for i in range(n)) + f" -> f x0 x{n - 1}"]))
+
+    parsers = {backend: Parser(backend) for backend in ("lark", "pratt")}
+    print(f"{'input':<16} {'lark ms':>10} {'pratt ms':>10}")
+    for name, codes in cases:
+        times = [timed(lambda: [parsers[backend].parse(code) for code in codes], args.repeat) * 1000 for backend in ("lark", "pratt")]
+        print(f"{name:<16} {times[0]:>10.2f} {times[1]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+并行解析基准: 在不同的进程数下解析声明文件, 报告时间, 每秒单元数和相对单进程的加速比.
+
+--copies N 把文件重复 N 次写入临时文件, 模拟几兆字节的声明导出.
+
+python benchmarks/bench_pipeline.py query_const.lean [--copies 20] [--jobs 1 2 4 8] [--chunksize 64]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lean4_lambda_calculator.pipeline import parse_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parsing benchmark")
+    parser.add_argument("path", type=str)
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunksize", type=int, default=64)
+    args = parser.parse_args()
+
+    suffix = os.path.splitext(args.path)[1]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input" + suffix)
+        with open(path, "w") as out:
+            for _ in range(args.copies):
+                with open(args.path) as f:
+                    shutil.copyfileobj(f, out)
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"{args.path} x {args.copies}: {size:.1f} MiB, {os.cpu_count()} CPUs")
+        print(f"{'jobs':>5} {'units':>8} {'seconds':>9} {'units/s':>10} {'speedup':>8}")
+        base = None
+        for jobs in sorted(set(args.jobs)):
+            start = time.perf_counter()
+            results = parse_file(path, jobs, args.chunksize)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{jobs:>5} {len(results):>8} {elapsed:>9.2f} {len(results) / elapsed:>10.0f} {base / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
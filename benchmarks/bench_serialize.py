@@ -0,0 +1,54 @@
+"""
+快照基准: 检查声明文件得到 type_pool / def_pool, 比较三种恢复环境的方式:
+
+- parse: 重新解析源码 (不包括检查)
+- pickle: pickle 保存的 dict
+- binary: serialize.save_pools 保存的二进制快照
+
+python benchmarks/bench_serialize.py history.txt query_const.lean [--repeat 5]
+"""
+import argparse
+import io
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.setrecursionlimit(100000)
+
+from lean4_lambda_calculator.batch import check_file
+from lean4_lambda_calculator.pipeline import parse_file
+from lean4_lambda_calculator.serialize import save_pools, load_pools
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot format benchmark")
+    parser.add_argument("paths", type=str, nargs="+")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'file':<20} {'consts':>7} {'parse ms':>9} {'pickle ms':>10} {'pickle KiB':>11} {'binary ms':>10} {'binary KiB':>11}")
+    for path in args.paths:
+        _, type_pool, def_pool = check_file(path, jobs=1)
+        pickled = pickle.dumps((dict(type_pool), dict(def_pool)), protocol=pickle.HIGHEST_PROTOCOL)
+        stream = io.BytesIO()
+        save_pools(stream, type_pool, def_pool)
+        binary = stream.getvalue()
+        parse_time = timed(lambda: parse_file(path, jobs=1), args.repeat)
+        pickle_time = timed(lambda: pickle.loads(pickled), args.repeat)
+        binary_time = timed(lambda: load_pools(io.BytesIO(binary)), args.repeat)
+        print(f"{os.path.basename(path):<20} {len(type_pool):>7} {parse_time * 1000:>9.1f} {pickle_time * 1000:>10.1f} {len(pickled) / 1024:>11.1f} {binary_time * 1000:>10.1f} {len(binary) / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
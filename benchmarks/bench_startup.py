@@ -0,0 +1,68 @@
+"""
+冷启动基准: 在新的 Python 进程中测量 import parser 和构造 Parser 的时间.
+
+- table: 从随包发布的 grammar_table.py 加载分析表 (默认)
+- no cache: 不使用分析表, LEAN4_PARSER_CACHE 为空, 每次编译 LALR 分析表
+- cold cache: 不使用分析表, 缓存文件不存在, 编译并写入缓存
+- warm cache: 不使用分析表, 从缓存文件加载
+- pratt: 手写的解析器, 不构造 lark 分析器
+
+python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+from lean4_lambda_calculator import parser as parser_module
+from lean4_lambda_calculator.parser import Parser
+imported = time.perf_counter()
+if sys.argv[2] == "compile":
+    parser_module._load_table = lambda: None
+parser = Parser(sys.argv[1])
+constructed = time.perf_counter()
+parser.parse("def Iff.intro : (a:Prop)->(b:Prop)->(a->b)->(b->a)->Iff a b")
+parsed = time.perf_counter()
+print(imported - start, constructed - imported, parsed - constructed)
+"""
+
+
+def measure(cache_path: str, backend: str = "lark", table: str = "compile") -> tuple[float, float, float]:
+    env = dict(os.environ, LEAN4_PARSER_CACHE=cache_path, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, "-c", SCRIPT, backend, table], env=env, capture_output=True, text=True, check=True).stdout
+    return tuple(float(value) for value in output.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser cold start benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'import ms':>10} {'Parser() ms':>12} {'first parse ms':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "grammar.lark.cache")
+
+        def cold() -> str:
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            return cache_path
+
+        modes = [
+            ("table", lambda: "", "lark", "table"), ("no cache", lambda: "", "lark", "compile"), ("cold cache", cold, "lark", "compile"),
+            ("warm cache", lambda: cache_path, "lark", "compile"), ("pratt", lambda: "", "pratt", "table"),
+        ]
+        for name, prepare, backend, table in modes:
+            samples = [measure(prepare(), backend, table) for _ in range(args.repeat)]
+            best = [min(sample[i] for sample in samples) * 1000 for i in range(3)]
+            print(f"{name:<12} {best[0]:>10.2f} {best[1]:>12.2f} {best[2]:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
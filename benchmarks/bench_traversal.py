@@ -0,0 +1,127 @@
+"""
+深层项上的遍历基准: 所有遍历都使用显式栈 (traversal.py), 不需要调高 sys.setrecursionlimit.
+
+测试项 (深度为 n):
+- telescope: (x0 : A) -> (x1 : A) -> ... -> f #0 #(n-1), 很深的 Forall 链
+- spine: g a a ... a, 很长的应用链, g 的类型是 n 层的 A -> A -> ... -> A
+- nest: (x0 : A) => ... => f #0 #n, 含一个自由变量的 Lambda 链, 用于 shift/instantiate
+- dag: t(k+1) = f t(k) t(k), t(0) = #0, DAG 中只有 n 层, 展开成树后有 2^n 个叶子
+
+python benchmarks/bench_traversal.py [--sizes 1000 10000 50000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lean4_lambda_calculator import calculator
+from lean4_lambda_calculator.calculator import calc, infer_type, shift_expr, instantiate_expr
+from lean4_lambda_calculator.cache import VersionedPool
+from lean4_lambda_calculator.traversal import dag_size, tree_size
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, Lambda, App, BoundVar, print_expr_by_name, print_expr_by_index, expr_clean_all_names, expr_todef, const_to_boundvar, _get_used_args
+
+A = Const("A")
+f = Const("f")
+
+
+def telescope(n: int):
+    body = App(App(f, BoundVar(0)), BoundVar(n - 1))
+    for index in range(n - 1, -1, -1):
+        body = Forall(Arg(A, f"x{index}"), body)
+    return body
+
+
+def spine(n: int):
+    expr = Const("g")
+    for _ in range(n):
+        expr = App(expr, Const("a"))
+    return expr
+
+
+def nest(n: int):
+    body = App(App(f, BoundVar(0)), BoundVar(n))
+    for index in range(n - 1, -1, -1):
+        body = Lambda(Arg(A, f"x{index}"), body)
+    return body
+
+
+def dag(n: int):
+    expr = BoundVar(0)
+    for _ in range(n):
+        expr = App(App(f, expr), expr)
+    return expr
+
+
+def named_consts(n: int):
+    # 解析器的输出形式: 绑定变量以同名常量的形式出现
+    body = App(App(f, Const("x0")), Const(f"x{n - 1}"))
+    for index in range(n - 1, -1, -1):
+        body = Forall(Arg(A, f"x{index}"), body)
+    return body
+
+
+def make_pools(n: int):
+    g_type = A
+    for _ in range(n):
+        g_type = Forall(Arg(A), g_type)
+    type_pool = VersionedPool({
+        "A": Sort(1),
+        "a": A,
+        "f": Forall(Arg(A), Forall(Arg(A), Sort(0))),
+        "g": g_type,
+    })
+    def_pool = VersionedPool({"a": Const("A")})
+    return type_pool, def_pool
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        calculator.calc_cache.clear()
+        calculator.infer_cache.clear()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traversal benchmark on deep terms")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"recursion limit {sys.getrecursionlimit()}")
+    print(f"{'n':>7} {'walker':<22} {'ms':>10}")
+    for n in args.sizes:
+        type_pool, def_pool = make_pools(n)
+        tele, app, lam, named = telescope(n), spine(n), nest(n), named_consts(n)
+        renamed = expr_clean_all_names(tele)
+        shared = dag(n)
+        closed = instantiate_expr(shared, [Const("a")])
+        print(f"{n:>7} dag: dag_size {dag_size(shared)}, tree_size ~2^{tree_size(shared).bit_length() - 1}")
+        cases = [
+            ("print_expr_by_name", lambda: print_expr_by_name(tele)),
+            ("print_expr_by_index", lambda: print_expr_by_index(tele)),
+            ("__eq__", lambda: tele == renamed),
+            ("_get_used_args", lambda: _get_used_args(tele, [])),
+            ("shift_expr", lambda: shift_expr(lam)),
+            ("instantiate_expr", lambda: instantiate_expr(lam, [Const("a")])),
+            ("expr_todef", lambda: expr_todef(app, def_pool)),
+            ("const_to_boundvar", lambda: const_to_boundvar(named, [])),
+            ("shift_expr dag", lambda: shift_expr(shared)),
+            ("instantiate_expr dag", lambda: instantiate_expr(shared, [Const("a")])),
+            ("expr_todef dag", lambda: expr_todef(closed, def_pool)),
+            ("calc telescope", lambda: calc(tele, None, type_pool, def_pool)),
+            ("calc spine", lambda: calc(app, None, type_pool, def_pool)),
+            ("infer_type telescope", lambda: infer_type(tele, None, type_pool, def_pool)),
+            ("infer_type spine", lambda: infer_type(app, None, type_pool, def_pool)),
+        ]
+        for name, func in cases:
+            print(f"{n:>7} {name:<22} {timed(func, args.repeat) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,79 @@
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, Iterator
 
 T = TypeVar('T')  # 定义一个类型变量 T
 
+# 持久化的 cons 链表: 每个节点是 (值, 下一个节点), 最内层的绑定变量在表头.
+# 节点不可修改, push 只创建一个新节点, 不同的上下文可以共享同一条尾部.
 class Context(Generic[T]):
+    __slots__ = ("head", "size")
+
     def __init__(self):
-        self.data: List[T] = []  # 使用泛型类型 T
-    
+        self.head: tuple | None = None
+        self.size = 0
+
     def push(self, arg: T) -> None:
-        self.data.append(arg)
-    
+        self.head = (arg, self.head)
+        self.size += 1
+
     def pop(self) -> T:
-        return self.data.pop()
+        if self.head is None:
+            raise IndexError("pop from empty context")
+        arg, self.head = self.head
+        self.size -= 1
+        return arg
+
+    def extend(self, arg: T) -> 'Context[T]':
+        # 返回压入 arg 后的新上下文, 自身不变, 两者共享原来的节点
+        new_context = Context[T]()
+        new_context.head = (arg, self.head)
+        new_context.size = self.size + 1
+        return new_context
+
+    def copy(self) -> 'Context[T]':
+        new_context = Context[T]()
+        new_context.head = self.head
+        new_context.size = self.size
+        return new_context
 
     def __len__(self) -> int:
-        return len(self.data)
-    
-    def __reversed_index__(self, index: int) ->int:
-        return self.__len__() - index - 1
+        return self.size
 
     def __getitem__(self, index: int) -> T:
-        if 0 <= index < len(self.data):
-            return self.data[self.__reversed_index__(index)]
-        else:
+        # de Bruijn 下标从表头开始数, 查找的代价与下标成正比
+        if not 0 <= index < self.size:
             raise IndexError("Index out of range")
+        node = self.head
+        for _ in range(index):
+            node = node[1]
+        return node[0]
 
     def __setitem__(self, index: int, value: T) -> None:
-        if 0 <= index < len(self.data):
-            self.data[self.__reversed_index__(index)] = value
-        else:
+        # 节点不可修改, 复制下标之前的节点, 之后的节点仍然共享
+        if not 0 <= index < self.size:
             raise IndexError("Index out of range")
-    
+        prefix = []
+        node = self.head
+        for _ in range(index):
+            prefix.append(node[0])
+            node = node[1]
+        node = (value, node[1])
+        for arg in reversed(prefix):
+            node = (arg, node)
+        self.head = node
+
     def __add__(self, other: 'Context[T]') -> 'Context[T]':
-        new_context = Context[T]()
-        new_context.data = self.data + other.data
+        # other 的绑定变量在内层, 只复制 other 的节点, self 的节点被共享
+        new_context = self.copy()
+        for arg in reversed(list(other)):
+            new_context.push(arg)
         return new_context
 
-    def __iter__(self):
-        return reversed(self.data)
-    
+    def __iter__(self) -> Iterator[T]:
+        # 从最内层到最外层
+        node = self.head
+        while node is not None:
+            yield node[0]
+            node = node[1]
+
     def __repr__(self):
-        return self.data[::-1].__repr__()
\ No newline at end of file
+        return list(self).__repr__()
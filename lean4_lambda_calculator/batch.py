@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+声明文件的批量检查: 按声明中出现的常量建立依赖 DAG, 互不依赖的声明在多个进程中并行检查.
+
+文件格式与 shell 的 history.txt 相同: 每行一条 def / thm 声明 (或一个表达式),
+以空白开头的行是前一条 thm 的证明步骤. 每个声明的检查与 Shell.execute 的语义一致.
+.lean 文件由 importer 导入, 定义检查声明的类型, 定理检查证明项.
+
+每个任务带上它所依赖的常量 (传递闭包) 在环境中的条目, 作为 worker 的只读快照,
+检查结果按文件中的顺序 (依赖顺序) 合并回 type_pool / def_pool.
+
+每个声明有一个内容哈希, 由它自己的源码和所依赖的声明的哈希计算. IncrementalChecker 保存上一次的结果,
+再次检查时只检查源码或传递依赖发生变化的声明. 给定 DeclarationStore 时结果同时保存在磁盘上, 在进程之间复用.
+
+python -m lean4_lambda_calculator.batch history.txt [--jobs N] [--chunksize K] [--watch] [--store PATH]
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from lean4_lambda_calculator.expr import Expr, Arg, print_expr_by_name, expr_clean_all_names, get_all_consts, get_level_symbols
+from lean4_lambda_calculator.calculator import calc, infer_type, check, DefEq, proof_step
+from lean4_lambda_calculator.Context import Context
+from lean4_lambda_calculator.machine import normalize
+from lean4_lambda_calculator.parser import Parser, EqDef, TypeDef, ThmDef
+from lean4_lambda_calculator.level import LevelConstraints
+from lean4_lambda_calculator.cache import VersionedPool
+from lean4_lambda_calculator.store import DeclarationStore
+from lean4_lambda_calculator.pipeline import Parsed, parse_lines, parse_file
+
+
+class Declaration:
+    # item 是 Parser.parse 的结果 (TypeDef, EqDef, ThmDef, Expr), 解析失败时是错误信息
+    # steps 是 thm 的证明步骤, deps 是依赖的声明的下标
+    # source 是声明和证明步骤的源码, digest 是内容哈希
+    def __init__(self, index: int, line: int, item, steps: list = None, source: list[str] = None):
+        self.index = index
+        self.line = line
+        self.item = item
+        self.steps = steps if steps is not None else []
+        self.source = source if source is not None else []
+        self.deps: list[int] = []
+        self.digest: str | None = None
+
+    @property
+    def name(self) -> str | None:
+        if isinstance(self.item, (TypeDef, EqDef, ThmDef)):
+            return self.item.name
+        return None
+
+    def exprs(self) -> list[Expr]:
+        item = self.item
+        if isinstance(item, (TypeDef, ThmDef)):
+            rst = [item.type]
+            if isinstance(item, ThmDef) and item.proof is not None:
+                rst.append(item.proof)
+        elif isinstance(item, EqDef):
+            rst = [item.expr] if item.type is None else [item.type, item.expr]
+        elif isinstance(item, Expr):
+            rst = [item]
+        else:
+            rst = []
+        return rst + [step for step in self.steps if isinstance(step, Expr)]
+
+    def __repr__(self):
+        return f"Declaration({self.line}: {self.name})"
+
+
+class CheckResult:
+    # type / definition 是加入 type_pool / def_pool 的条目, 为 None 表示不加入.
+    # thm 的证明失败时 ok 为 False, 但类型已经加入环境, 依赖它的声明仍然可以检查.
+    def __init__(self, index: int, line: int, name: str | None, ok: bool, error: str | None = None, type: Expr = None, definition: Expr = None):
+        self.index = index
+        self.line = line
+        self.name = name
+        self.ok = ok
+        self.error = error
+        self.type = type
+        self.definition = definition
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error: {self.error}"
+        return f"CheckResult({self.line}: {self.name}, {status})"
+
+
+def read_declarations(lines, parser: Parser = None) -> list[Declaration]:
+    """把 history 格式的行解析成声明列表, 并按常量名建立依赖"""
+    if parser is None:
+        parser = Parser()
+    parsed = []
+    for line_number, line in enumerate(lines, 1):
+        code = line.rstrip()
+        if len(code.strip()) == 0:
+            continue
+        step = code[0].isspace()
+        item = ".giveup" if step and code.strip() == ".giveup" else parser.parse(code.strip())
+        parsed.append(Parsed(line_number, line_number, code, item))
+    return group_declarations(parsed, lean=False)
+
+
+def read_lean_declarations(lines) -> list[Declaration]:
+    """用 importer 导入 Lean 打印格式的声明, 源码是声明的全部行"""
+    return group_declarations(parse_lines(lines, lean=True, jobs=1), lean=True)
+
+
+def group_declarations(parsed: list[Parsed], lean: bool) -> list[Declaration]:
+    """把按源码顺序排列的解析结果组成声明列表. history 格式中以空白开头的行是前一条 thm 的证明步骤"""
+    declarations: list[Declaration] = []
+    for unit in parsed:
+        if lean:
+            declarations.append(Declaration(len(declarations), unit.start, unit.item, source=unit.code.splitlines()))
+            continue
+        code = unit.code.strip()
+        if unit.code[0].isspace() and declarations and isinstance(declarations[-1].item, ThmDef):
+            declarations[-1].steps.append(unit.item)
+            declarations[-1].source.append(code)
+            continue
+        declarations.append(Declaration(len(declarations), unit.start, unit.item, source=[code]))
+    _link(declarations)
+    return declarations
+
+
+def _link(declarations: list[Declaration]):
+    # 常量依赖文件中在它之前最近一次声明的同名常量, 之前没有声明的常量留给检查时报错.
+    # 依赖的声明都在前面, 按顺序计算哈希时依赖的哈希已经算好
+    providers: dict[str, int] = {}
+    for declaration in declarations:
+        deps = set()
+        for expr in declaration.exprs():
+            for label in get_all_consts(expr):
+                if label in providers:
+                    deps.add(providers[label])
+        declaration.deps = sorted(deps)
+        digest = hashlib.sha256("\n".join(declaration.source).encode())
+        for dep in declaration.deps:
+            digest.update(declarations[dep].digest.encode())
+        declaration.digest = digest.hexdigest()
+        if declaration.name is not None:
+            providers[declaration.name] = declaration.index
+
+
+def check_declaration(declaration: Declaration, type_pool: dict[str, Expr], def_pool: dict[str, Expr]) -> CheckResult:
+    """在给定的环境中检查一条声明, 不修改环境"""
+    item = declaration.item
+    name = declaration.name
+    result = CheckResult(declaration.index, declaration.line, name, True)
+    if isinstance(item, str):
+        result.ok, result.error = False, item
+        return result
+    level_constraints = LevelConstraints()
+    # 声明自己的 level 参数: 常量的 level 参数与它们重名时先改名, 否则会被当作同一个变量
+    used_free_symbols = set()
+    for expr in (item,) if isinstance(item, Expr) else (item.type, getattr(item, "expr", None), getattr(item, "proof", None)):
+        if expr is not None:
+            used_free_symbols.update(get_level_symbols(expr))
+    try:
+        if isinstance(item, EqDef):
+            if item.type is not None:
+                infer_type(item.type, None, type_pool, def_pool, used_free_symbols, level_constraints=level_constraints)
+            definition, expr_type = calc(item.expr, None, type_pool, def_pool, used_free_symbols, level_constraints=level_constraints)
+            if item.type is not None:
+                # 导入的定义: 定义体的类型与声明的类型定义相等, 环境中使用声明的类型
+                if not DefEq(item.type, expr_type, Context[Arg](), type_pool, def_pool, used_free_symbols, level_constraints):
+                    raise ValueError(f"Type mismatch: want {item.type}, get {expr_type}")
+                expr_type = normalize(item.type, sharing=True)
+            result.definition = expr_clean_all_names(definition)
+            result.type = expr_clean_all_names(expr_type)
+        elif isinstance(item, (TypeDef, ThmDef)):
+            infer_type(item.type, None, type_pool, def_pool, used_free_symbols, level_constraints=level_constraints)
+            result.type = expr_clean_all_names(normalize(item.type, sharing=True))
+        else:
+            infer_type(item, None, type_pool, def_pool, used_free_symbols, level_constraints=level_constraints)
+    except Exception as e:
+        result.ok, result.error = False, str(e)
+        return result
+    if isinstance(item, ThmDef) and item.proof is not None:
+        # 导入的定理带有证明项, 证明不能引用定理自己
+        try:
+            check(item.proof, item.type, None, type_pool, def_pool, used_free_symbols, level_constraints)
+        except Exception as e:
+            result.ok, result.error = False, str(e)
+    elif isinstance(item, ThmDef):
+        # 证明中可以引用定理自己的类型, 与 shell 一致
+        type_pool = VersionedPool(type_pool, bump_on_insert=False)
+        type_pool[name] = result.type
+        result.ok, result.error = _check_proof(item.type, declaration.steps, type_pool, def_pool)
+    return result
+
+
+def _check_proof(goal: Expr, steps: list, type_pool: dict[str, Expr], def_pool: dict[str, Expr]) -> tuple[bool, str | None]:
+    goals = [goal]
+    for step in steps:
+        if isinstance(step, str):
+            return False, "proof abandoned" if step == ".giveup" else step
+        level_constraints = LevelConstraints()
+        try:
+            expr_type = normalize(infer_type(step, None, type_pool, def_pool, None, level_constraints=level_constraints), sharing=True)
+            if len(goals) == 0:
+                # Q.E.D. 之后的行在 shell 中作为普通表达式执行
+                continue
+            next_goals = proof_step(expr_type, goals[0], type_pool=type_pool, def_pool=def_pool, level_constraints=level_constraints)
+        except Exception as e:
+            return False, str(e)
+        if next_goals is None:
+            return False, f"step does not match goal {print_expr_by_name(goals[0])}"
+        goals = next_goals + goals[1:]
+    if len(goals) > 0:
+        return False, f"{len(goals)} unsolved goals"
+    return True, None
+
+
+def _check_chunk(tasks: list[tuple[Declaration, dict, dict]]) -> list[CheckResult]:
+    # worker 的入口, 每个任务带有自己的环境快照
+    return [check_declaration(declaration, VersionedPool(types, bump_on_insert=False), VersionedPool(defs)) for declaration, types, defs in tasks]
+
+
+def _snapshot(declaration: Declaration, declarations: list[Declaration], results: dict[int, CheckResult]) -> tuple[dict, dict]:
+    # 依赖的传递闭包在环境中的条目, 同名常量取文件中靠后的声明
+    providers: dict[str, int] = {}
+    seen = set(declaration.deps)
+    stack = list(declaration.deps)
+    while stack:
+        index = stack.pop()
+        name = declarations[index].name
+        if providers.get(name, -1) < index:
+            providers[name] = index
+        for dep in declarations[index].deps:
+            if dep not in seen:
+                seen.add(dep)
+                stack.append(dep)
+    types, defs = {}, {}
+    for name, index in providers.items():
+        result = results[index]
+        types[name] = result.type
+        if result.definition is not None:
+            defs[name] = result.definition
+    return types, defs
+
+
+def check_declarations(declarations: list[Declaration], jobs: int = None, chunksize: int = 8, known: dict[str, CheckResult] = None) -> tuple[list[CheckResult], VersionedPool, VersionedPool]:
+    """
+    检查所有声明, 返回按文件顺序排列的结果, 以及合并后的 type_pool 和 def_pool.
+    jobs 为进程数, 默认为 CPU 个数; jobs <= 1 时在当前进程中按顺序检查.
+    依赖的声明没有加入环境 (检查失败) 时, 不再检查该声明.
+    known 是以内容哈希为键的已有结果, 哈希相同的声明直接复用, 不再检查.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if known is None:
+        known = {}
+    results: dict[int, CheckResult] = {}
+    # 哈希包含了传递依赖, 所以复用的声明所依赖的声明也都被复用
+    reused = []
+    for declaration in declarations:
+        result = known.get(declaration.digest)
+        if result is not None:
+            reused.append(CheckResult(declaration.index, declaration.line, declaration.name, result.ok, result.error, result.type, result.definition))
+            results[declaration.index] = reused[-1]
+    dependents: dict[int, list[int]] = {declaration.index: [] for declaration in declarations}
+    waiting = {}
+    ready = []
+    for declaration in declarations:
+        waiting[declaration.index] = len(declaration.deps)
+        for dep in declaration.deps:
+            dependents[dep].append(declaration.index)
+        if not declaration.deps and declaration.index not in results:
+            ready.append(declaration.index)
+
+    def finish(result: CheckResult):
+        # 记录结果, 依赖全部完成的声明进入就绪队列
+        stack = [result]
+        while stack:
+            result = stack.pop()
+            results[result.index] = result
+            for index in dependents[result.index]:
+                declaration = declarations[index]
+                if result.type is None:
+                    if index not in results:
+                        stack.append(CheckResult(index, declaration.line, declaration.name, False, f"depends on failed declaration {result.name}"))
+                    continue
+                waiting[index] -= 1
+                if waiting[index] == 0 and index not in results:
+                    ready.append(index)
+
+    def make_task(index: int):
+        declaration = declarations[index]
+        return (declaration,) + _snapshot(declaration, declarations, results)
+
+    for result in reused:
+        finish(result)
+
+    if jobs <= 1:
+        while ready:
+            # 按文件顺序检查, 便于与 shell 的输出对照
+            ready.sort(reverse=True)
+            task = make_task(ready.pop())
+            finish(_check_chunk([task])[0])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            running = set()
+            while ready or running:
+                # 每个 worker 最多有两个任务在排队, 任务按 chunksize 分组以减少进程间通信
+                while ready and len(running) < 2 * jobs:
+                    size = max(1, min(chunksize, len(ready) // jobs))
+                    chunk, ready[:] = ready[:size], ready[size:]
+                    running.add(executor.submit(_check_chunk, [make_task(index) for index in chunk]))
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        finish(result)
+
+    rst = [results[declaration.index] for declaration in declarations]
+    type_pool: VersionedPool = VersionedPool(bump_on_insert=False)
+    def_pool: VersionedPool = VersionedPool()
+    for result in rst:
+        if result.type is not None:
+            type_pool[result.name] = result.type
+        if result.definition is not None:
+            def_pool[result.name] = result.definition
+    return rst, type_pool, def_pool
+
+
+class IncrementalChecker:
+    """
+    保存上一次检查的结果, 再次检查时按内容哈希复用.
+    源码和传递依赖都没有变化的声明不会重新检查, 没有变化的行也不会重新解析.
+    内存中没有的结果再到 store 中查找, 新检查的结果写入 store.
+    """
+
+    def __init__(self, jobs: int = 1, chunksize: int = 8, store: DeclarationStore = None):
+        self.parser = Parser()
+        self.jobs = jobs
+        self.chunksize = chunksize
+        self.store = store
+        self.parsed: dict[str, object] = {}
+        self.results: dict[str, CheckResult] = {}
+        self.reused = 0
+
+    def parse(self, code: str):
+        item = self.parsed.get(code)
+        if item is None:
+            item = self.parser.parse(code)
+            self.parsed[code] = item
+        return item
+
+    def check(self, lines) -> tuple[list[CheckResult], VersionedPool, VersionedPool]:
+        return self.check_declarations(read_declarations(lines, self))
+
+    def check_declarations(self, declarations: list[Declaration]) -> tuple[list[CheckResult], VersionedPool, VersionedPool]:
+        known = dict(self.results)
+        if self.store is not None:
+            for declaration in declarations:
+                if declaration.digest not in known:
+                    value = self.store.get(declaration.digest)
+                    if value is not None:
+                        known[declaration.digest] = CheckResult(declaration.index, declaration.line, *value)
+        self.reused = sum(1 for declaration in declarations if declaration.digest in known)
+        results, type_pool, def_pool = check_declarations(declarations, self.jobs, self.chunksize, known)
+        if self.store is not None:
+            for declaration, result in zip(declarations, results):
+                if declaration.digest not in known:
+                    self.store.put(declaration.digest, (result.name, result.ok, result.error, result.type, result.definition))
+        # 只保留当前文件中的声明, 缓存不会随编辑无限增长
+        self.results = {declaration.digest: result for declaration, result in zip(declarations, results)}
+        used = set()
+        for declaration in declarations:
+            used.update(declaration.source)
+        self.parsed = {code: item for code, item in self.parsed.items() if code in used}
+        return results, type_pool, def_pool
+
+    def check_file(self, path: str) -> tuple[list[CheckResult], VersionedPool, VersionedPool]:
+        with open(path, "r") as f:
+            if path.endswith(".lean"):
+                return self.check_declarations(group_declarations(parse_lines(f, lean=True, jobs=self.jobs), lean=True))
+            return self.check(f.readlines())
+
+
+def check_file(path: str, jobs: int = None, chunksize: int = 8) -> tuple[list[CheckResult], VersionedPool, VersionedPool]:
+    # 解析同样在 jobs 个进程中并行
+    declarations = group_declarations(parse_file(path, jobs), path.endswith(".lean"))
+    return check_declarations(declarations, jobs, chunksize)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a declaration file in parallel")
+    parser.add_argument("path", type=str, help="Path of the declaration file (history.txt format, or a Lean-printed .lean file)")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes, 1 checks in this process")
+    parser.add_argument("--chunksize", type=int, default=8, help="Maximum number of declarations sent to a worker at once")
+    parser.add_argument("--watch", action="store_true", help="Re-check incrementally whenever the file changes")
+    parser.add_argument("--store", type=str, default=None, help="Directory of the on-disk result store shared between runs")
+    args = parser.parse_args()
+
+    checker = IncrementalChecker(args.jobs, args.chunksize, DeclarationStore(args.store) if args.store else None)
+    mtime = None
+    try:
+        while True:
+            if os.path.getmtime(args.path) != mtime:
+                mtime = os.path.getmtime(args.path)
+                start = time.perf_counter()
+                results, _, _ = checker.check_file(args.path)
+                for result in results:
+                    if not result.ok:
+                        print(f"{args.path}:{result.line}: {result.name}: {result.error}")
+                failed = sum(1 for result in results if not result.ok)
+                print(f"checked {len(results)} declarations ({checker.reused} reused), {failed} failed, {time.perf_counter() - start:.2f}s")
+            if not args.watch:
+                break
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+有界缓存与带版本号的常量池.
+"""
+
+from collections import OrderedDict
+from itertools import count
+
+_versions = count(1)
+_MISSING = object()
+
+
+class VersionedPool(dict):
+    """
+    带版本号的 type_pool / def_pool, 用于缓存的键.
+
+    版本号全局唯一, 因此不同的池不会共享缓存项. 覆盖或删除已有的键时版本号改变;
+    bump_on_insert=False 时新增键不改变版本号: 对于 type_pool, 新常量不会影响已经成功计算的结果.
+    """
+
+    def __init__(self, *args, bump_on_insert: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bump_on_insert = bump_on_insert
+        self.version = next(_versions)
+
+    def _bump(self):
+        self.version = next(_versions)
+
+    def __setitem__(self, key, value):
+        if self.bump_on_insert or key in self:
+            self._bump()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._bump()
+        super().__delitem__(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pop(self, key, *default):
+        self._bump()
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self._bump()
+        return super().popitem()
+
+    def clear(self):
+        self._bump()
+        super().clear()
+
+    def copy(self) -> "VersionedPool":
+        return VersionedPool(self, bump_on_insert=self.bump_on_insert)
+
+    def __reduce__(self):
+        return (VersionedPool, (dict(self),), {"bump_on_insert": self.bump_on_insert})
+
+    def __setstate__(self, state):
+        self.bump_on_insert = state["bump_on_insert"]
+
+
+def pool_version(pool: dict) -> int | None:
+    """普通 dict 没有版本号, 返回 None 表示不能缓存"""
+    return getattr(pool, "version", None)
+
+
+class LRUCache:
+    """按最近使用淘汰的有界缓存, 记录命中, 未命中和淘汰次数"""
+
+    def __init__(self, maxsize: int = 65536):
+        assert maxsize > 0, "maxsize must be positive"
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        value = self.data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        data = self.data
+        if key in data:
+            data.move_to_end(key)
+        data[key] = value
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key):
+        self.data.pop(key, None)
+
+    def clear(self):
+        self.data.clear()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self.data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+
+class DefEqCache:
+    """
+    DefEq 的结果缓存. 相等的项用并查集合并, 传递性可以直接命中; 不相等的项对放在有界的 LRU 中.
+
+    键是节点的 id, 节点本身被缓存持有, 因此 id 不会被复用. 结果依赖 def_pool,
+    def_pool 的版本号改变时清空缓存. 并查集超过 maxsize 个节点时整体清空.
+    """
+
+    def __init__(self, maxsize: int = 65536, max_failures: int = 16384):
+        self.maxsize = maxsize
+        self.version = None
+        self.parent: dict[int, int] = {}
+        self.nodes: dict[int, object] = {}
+        self.failures = LRUCache(max_failures)
+        self.hits = 0
+        self.failure_hits = 0
+        self.misses = 0
+        self.resets = 0
+
+    def _sync(self, version: int):
+        if version != self.version:
+            self.version = version
+            self.clear()
+
+    def _find(self, key: int) -> int:
+        parent = self.parent
+        root = key
+        while parent[root] != root:
+            root = parent[root]
+        # 路径压缩
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    def lookup(self, version: int, target, source) -> bool | None:
+        """已知相等返回 True, 已知不相等返回 False, 未知返回 None"""
+        self._sync(version)
+        target_id, source_id = id(target), id(source)
+        if target_id in self.parent and source_id in self.parent and self._find(target_id) == self._find(source_id):
+            self.hits += 1
+            return True
+        key = (target_id, source_id) if target_id < source_id else (source_id, target_id)
+        if key in self.failures.data:
+            self.failures.data.move_to_end(key)
+            self.failure_hits += 1
+            return False
+        self.misses += 1
+        return None
+
+    def add_equal(self, version: int, target, source):
+        self._sync(version)
+        if len(self.parent) + 2 > self.maxsize:
+            self.clear()
+            self.resets += 1
+        roots = []
+        for node in (target, source):
+            key = id(node)
+            if key not in self.parent:
+                self.parent[key] = key
+                self.nodes[key] = node
+            roots.append(self._find(key))
+        self.parent[roots[0]] = roots[1]
+
+    def add_unequal(self, version: int, target, source):
+        self._sync(version)
+        target_id, source_id = id(target), id(source)
+        key = (target_id, source_id) if target_id < source_id else (source_id, target_id)
+        self.failures.put(key, (target, source))
+
+    def clear(self):
+        self.parent.clear()
+        self.nodes.clear()
+        self.failures.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.parent),
+            "failures": len(self.failures),
+            "hits": self.hits,
+            "failure_hits": self.failure_hits,
+            "misses": self.misses,
+            "evictions": self.failures.evictions,
+            "resets": self.resets,
+        }
+
+    def reset_stats(self):
+        self.hits = self.failure_hits = self.misses = self.resets = 0
+        self.failures.reset_stats()
@@ -5,66 +5,49 @@ Date: 2024-11-27
 License: MIT
 """
 
-from lean4_lambda_calculator.level import SuccLevel, is_solvable, IMaxLevel
-from lean4_lambda_calculator.expr import Expr, BoundVar, Const, Lambda, Forall, App, Sort, Arg, expr_rename_level, expr_todef, get_sort_eq_conditions, print_expr_by_name, print_expr_by_index
+import os
+
+from lean4_lambda_calculator.level import SuccLevel, IMaxLevel, LevelConstraints
+from lean4_lambda_calculator.expr import Expr, BoundVar, Const, Lambda, Forall, App, Sort, Arg, SORT, CONST, BOUNDVAR, ARG, FORALL, LAMBDA, APP, expr_rename_level, get_all_consts, get_level_symbols, get_sort_eq_conditions, print_expr_by_name, print_expr_by_index
 from lean4_lambda_calculator.Context import Context
+from lean4_lambda_calculator.profiler import profile, profiler
+from lean4_lambda_calculator.cache import LRUCache, DefEqCache, pool_version
+from lean4_lambda_calculator.machine import normalize
+from lean4_lambda_calculator.traversal import replace, run
 
-import time
-import logging
-import inspect
-
-# 全局日志开关
-LOGGING_ENABLED = True
-
-# 根据日志开关来动态设置日志级别
-if LOGGING_ENABLED:
-    logging.basicConfig(
-        level=logging.INFO,  # 如果启用日志，设置为 INFO 或 DEBUG
-        filename="./execution_times.log",
-        filemode="a",  # 追加模式
-        format="%(asctime)s - %(levelname)s - %(message)s",
-    )
-else:
-    logging.basicConfig(
-        level=logging.CRITICAL,  # 如果禁用日志，设置为 CRITICAL 这样只有最严重的日志会输出
-    )
-
-# 装饰器：记录函数执行时间并记录调用者
-def log_execution_time(func):
-    def wrapper(*args, **kwargs):
-        # 获取调用堆栈的上一层信息
-        caller_frame = inspect.stack()[1]
-        caller_name = caller_frame.function  # 获取调用者的函数名
-
-        # 获取第一个位置参数
-        first_arg = args[0] if args else None
-        second_arg = args[1] if args and len(args) > 1 else None
-
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        duration_ms = (end_time - start_time) * 1000  # 转换为毫秒
-
-        # 日志信息中增加调用者名称和第一个参数
-        logging.info(
-            f"Function '{func.__name__}' executed in {duration_ms:.2f} ms. "
-            f"Called by '{caller_name}'. First argument: {first_arg}. Second argument: {second_arg}."
-        )
-        return result
-    return wrapper
+# beta 化简的方式: "subst" 代入后重新 calc, "machine" 使用环境机 (machine.py), "need" 使用按需调用的环境机
+NORMALIZER = os.environ.get("LEAN4_NORMALIZER", "subst")
+# 环境机化简的步数上限, None 表示不限制
+NORMALIZER_FUEL = int(os.environ["LEAN4_NORMALIZER_FUEL"]) if os.environ.get("LEAN4_NORMALIZER_FUEL") else None
+
+# calc 的结果缓存, 键为 (节点 id, type_pool 版本, def_pool 版本, type_no_check).
+# Expr 节点经过 hash-consing 且不可变, 缓存项持有节点本身, 命中时用 is 确认 id 没有被复用.
+# 值为 (expr, 结果, 计算中引入的 level 变量, 计算中加入的 level 方程):
+# 引入的 level 变量与当前已用的变量冲突时视为未命中, 加入的方程在命中时重放到当前约束存储.
+calc_cache = LRUCache(maxsize=65536)
+profiler.register_cache("calc_cache", calc_cache)
+
+# DefEq 的结果缓存: 相等的项放在并查集中, 不相等的项对放在有界的失败缓存中
+defeq_cache = DefEqCache()
+profiler.register_cache("defeq_cache", defeq_cache)
+
+# infer_type 的结果缓存, 键和值的结构与 calc_cache 相同, 结果只有类型
+infer_cache = LRUCache(maxsize=65536)
+profiler.register_cache("infer_cache", infer_cache)
 
-calc_cache:dict[str, tuple[Expr, Expr]] = {}
-def hash_expr(expr: Expr) -> str:
-    return print_expr_by_index(expr)
+def _calc_cache_lookup(expr: Expr, key: tuple, used_free_symbols: set[str], level_constraints: LevelConstraints, cache: LRUCache = calc_cache):
+    entry = cache.get(key)
+    if entry is None or entry[0] is not expr or not used_free_symbols.isdisjoint(entry[2]):
+        return None
+    if entry[3] and not level_constraints.add_all(entry[3]):
+        return None
+    used_free_symbols.update(entry[2])
+    return entry[1]
 
 # 求解表达式的类型
 # 返回化简后的表达式和类型
-@log_execution_time
-def calc(expr: Expr, context: Context[Arg] = None, type_pool: dict[str, Expr] = None, def_pool: dict[str, Expr] = None, used_free_symbols: set[str] = None, type_no_check: bool = False) -> tuple[Expr, Expr]:
-    if not isinstance(expr, Arg):
-        expr_hash = hash_expr(expr)
-        if expr_hash in calc_cache:
-            return calc_cache[expr_hash]
+@profile
+def calc(expr: Expr, context: Context[Arg] = None, type_pool: dict[str, Expr] = None, def_pool: dict[str, Expr] = None, used_free_symbols: set[str] = None, type_no_check: bool = False, level_constraints: LevelConstraints = None) -> tuple[Expr, Expr]:
     if context is None:
         context = Context[Arg]()
     if type_pool is None:
@@ -73,168 +56,509 @@ def calc(expr: Expr, context: Context[Arg] = None, type_pool: dict[str, Expr] =
         def_pool = {}
     if used_free_symbols is None:
         used_free_symbols: set[str] = set()
-    if isinstance(expr, Sort):
-        used_free_symbols.update(str(s) for s in expr.level.symbol.free_symbols)
+    if level_constraints is None:
+        level_constraints = LevelConstraints()
+    return run(_calc(expr, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints))
+
+# calc 的实现写成生成器, yield 子项的 _calc 表示递归调用, 由 traversal.run 驱动, 不占用 Python 调用栈
+def _calc(expr: Expr, context: Context[Arg], type_pool: dict[str, Expr], def_pool: dict[str, Expr], used_free_symbols: set[str], type_no_check: bool, level_constraints: LevelConstraints):
+    # 不含自由 BoundVar 的复合项与上下文无关, 在非空上下文中也可以缓存
+    cache_key = None
+    if expr.tag in (FORALL, LAMBDA, APP) and expr.loose_bvar_range == 0:
+        type_version, def_version = pool_version(type_pool), pool_version(def_pool)
+        if type_version is not None and def_version is not None:
+            cache_key = (id(expr), type_version, def_version, type_no_check)
+            rst = _calc_cache_lookup(expr, cache_key, used_free_symbols, level_constraints)
+            if rst is None and type_no_check:
+                # 做过类型检查的结果同样可以用于不检查的调用
+                rst = _calc_cache_lookup(expr, cache_key[:3] + (False,), used_free_symbols, level_constraints)
+            if rst is not None:
+                return rst
+            old_used_free_symbols = set(used_free_symbols)
+            trail_start = len(level_constraints.trail)
+    if expr.tag == SORT:
+        used_free_symbols.update(expr.level.get_variables())
         rst = (expr, Sort(SuccLevel(expr.level)))
-    elif isinstance(expr, Const):
+    elif expr.tag == CONST:
         assert expr.label in type_pool, f"Const {expr.label} is not defined."
-        # 常量的类型的定义不需要考虑上下文化简, 直接返回定义的类型 
+        # 常量的类型的定义不需要考虑上下文化简, 直接返回定义的类型
+        # 定义不在这里展开, 由 DefEq 和 whnf 按需展开
         expr_type, new_used_free_symbols = expr_rename_level(type_pool[expr.label], used_free_symbols)
         used_free_symbols.update(new_used_free_symbols)
-        if expr.label in def_pool:
-            definition, new_used_free_symbols = expr_rename_level(def_pool[expr.label], used_free_symbols)
-            used_free_symbols.update(new_used_free_symbols)
-            return definition, expr_type
         rst = (expr, expr_type)
-    elif isinstance(expr, Arg):
-        arg_type, arg_type_type = calc(expr.type, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
+    elif expr.tag == ARG:
+        arg_type, arg_type_type = yield _calc(expr.type, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
         rst = (Arg(arg_type, expr.name), arg_type_type)
-    elif isinstance(expr, BoundVar):
+    elif expr.tag == BOUNDVAR:
         assert expr.index < len(
             context
         ), f"Index {expr.index} out of bounds for context: {context}"
         expr_type = shift_expr(context[expr.index].type, offset=0, step=expr.index+1)
         rst = (expr, expr_type)
-    elif isinstance(expr, Forall):
-        assert isinstance(expr.var_type, Arg), f"Type of variable in Forall should be Arg, but got {expr.var_type}"
-        var_type, var_type_type = calc(expr.var_type, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
-        assert isinstance(var_type, Arg), f"Type of variable in Forall should be Arg, but got {var_type}"
+    elif expr.tag == FORALL:
+        assert expr.var_type.tag == ARG, f"Type of variable in Forall should be Arg, but got {expr.var_type}"
+        var_type, var_type_type = yield _calc(expr.var_type, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        assert var_type.tag == ARG, f"Type of variable in Forall should be Arg, but got {var_type}"
         context.push(var_type)
-        new_body, body_type = calc(
-            expr.body, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check
-        )
+        new_body, body_type = yield _calc(expr.body, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
         return_expr = Forall(var_type, new_body)
-        assert isinstance(var_type_type, Sort), f"The varType's type is not Sort, ({expr.var_type} : {var_type_type})" 
-        assert isinstance(body_type, Sort), f"The body's type is not Sort, ({expr.body} : {body_type})" 
+        if var_type_type.tag != SORT:
+            var_type_type = whnf(var_type_type, def_pool, used_free_symbols)
+        if body_type.tag != SORT:
+            body_type = whnf(body_type, def_pool, used_free_symbols)
+        assert var_type_type.tag == SORT, f"The varType's type is not Sort, ({expr.var_type} : {var_type_type})" 
+        assert body_type.tag == SORT, f"The body's type is not Sort, ({expr.body} : {body_type})" 
         return_type = Sort(IMaxLevel(var_type_type.level, body_type.level))
         context.pop()
         rst = (return_expr, return_type)
-    elif isinstance(expr, Lambda):
-        assert isinstance(expr.var_type, Arg), f"Type of variable in Lambda should be Arg, but got {expr.var_type}"
-        var_type, _ = calc(expr.var_type, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
-        assert isinstance(var_type, Arg), f"Type of variable in Forall should be Arg, but got {var_type}"
+    elif expr.tag == LAMBDA:
+        assert expr.var_type.tag == ARG, f"Type of variable in Lambda should be Arg, but got {expr.var_type}"
+        var_type, _ = yield _calc(expr.var_type, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        assert var_type.tag == ARG, f"Type of variable in Forall should be Arg, but got {var_type}"
         context.push(var_type)
-        new_body, body_type = calc(
-            expr.body, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check
-        )
+        new_body, body_type = yield _calc(expr.body, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
         return_expr = Lambda(var_type, new_body)
         return_type = Forall(var_type, body_type)
         context.pop()
         rst = (return_expr, return_type)
-    elif isinstance(expr, App):
-        arg, arg_type = calc(expr.arg, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
-        func, func_type = calc(expr.func, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
-        if not isinstance(func_type, Forall):
-            def_func_type = calc(expr_todef(func_type, def_pool), context, type_pool, def_pool, used_free_symbols, type_no_check=True)[0]
-            if not isinstance(def_func_type, Forall):
+    elif expr.tag == APP:
+        rst = yield from _calc_app(expr, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+    else:
+        raise ValueError("Unknown expr", expr)
+    
+    if cache_key is not None:
+        new_symbols = frozenset(used_free_symbols - old_used_free_symbols)
+        calc_cache.put(cache_key, (expr, rst, new_symbols, tuple(level_constraints.trail[trail_start:])))
+    return rst
+
+def _calc_app(expr: Expr, context: Context[Arg], type_pool: dict[str, Expr], def_pool: dict[str, Expr], used_free_symbols: set[str], type_no_check: bool, level_constraints: LevelConstraints):
+    # 一次处理整条应用链 f a1 a2 ... an, 而不是逐个参数重新 calc
+    spine: list[Expr] = []
+    while expr.tag == APP:
+        spine.append(expr.arg)
+        expr = expr.func
+    # 与逐层递归时的顺序一致: 先从右到左计算参数, 再计算函数
+    args: list[tuple[Expr, Expr]] = []
+    for arg in spine:
+        args.append((yield _calc(arg, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)))
+    args.reverse()
+    func, func_type = yield _calc(expr, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+
+    # 沿着 Forall 链检查每个参数, 已检查的参数先挂起, 最后一次性代入
+    pending: list[Expr] = []
+    for arg, arg_type in args:
+        if func_type.tag != FORALL:
+            func_type = whnf(instantiate_expr(func_type, pending), def_pool, used_free_symbols)
+            pending = []
+            if func_type.tag != FORALL:
                 raise ValueError(f"Function application to a non-function: {func_type}")
-            func_type = def_func_type
-        if not type_no_check and not DefEq(func_type.var_type, arg_type, context, type_pool, def_pool, used_free_symbols):
+        var_type = instantiate_expr(func_type.var_type, pending)
+        if not type_no_check and not DefEq(var_type, arg_type, context, type_pool, def_pool, used_free_symbols, level_constraints):
             context_info = ','.join([f"(#{idx}, {print_expr_by_name(expr, context=context)})" for idx, expr in enumerate(context)])
-            raise ValueError(f"Type mismatch: want {func_type.var_type}, get {arg_type}. Context=[{context_info}]")
-        tmp = unshift_expr(func_type.body, head=arg, offset=0)
-        unshifted_funcbody_type, _ = calc(tmp, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
-        if isinstance(func, Lambda):
-            tmp = unshift_expr(func.body, head=arg, offset=0)
-            unshifted_funcbody, _ = calc(tmp, context, type_pool, def_pool, used_free_symbols, type_no_check=type_no_check)
-            rst = (unshifted_funcbody, unshifted_funcbody_type)
-        else:
-            rst = (App(func, arg), unshifted_funcbody_type)
+            raise ValueError(f"Type mismatch: want {var_type}, get {arg_type}. Context=[{context_info}]")
+        pending.append(arg)
+        func_type = func_type.body
+    tmp = instantiate_expr(func_type, pending)
+    return_type, _ = yield _calc(tmp, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+
+    args_expr = [arg for arg, _ in args]
+    if func.tag != LAMBDA:
+        for arg in args_expr:
+            func = App(func, arg)
+        return func, return_type
+    if NORMALIZER in ("machine", "need"):
+        # 用环境机化简 beta-redex, 不再对化简结果重新 calc
+        return normalize(_make_app(func, args_expr), sharing=NORMALIZER == "need", fuel=NORMALIZER_FUEL), return_type
+    # beta 化简: 一次代入尽可能多的 Lambda 参数, 剩余参数再应用到结果上
+    num_lambdas = 0
+    body = func
+    while body.tag == LAMBDA and num_lambdas < len(args_expr):
+        body = body.body
+        num_lambdas += 1
+    tmp = instantiate_expr(body, args_expr[:num_lambdas])
+    for arg in args_expr[num_lambdas:]:
+        tmp = App(tmp, arg)
+    return_expr, _ = yield _calc(tmp, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+    return return_expr, return_type
+
+# 只求类型, 不化简表达式本身. 返回的类型没有经过化简, 可能含有 beta-redex
+@profile
+def infer_type(expr: Expr, context: Context[Arg] = None, type_pool: dict[str, Expr] = None, def_pool: dict[str, Expr] = None, used_free_symbols: set[str] = None, type_no_check: bool = False, level_constraints: LevelConstraints = None) -> Expr:
+    if context is None:
+        context = Context[Arg]()
+    if type_pool is None:
+        type_pool = {}
+    if def_pool is None:
+        def_pool = {}
+    if used_free_symbols is None:
+        used_free_symbols: set[str] = set()
+    if level_constraints is None:
+        level_constraints = LevelConstraints()
+    return run(_infer(expr, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints))
+
+# 与 _calc 一样写成由 traversal.run 驱动的生成器
+def _infer(expr: Expr, context: Context[Arg], type_pool: dict[str, Expr], def_pool: dict[str, Expr], used_free_symbols: set[str], type_no_check: bool, level_constraints: LevelConstraints):
+    cache_key = None
+    if expr.tag in (FORALL, LAMBDA, APP) and expr.loose_bvar_range == 0:
+        type_version, def_version = pool_version(type_pool), pool_version(def_pool)
+        if type_version is not None and def_version is not None:
+            cache_key = (id(expr), type_version, def_version, type_no_check)
+            rst = _calc_cache_lookup(expr, cache_key, used_free_symbols, level_constraints, infer_cache)
+            if rst is None and type_no_check:
+                rst = _calc_cache_lookup(expr, cache_key[:3] + (False,), used_free_symbols, level_constraints, infer_cache)
+            if rst is not None:
+                return rst
+            old_used_free_symbols = set(used_free_symbols)
+            trail_start = len(level_constraints.trail)
+    if expr.tag == SORT:
+        used_free_symbols.update(expr.level.get_variables())
+        rst = Sort(SuccLevel(expr.level))
+    elif expr.tag == CONST:
+        assert expr.label in type_pool, f"Const {expr.label} is not defined."
+        rst, new_used_free_symbols = expr_rename_level(type_pool[expr.label], used_free_symbols)
+        used_free_symbols.update(new_used_free_symbols)
+    elif expr.tag == ARG:
+        rst = yield _infer(expr.type, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+    elif expr.tag == BOUNDVAR:
+        assert expr.index < len(context), f"Index {expr.index} out of bounds for context: {context}"
+        rst = shift_expr(context[expr.index].type, offset=0, step=expr.index+1)
+    elif expr.tag == FORALL:
+        assert expr.var_type.tag == ARG, f"Type of variable in Forall should be Arg, but got {expr.var_type}"
+        var_type_type = yield from _infer_sort(expr.var_type, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        context.push(expr.var_type)
+        body_type = yield from _infer_sort(expr.body, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        context.pop()
+        rst = Sort(IMaxLevel(var_type_type.level, body_type.level))
+    elif expr.tag == LAMBDA:
+        assert expr.var_type.tag == ARG, f"Type of variable in Lambda should be Arg, but got {expr.var_type}"
+        if not type_no_check:
+            yield from _infer_sort(expr.var_type, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        context.push(expr.var_type)
+        body_type = yield _infer(expr.body, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        context.pop()
+        rst = Forall(expr.var_type, body_type)
+    elif expr.tag == APP:
+        head, args = _get_app_spine(expr)
+        func_type = yield _infer(head, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+        pending: list[Expr] = []
+        for arg in args:
+            if func_type.tag != FORALL:
+                func_type = whnf(instantiate_expr(func_type, pending), def_pool, used_free_symbols)
+                pending = []
+                if func_type.tag != FORALL:
+                    raise ValueError(f"Function application to a non-function: {func_type}")
+            if not type_no_check:
+                var_type = instantiate_expr(func_type.var_type, pending)
+                arg_type = yield _infer(arg, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+                if not DefEq(var_type, arg_type, context, type_pool, def_pool, used_free_symbols, level_constraints):
+                    context_info = ','.join([f"(#{idx}, {print_expr_by_name(expr, context=context)})" for idx, expr in enumerate(context)])
+                    raise ValueError(f"Type mismatch: want {var_type}, get {arg_type}. Context=[{context_info}]")
+            pending.append(arg)
+            func_type = func_type.body
+        rst = instantiate_expr(func_type, pending)
     else:
         raise ValueError("Unknown expr", expr)
-    
-    if len(context) == 0 and not isinstance(expr, Arg):
-        calc_cache[expr_hash] = rst
+
+    if cache_key is not None:
+        new_symbols = frozenset(used_free_symbols - old_used_free_symbols)
+        infer_cache.put(cache_key, (expr, rst, new_symbols, tuple(level_constraints.trail[trail_start:])))
     return rst
 
-@log_execution_time
-def DefEq(target: Expr, source: Expr, context: list[Arg], type_pool: dict[str, Expr], def_pool: dict[str, Expr], used_free_symbols: set[str]=None) -> bool:
-    if target == source:
-        conditions = get_sort_eq_conditions(target, source)
-        if is_solvable(conditions):
-            return True
+def _infer_sort(expr: Expr, context: Context[Arg], type_pool: dict[str, Expr], def_pool: dict[str, Expr], used_free_symbols: set[str], type_no_check: bool, level_constraints: LevelConstraints):
+    expr_type = yield _infer(expr, context, type_pool, def_pool, used_free_symbols, type_no_check, level_constraints)
+    if expr_type.tag != SORT:
+        expr_type = whnf(expr_type, def_pool, used_free_symbols)
+    assert expr_type.tag == SORT, f"The type of {expr} is not Sort, but {expr_type}"
+    return expr_type
+
+# 检查表达式具有给定的类型, 不匹配时抛出 ValueError
+@profile
+def check(expr: Expr, expected_type: Expr, context: Context[Arg] = None, type_pool: dict[str, Expr] = None, def_pool: dict[str, Expr] = None, used_free_symbols: set[str] = None, level_constraints: LevelConstraints = None) -> None:
+    if context is None:
+        context = Context[Arg]()
+    if used_free_symbols is None:
+        used_free_symbols: set[str] = set()
+    if level_constraints is None:
+        level_constraints = LevelConstraints()
+    expr_type = infer_type(expr, context, type_pool, def_pool, used_free_symbols, level_constraints=level_constraints)
+    if not DefEq(expected_type, expr_type, context, type_pool, def_pool, used_free_symbols, level_constraints):
+        raise ValueError(f"Type mismatch: want {expected_type}, get {expr_type}")
+
+def _get_app_spine(expr: Expr) -> tuple[Expr, list[Expr]]:
+    args: list[Expr] = []
+    while expr.tag == APP:
+        args.append(expr.arg)
+        expr = expr.func
+    args.reverse()
+    return expr, args
+
+def _make_app(func: Expr, args: list[Expr]) -> Expr:
+    for arg in args:
+        func = App(func, arg)
+    return func
+
+def _whnf_core(expr: Expr) -> Expr:
+    # 只做头部的 beta 化简, 不展开定义
+    head, args = _get_app_spine(expr)
+    if head.tag != LAMBDA or len(args) == 0:
+        return expr
+    while head.tag == LAMBDA and len(args) > 0:
+        num_lambdas = 0
+        body = head
+        while body.tag == LAMBDA and num_lambdas < len(args):
+            body = body.body
+            num_lambdas += 1
+        head, new_args = _get_app_spine(instantiate_expr(body, args[:num_lambdas]))
+        args = new_args + args[num_lambdas:]
+    return _make_app(head, args)
+
+def _unfold_definition(label: str, def_pool: dict[str, Expr], used_free_symbols: set[str]) -> Expr:
+    # 每次展开都为定义中的 level 变量取新名字, 相当于常量的 level 参数在每个出现处独立实例化
+    definition, symbols = expr_rename_level(def_pool[label], used_free_symbols)
+    used_free_symbols.update(symbols)
+    return definition
+
+@profile
+def whnf(expr: Expr, def_pool: dict[str, Expr], used_free_symbols: set[str] = None) -> Expr:
+    """弱头范式: 反复做头部的 beta 化简和 delta 展开, 不化简参数和 binder 内部"""
+    if used_free_symbols is None:
+        used_free_symbols = get_level_symbols(expr)
+    if expr.tag == ARG:
+        expr = expr.type
+    while True:
+        expr = _whnf_core(expr)
+        head, args = _get_app_spine(expr)
+        if head.tag != CONST or head.label not in def_pool:
+            return expr
+        expr = _make_app(_unfold_definition(head.label, def_pool, used_free_symbols), args)
+
+# 定义的高度: 定义体中引用的定义的最大高度加一, 不引用其他定义时为 1
+# lazy delta 先展开高度更大的一侧, 因为它是由另一侧构造出来的
+_definition_heights = LRUCache(maxsize=4096)
+
+def _definition_height(label: str, def_pool: dict[str, Expr]) -> int:
+    version = pool_version(def_pool)
+    if version is not None:
+        height = _definition_heights.get((version, label))
+        if height is not None:
+            return height
+    height = 1 + max((_definition_height(name, def_pool) for name in set(get_all_consts(def_pool[label])) if name in def_pool), default=0)
+    if version is not None:
+        _definition_heights.put((version, label), height)
+    return height
+
+# 以下比较函数写成生成器, 由 traversal.run 驱动: yield 子比较表示递归调用, 很深的 Forall 链和参数不会触及递归上限
+def _quick_is_def_eq(target: Expr, source: Expr, def_pool: dict[str, Expr], used_free_symbols: set[str], level_constraints: LevelConstraints):
+    # 只看最外层的结构就能确定结果时返回 True/False, 否则返回 None
+    if target.tag != source.tag:
+        return None
+    if target.tag == SORT:
+        return level_constraints.add(target.level, source.level)
+    elif target.tag in (FORALL, LAMBDA):
+        if not (yield _is_def_eq(target.var_type.type, source.var_type.type, def_pool, used_free_symbols, level_constraints)):
+            return False
+        return (yield _is_def_eq(target.body, source.body, def_pool, used_free_symbols, level_constraints))
+    elif target.tag == BOUNDVAR:
+        return target.index == source.index
+    elif target.tag == CONST and target.label == source.label:
+        return True
+    return None
+
+def _is_def_eq_args(target: Expr, source: Expr, def_pool: dict[str, Expr], used_free_symbols: set[str], level_constraints: LevelConstraints):
+    # 同一个头部时逐个比较参数, 失败时撤销比较过程中加入的 level 约束
+    target_head, target_args = _get_app_spine(target)
+    source_head, source_args = _get_app_spine(source)
+    if len(target_args) != len(source_args) or target_head.tag != source_head.tag:
+        return False
+    if target_head.tag == CONST and target_head.label != source_head.label:
+        return False
+    if target_head.tag == BOUNDVAR and target_head.index != source_head.index:
+        return False
+    if target_head.tag not in (CONST, BOUNDVAR):
+        return False
+    state = level_constraints.save()
+    for target_arg, source_arg in zip(target_args, source_args):
+        if not (yield _is_def_eq(target_arg, source_arg, def_pool, used_free_symbols, level_constraints)):
+            level_constraints.restore(state)
+            return False
+    return True
+
+def _unfold_head(expr: Expr, def_pool: dict[str, Expr], used_free_symbols: set[str]) -> Expr:
+    head, args = _get_app_spine(expr)
+    return _whnf_core(_make_app(_unfold_definition(head.label, def_pool, used_free_symbols), args))
+
+def _get_definition_head(expr: Expr, def_pool: dict[str, Expr]) -> str | None:
+    while expr.tag == APP:
+        expr = expr.func
+    if expr.tag == CONST and expr.label in def_pool:
+        return expr.label
+    return None
+
+def _is_def_eq(target: Expr, source: Expr, def_pool: dict[str, Expr], used_free_symbols: set[str], level_constraints: LevelConstraints):
+    if target is source:
+        return True
+    version = pool_version(def_pool)
+    if version is None:
+        return (yield _is_def_eq_core(target, source, def_pool, used_free_symbols, level_constraints))
+    result = defeq_cache.lookup(version, target, source)
+    if result is not None:
+        return result
+    # 只缓存没有涉及 level 方程的比较, 它们的结果与约束存储无关
+    attempts = level_constraints.attempts
+    result = yield _is_def_eq_core(target, source, def_pool, used_free_symbols, level_constraints)
+    if level_constraints.attempts == attempts:
+        if result:
+            defeq_cache.add_equal(version, target, source)
+        else:
+            defeq_cache.add_unequal(version, target, source)
+    return result
+
+def _is_def_eq_core(target: Expr, source: Expr, def_pool: dict[str, Expr], used_free_symbols: set[str], level_constraints: LevelConstraints):
+    result = yield from _quick_is_def_eq(target, source, def_pool, used_free_symbols, level_constraints)
+    if result is not None:
+        return result
+    target, source = _whnf_core(target), _whnf_core(source)
+    # lazy delta: 每次只展开一层, 优先展开高度更大的定义
+    while True:
+        result = yield from _quick_is_def_eq(target, source, def_pool, used_free_symbols, level_constraints)
+        if result is not None:
+            return result
+        target_label = _get_definition_head(target, def_pool)
+        source_label = _get_definition_head(source, def_pool)
+        if target_label is None and source_label is None:
+            break
+        if target_label is not None and source_label is not None:
+            if target_label == source_label and (yield _is_def_eq_args(target, source, def_pool, used_free_symbols, level_constraints)):
+                return True
+            target_height = _definition_height(target_label, def_pool)
+            source_height = _definition_height(source_label, def_pool)
+            if target_height >= source_height:
+                target = _unfold_head(target, def_pool, used_free_symbols)
+            if source_height >= target_height:
+                source = _unfold_head(source, def_pool, used_free_symbols)
+        elif target_label is not None:
+            target = _unfold_head(target, def_pool, used_free_symbols)
+        else:
+            source = _unfold_head(source, def_pool, used_free_symbols)
+    # 两边都是弱头范式
+    if target.tag == APP and source.tag == APP:
+        return (yield _is_def_eq_args(target, source, def_pool, used_free_symbols, level_constraints))
+    # eta: (x : A) => f x 与 f 相等
+    if target.tag == LAMBDA and source.tag != LAMBDA:
+        return (yield _is_def_eq(target.body, App(shift_expr(source), BoundVar(0)), def_pool, used_free_symbols, level_constraints))
+    if source.tag == LAMBDA and target.tag != LAMBDA:
+        return (yield _is_def_eq(App(shift_expr(target), BoundVar(0)), source.body, def_pool, used_free_symbols, level_constraints))
     return False
 
-@log_execution_time
+@profile
+def DefEq(target: Expr, source: Expr, context: list[Arg], type_pool: dict[str, Expr], def_pool: dict[str, Expr], used_free_symbols: set[str]=None, level_constraints: LevelConstraints = None) -> bool:
+    """定义相等: beta, 按需的 delta 展开和 eta. 产生的 level 约束加入约束存储, 不相等时约束存储保持不变"""
+    if level_constraints is None:
+        level_constraints = LevelConstraints()
+    if def_pool is None:
+        def_pool = {}
+    if target.tag == ARG:
+        target = target.type
+    if source.tag == ARG:
+        source = source.type
+    # 结构相同时只需要处理 Sort 的 level 约束
+    if target == source and level_constraints.add_all(get_sort_eq_conditions(target, source)):
+        return True
+    if used_free_symbols is None:
+        used_free_symbols = get_level_symbols(target) | get_level_symbols(source)
+    state = level_constraints.save()
+    if run(_is_def_eq(target, source, def_pool, used_free_symbols, level_constraints)):
+        return True
+    level_constraints.restore(state)
+    return False
+
+@profile
 def shift_expr(expr: Expr, offset: int = 0, step: int = 1):
-    if step == 0:
-        return expr
-    if isinstance(expr, Sort):
-        return expr
-    elif isinstance(expr, Const):
-        return expr
-    elif isinstance(expr, Arg):
-        return Arg(shift_expr(expr.type, offset=offset, step=step), expr.name)
-    elif isinstance(expr, BoundVar):
-        if expr.index >= offset:
-            return BoundVar(expr.index + step)
+    # 不含下标 >= offset 的 BoundVar 的子项不需要重建
+    if step == 0 or expr.loose_bvar_range <= offset:
         return expr
-    elif isinstance(expr, Forall):
-        shifted_var_type = shift_expr(expr.var_type, offset=offset, step=step)
-        shifted_body = shift_expr(expr.body, offset=offset + 1, step=step)
-        return Forall(shifted_var_type, shifted_body)
-    elif isinstance(expr, Lambda):
-        shifted_var_type = shift_expr(expr.var_type, offset=offset, step=step)
-        shifted_body = shift_expr(expr.body, offset=offset + 1, step=step)
-        return Lambda(shifted_var_type, shifted_body)
-    elif isinstance(expr, App):
-        shifted_func = shift_expr(expr.func, offset=offset, step=step)
-        shifted_arg = shift_expr(expr.arg, offset=offset, step=step)
-        return App(shifted_func, shifted_arg)
-    else:
-        raise ValueError("Unknown expr", expr)
 
-@log_execution_time
+    def shift(node: Expr, depth: int) -> Expr | None:
+        if node.loose_bvar_range <= depth:
+            return node
+        if node.tag == BOUNDVAR:
+            return BoundVar(node.index + step)
+        return None
+
+    return replace(expr, shift, offset)
+
+@profile
 def unshift_expr(expr: Expr, offset: int, head: Expr):
-    if isinstance(expr, Sort):
-        return expr
-    elif isinstance(expr, Const):
+    if expr.loose_bvar_range <= offset:
         return expr
-    elif isinstance(expr, Arg):
-        return Arg(unshift_expr(expr.type, offset=offset, head=head), expr.name)
-    elif isinstance(expr, BoundVar):
-        if expr.index >= offset:
-            if expr.index == offset:
-                return shift_expr(head, offset=0, step=offset)
-            return BoundVar(expr.index - 1)
+
+    def unshift(node: Expr, depth: int) -> Expr | None:
+        if node.loose_bvar_range <= depth:
+            return node
+        if node.tag == BOUNDVAR:
+            if node.index == depth:
+                return shift_expr(head, offset=0, step=depth)
+            return BoundVar(node.index - 1)
+        return None
+
+    return replace(expr, unshift, offset)
+
+def instantiate_expr(expr: Expr, args: list[Expr], offset: int = 0) -> Expr:
+    # 一次代入多个绑定变量: 在深度 offset 处, #(offset+i) 替换为 args[-1-i], 更外层的变量下标减去 len(args)
+    # 等价于依次对 args 中每个参数调用 unshift_expr, 但只遍历一次
+    num_args = len(args)
+    if num_args == 0 or expr.loose_bvar_range <= offset:
         return expr
-    elif isinstance(expr, Forall):
-        shifted_var_type = unshift_expr(expr.var_type, offset=offset, head=head)
-        shifted_body = unshift_expr(expr.body, offset=offset + 1, head=head)
-        return Forall(shifted_var_type, shifted_body)
-    elif isinstance(expr, Lambda):
-        shifted_var_type = unshift_expr(expr.var_type, offset=offset, head=head)
-        shifted_body = unshift_expr(expr.body, offset=offset + 1, head=head)
-        return Lambda(shifted_var_type, shifted_body)
-    elif isinstance(expr, App):
-        shifted_func = unshift_expr(expr.func, offset=offset, head=head)
-        shifted_arg = unshift_expr(expr.arg, offset=offset, head=head)
-        return App(shifted_func, shifted_arg)
-    return expr
-
-@log_execution_time
-def proof_step(action: Expr, goal: Expr, diff_context: Context[Arg] = None, same_context: Context[Arg] = None, type_pool:dict[str,Expr]=None, def_pool:dict[str,Expr]=None) -> list[Expr] | None:
+
+    def instantiate(node: Expr, depth: int) -> Expr | None:
+        if node.loose_bvar_range <= depth:
+            return node
+        if node.tag == BOUNDVAR:
+            if node.index >= depth + num_args:
+                return BoundVar(node.index - num_args)
+            return shift_expr(args[num_args - 1 - (node.index - depth)], offset=0, step=depth)
+        return None
+
+    return replace(expr, instantiate, offset)
+
+@profile
+def proof_step(action: Expr, goal: Expr, diff_context: Context[Arg] = None, same_context: Context[Arg] = None, type_pool:dict[str,Expr]=None, def_pool:dict[str,Expr]=None, level_constraints: LevelConstraints = None) -> list[Expr] | None:
     if diff_context is None:
         diff_context = Context[Arg]()
     if same_context is None:
         same_context = Context[Arg]()
-    if DefEq(action, goal, diff_context + same_context, type_pool, def_pool):
-        goals: list[Expr] = []
-        for arg in diff_context:
-            goals = [Forall(arg, goal) for goal in goals]
-            goals.append(arg.type)
-        for arg in same_context:
-            goals = [Forall(arg, goal) for goal in goals]
-        return goals
-    if isinstance(action, Forall):
-        if len(diff_context) == 0 and isinstance(goal, Forall) and DefEq(action.var_type, goal.var_type, diff_context + same_context, type_pool, def_pool):
+    if level_constraints is None:
+        level_constraints = LevelConstraints()
+    if def_pool is None:
+        def_pool = {}
+    # DefEq 使用的完整上下文只拼接一次, 之后与 same_context/diff_context 同步压入
+    context = diff_context + same_context
+    # 沿着 action 的 Forall 链逐层匹配, 用循环代替尾递归
+    while True:
+        if DefEq(action, goal, context, type_pool, def_pool, level_constraints=level_constraints):
+            goals: list[Expr] = []
+            for arg in diff_context:
+                goals = [Forall(arg, goal) for goal in goals]
+                goals.append(arg.type)
+            for arg in same_context:
+                goals = [Forall(arg, goal) for goal in goals]
+            return goals
+        # 定义不会被提前展开, 需要 Forall 结构时再化简到弱头范式
+        if action.tag != FORALL:
+            action = whnf(action, def_pool)
+        if action.tag != FORALL:
+            # 什么都没证明 
+            return None
+        if len(diff_context) == 0 and goal.tag != FORALL:
+            goal = whnf(goal, def_pool)
+        if len(diff_context) == 0 and goal.tag == FORALL and DefEq(action.var_type, goal.var_type, context, type_pool, def_pool, level_constraints=level_constraints):
             same_context.push(action.var_type)
-            return proof_step(action.body, goal.body, diff_context, same_context, type_pool, def_pool)
+            context.push(action.var_type)
+            action, goal = action.body, goal.body
         else:
             diff_context.push(action.var_type)
-            return proof_step(action.body, shift_expr(goal), diff_context, same_context, type_pool, def_pool)
-    # 什么都没证明 
-    return None
+            context.push(action.var_type)
+            action, goal = action.body, shift_expr(goal)
 
 if __name__ == "__main__":
     Prop = Sort(0)
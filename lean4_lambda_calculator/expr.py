@@ -5,25 +5,66 @@ Date: 2024-12-12
 License: MIT
 """
 
-from lean4_lambda_calculator.level import Level, level_subs_symbols, Eq
+from lean4_lambda_calculator.level import Level
 from lean4_lambda_calculator.Context import Context
+from lean4_lambda_calculator.traversal import SORT, CONST, BOUNDVAR, ARG, FORALL, LAMBDA, APP, walk, fold, replace
+from lean4_lambda_calculator.cache import LRUCache
+from lean4_lambda_calculator.profiler import profiler
+import weakref
+
+# 哈希共享 (hash-consing) 表: 结构相同(包括变量名)的节点只会存在一个实例.
+# 键中的子节点用 id 表示, 由于值节点强引用了子节点, 只要表项存活 id 就不会被复用.
+_intern_table: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+_set_field = object.__setattr__
+
+def _intern(cls, key: tuple, expr_hash: int, loose_bvar_range: int, *values):
+    node = _intern_table.get(key)
+    if node is None:
+        node = object.__new__(cls)
+        for field, value in zip(cls.__slots__, values):
+            _set_field(node, field, value)
+        _set_field(node, "_hash", expr_hash)
+        _set_field(node, "loose_bvar_range", loose_bvar_range)
+        _intern_table[key] = node
+    return node
 
 class Expr:
+    # 使用 __slots__ 去掉每个实例的 __dict__, 节点在构造时计算一次哈希, 之后不可修改
+    # loose_bvar_range: 未被绑定的 BoundVar 的最大下标加一, 为 0 表示闭项
+    __slots__ = ("_hash", "loose_bvar_range", "__weakref__")
+    tag: int = -1
+
     def __hash__(self):
-        return hash(repr(self))  # 默认以 __repr__ 为基础计算哈希
-    
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
     @property
     def predicate(self) -> int:
         return -1
 
 class Sort(Expr):
-    def __init__(self, level: str | int | Level):
-        if isinstance(level, Level):
-            self.level: Level = level
-        else:
-            self.level: Level = Level(level)
-    
+    __slots__ = ("level",)
+    tag = SORT
+
+    def __new__(cls, level: str | int | Level):
+        if not isinstance(level, Level):
+            level = Level(level)
+        key = (Sort, repr(level))
+        return _intern(cls, key, hash(key), 0, level)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (Sort, (self.level,))
+
     def __eq__(self, value):
+        if self is value:
+            return True
         if isinstance(value, Sort):
             return self.level == value.level
         return False
@@ -36,10 +77,21 @@ class Sort(Expr):
         return 100
 
 class Const(Expr):
-    def __init__(self, label: str):
-        self.label = label
-    
+    __slots__ = ("label",)
+    tag = CONST
+
+    def __new__(cls, label: str):
+        key = (Const, label)
+        return _intern(cls, key, hash(key), 0, label)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (Const, (self.label,))
+
     def __eq__(self, value):
+        if self is value:
+            return True
         if isinstance(value, Const) and self.label == value.label:
             return True
         return False
@@ -52,11 +104,21 @@ class Const(Expr):
         return 100
 
 class BoundVar(Expr):
-    def __init__(self, index: int, name: str = None):
-        self.index = index
-        self.name = name
-    
+    __slots__ = ("index", "name")
+    tag = BOUNDVAR
+
+    def __new__(cls, index: int, name: str = None):
+        # 名字不参与相等判断, 因此也不参与哈希
+        return _intern(cls, (BoundVar, index, name), hash((BoundVar, index)), index + 1, index, name)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (BoundVar, (self.index, self.name))
+
     def __eq__(self, value):
+        if self is value:
+            return True
         if isinstance(value, BoundVar) and self.index == value.index:
             return True
         return False
@@ -69,19 +131,23 @@ class BoundVar(Expr):
         return 100
 
 class Arg(Expr):
-    def __init__(self, type: Expr, name: str | None = None):
-        self.type = type
-        self.name = name
-    
+    __slots__ = ("type", "name")
+    tag = ARG
+
+    def __new__(cls, type: Expr, name: str | None = None):
+        # Arg 与其类型相等, 所以哈希与类型的哈希一致
+        return _intern(cls, (Arg, id(type), name), type._hash, type.loose_bvar_range, type, name)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (Arg, (self.type, self.name))
+
     def __eq__(self, value):
-        if isinstance(value, Arg):
-            return self.type == value.type
-        return self.type == value 
-    
+        return _expr_eq(self, value)
+
     def __repr__(self) -> str:
-        if self.name is None:
-            return f"{self.type}"
-        return f"{self.name} : {self.type}"
+        return _format_expr(self, None, True)
     
     @property
     def predicate(self) -> int:
@@ -90,212 +156,232 @@ class Arg(Expr):
         return 0
 
 class Forall(Expr):
-    def __init__(self, var_type: Expr, body: Expr):
-        if isinstance(var_type, Arg):
-            self.var_type = var_type
-        else:
-            self.var_type = Arg(var_type, None)
-        self.body = body
+    __slots__ = ("var_type", "body")
+    tag = FORALL
+
+    def __new__(cls, var_type: Expr, body: Expr):
+        if not isinstance(var_type, Arg):
+            var_type = Arg(var_type, None)
+        key = (Forall, id(var_type), id(body))
+        loose_bvar_range = max(var_type.loose_bvar_range, body.loose_bvar_range - 1)
+        return _intern(cls, key, hash((Forall, var_type._hash, body._hash)), loose_bvar_range, var_type, body)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (Forall, (self.var_type, self.body))
 
     def __eq__(self, value):
-        if isinstance(value, Forall) and self.var_type == value.var_type and self.body == value.body:
-            return True
-        return False
+        return _expr_eq(self, value)
 
     def __repr__(self) -> str:
-        # Forall 是右结合的，所以左边表达式判断包含等号，右边表达式判断不包含等号
-        if self.var_type.predicate <= self.predicate:
-            left = f"({self.var_type})"
-        else:
-            left = f"{self.var_type}"
-        if self.body.predicate < self.predicate:
-            right = f"({self.body})"
-        else:
-            right = f"{self.body}"
-        return f"{left} -> {right}"
+        return _format_expr(self, None, True)
 
     @property
     def predicate(self) -> int:
         return 1
 
 class Lambda(Expr):
-    def __init__(self, var_type: Expr, body: Expr):
-        if isinstance(var_type, Arg):
-            self.var_type = var_type
-        else:
-            self.var_type = Arg(var_type, None)
-        self.body = body
+    __slots__ = ("var_type", "body")
+    tag = LAMBDA
+
+    def __new__(cls, var_type: Expr, body: Expr):
+        if not isinstance(var_type, Arg):
+            var_type = Arg(var_type, None)
+        key = (Lambda, id(var_type), id(body))
+        loose_bvar_range = max(var_type.loose_bvar_range, body.loose_bvar_range - 1)
+        return _intern(cls, key, hash((Lambda, var_type._hash, body._hash)), loose_bvar_range, var_type, body)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (Lambda, (self.var_type, self.body))
 
     def __eq__(self, value):
-        if isinstance(value, Lambda) and self.var_type == value.var_type and self.body == value.body:
-            return True
-        return False
+        return _expr_eq(self, value)
 
     def __repr__(self) -> str:
-        # Lambda 是右结合的，所以左边表达式判断包含等号，右边表达式判断不包含等号
-        if self.var_type.predicate <= self.predicate:
-            left = f"({self.var_type})"
-        else:
-            left = f"{self.var_type}"
-        if self.body.predicate < self.predicate:
-            right = f"({self.body})"
-        else:
-            right = f"{self.body}"
-        return f"{left} => {right}"
+        return _format_expr(self, None, True)
 
     @property
     def predicate(self) -> int:
         return 2
 
 class App(Expr):
-    def __init__(self, func: Expr, arg: Expr):
-        self.func = func
-        self.arg = arg
+    __slots__ = ("func", "arg")
+    tag = APP
+
+    def __new__(cls, func: Expr, arg: Expr):
+        key = (App, id(func), id(arg))
+        loose_bvar_range = max(func.loose_bvar_range, arg.loose_bvar_range)
+        return _intern(cls, key, hash((App, func._hash, arg._hash)), loose_bvar_range, func, arg)
+
+    __hash__ = Expr.__hash__
+
+    def __reduce__(self):
+        return (App, (self.func, self.arg))
 
     def __eq__(self, value):
-        if isinstance(value, App) and self.func == value.func and self.arg == value.arg:
-            return True
-        return False
+        return _expr_eq(self, value)
 
     def __repr__(self) -> str:
-        # App 是左结合的，所以右边表达式判断包含等号，左边表达式判断不包含等号
-        if self.func.predicate < self.predicate:
-            left = f"({self.func})"
-        else:
-            left = f"{self.func}"
-        if self.arg.predicate <= self.predicate:
-            right = f"({self.arg})"
-        else:
-            right = f"{self.arg}"
-        return f"{left} {right}"
+        return _format_expr(self, None, True)
 
     @property
     def predicate(self) -> int:
         return 3
 
+def _expr_eq(left: Expr, right) -> bool:
+    # 结构相等, 忽略变量名. 用显式栈逐对比较子项, 深层嵌套的项不会触及递归上限
+    stack = [(left, right)]
+    while stack:
+        left, right = stack.pop()
+        if left is right:
+            continue
+        if not isinstance(right, Expr):
+            return False
+        if left.tag == ARG:
+            # Arg 与其类型相等
+            left = left.type
+            if right.tag == ARG:
+                right = right.type
+            stack.append((left, right))
+            continue
+        tag = left.tag
+        if right.tag != tag:
+            return False
+        if tag == APP:
+            stack.append((left.arg, right.arg))
+            stack.append((left.func, right.func))
+        elif tag == FORALL or tag == LAMBDA:
+            stack.append((left.body, right.body))
+            stack.append((left.var_type, right.var_type))
+        elif not left == right:
+            return False
+    return True
+
 # 优先级: Sort == Const == BoundVar > App > Lambda > Forall > Arg
-def print_expr_by_name(expr: Expr, context: Context[Arg] = None) -> str:
-    if context is None:
-        context = Context[Arg]()
-    if isinstance(expr, Sort) or isinstance(expr, Const):
-        return str(expr)
-    elif isinstance(expr, Arg):
-        if expr.name is None:
-            return f"{print_expr_by_name(expr.type, context)}"
-        return f"{expr.name} : {print_expr_by_name(expr.type, context)}"
-    elif isinstance(expr, BoundVar):
-        assert expr.index < len(context), "Out of bound 3"
-        pair = context[expr.index]
-        if pair.name is None:
-            return str(expr)
-        return str(pair.name)
-    elif isinstance(expr, App):
-        if expr.func.predicate < expr.predicate:
-            left = f"({print_expr_by_name(expr.func, context)})"
-        else:
-            left = f"{print_expr_by_name(expr.func, context)}"
-        if expr.arg.predicate <= expr.predicate:
-            right = f"({print_expr_by_name(expr.arg, context)})"
-        else:
-            right = f"{print_expr_by_name(expr.arg, context)}"
-        return f"{left} {right}"
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        if expr.var_type.predicate <= expr.predicate:
-            left = f"({print_expr_by_name(expr.var_type, context)})"
-        else:
-            left = f"{print_expr_by_name(expr.var_type, context)}"
-        context.push(expr.var_type)
-        if expr.body.predicate < expr.predicate:
-            right = f"({print_expr_by_name(expr.body, context)})"
-        else:
-            right = f"{print_expr_by_name(expr.body, context)}"
-        context.pop()
-        if isinstance(expr, Lambda):
-            return f"{left} => {right}"
+def _format_expr(expr: Expr, binders: list[Arg] | None, show_names: bool) -> str:
+    # binders 为 None 时 BoundVar 打印为下标, 否则打印为对应绑定变量的名字
+    # show_names 为 False 时不打印 Arg 的名字
+    # 先序输出: 栈中是待输出的字符串, 待展开的节点和绑定变量的压入/弹出标记, 最后一次拼接
+    by_name = binders is not None
+    parts: list[str] = []
+    stack: list = [expr]
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            parts.append(item)
+            continue
+        if item.__class__ is tuple:
+            if item:
+                binders.append(item[0])
+            else:
+                binders.pop()
+            continue
+        tag = item.tag
+        if tag == BOUNDVAR:
+            if by_name:
+                assert item.index < len(binders), "Out of bound 3"
+                name = binders[-1 - item.index].name
+                if name is not None:
+                    parts.append(str(name))
+                    continue
+            parts.append(f"#{item.index}")
+        elif tag == ARG:
+            if show_names and item.name is not None:
+                parts.append(item.name)
+                parts.append(" : ")
+            stack.append(item.type)
+        elif tag == APP:
+            # App 是左结合的，所以右边表达式判断包含等号，左边表达式判断不包含等号
+            if item.arg.predicate <= item.predicate:
+                stack.append(")")
+                stack.append(item.arg)
+                stack.append(" (")
+            else:
+                stack.append(item.arg)
+                stack.append(" ")
+            if item.func.predicate < item.predicate:
+                parts.append("(")
+                stack.append(")")
+            stack.append(item.func)
+        elif tag == LAMBDA or tag == FORALL:
+            # Lambda 和 Forall 是右结合的，所以左边表达式判断包含等号，右边表达式判断不包含等号
+            if by_name:
+                stack.append(())
+            if item.body.predicate < item.predicate:
+                stack.append(")")
+                stack.append(item.body)
+                stack.append("(")
+            else:
+                stack.append(item.body)
+            if by_name:
+                stack.append((item.var_type,))
+            stack.append(" => " if tag == LAMBDA else " -> ")
+            var_type = item.var_type if show_names else item.var_type.type
+            if var_type.predicate <= item.predicate:
+                parts.append("(")
+                stack.append(")")
+            stack.append(var_type)
         else:
-            return f"{left} -> {right}"
-    
+            parts.append(str(item))
+    return "".join(parts)
+
+def print_expr_by_name(expr: Expr, context: Context[Arg] = None) -> str:
+    binders = [] if context is None else list(context)[::-1]
+    return _format_expr(expr, binders, True)
+
 def print_expr_by_index(expr: Expr) -> str:
-    if isinstance(expr, Sort) or isinstance(expr, Const):
-        return str(expr)
-    elif isinstance(expr, Arg):
-        return f"{print_expr_by_index(expr.type)}"
-    elif isinstance(expr, BoundVar):
-        return f"#{expr.index}"
-    elif isinstance(expr, App):
-        if expr.func.predicate < expr.predicate:
-            left = f"({print_expr_by_index(expr.func)})"
-        else:
-            left = f"{print_expr_by_index(expr.func)}"
-        if expr.arg.predicate <= expr.predicate:
-            right = f"({print_expr_by_index(expr.arg)})"
-        else:
-            right = f"{print_expr_by_index(expr.arg)}"
-        return f"{left} {right}"
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        if expr.var_type.type.predicate <= expr.predicate:
-            left = f"({print_expr_by_index(expr.var_type.type)})"
-        else:
-            left = f"{print_expr_by_index(expr.var_type.type)}"
-        if expr.body.predicate < expr.predicate:
-            right = f"({print_expr_by_index(expr.body)})"
-        else:
-            right = f"{print_expr_by_index(expr.body)}"
-        if isinstance(expr, Lambda):
-            return f"{left} => {right}"
-        else:
-            return f"{left} -> {right}"
+    return _format_expr(expr, None, False)
 
-def expr_rename_args(expr: Expr):
+def expr_rename_args(expr: Expr) -> Expr:
     # 1. 获取所有使用的变量
     # 2. 保留已经命名过的使用变量
     # 3. 为没有命名的使用变量赋予新的名字 
+    # 节点不可修改, 返回重新命名后的表达式
     used_vars = _get_used_args(expr, [])
     used_names = set([var.name for var in used_vars if var.name is not None])
-    _arg_set_name(expr, used_vars, used_names)
-    return
+    return _arg_set_name(expr, used_vars, used_names)
 
 def _get_used_args(expr: Expr, context: list[Arg]) -> list[Arg]:
-    if isinstance(expr, Sort) or isinstance(expr, Const):
-        return []
-    elif isinstance(expr, Arg):
-        return _get_used_args(expr.type, context)
-    elif isinstance(expr, BoundVar):
-        assert expr.index < len(context), "Out of bound 4"
-        return [context[expr.index]]
-    elif isinstance(expr, App):
-        return _get_used_args(expr.func, context) + _get_used_args(expr.arg, context)
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        return _get_used_args(expr.var_type, context) + _get_used_args(expr.body, [expr.var_type] + context)
-    return []
-
-def _arg_set_name(expr: Expr, used_vars: list[Arg], used_names: set[str]):
-    if isinstance(expr, Sort) or isinstance(expr, Const):
-        return
-    elif isinstance(expr, Arg):
-        if expr in used_vars:
-            if expr.name is None:
-                expr.name = _get_new_name(expr.type, used_names)
+    # context[0] 是最内层的绑定变量, 按出现顺序返回被引用的绑定变量
+    used_vars: list[Arg] = []
+
+    def visit(node: Expr, results: list, binders: list[Arg]):
+        if node.tag == BOUNDVAR:
+            assert node.index < len(binders), "Out of bound 4"
+            used_vars.append(binders[-1 - node.index])
+
+    fold(expr, visit, context[::-1])
+    return used_vars
+
+def _arg_set_name(expr: Expr, used_vars: list[Arg], used_names: set[str]) -> Expr:
+    def set_name(node: Expr, depth: int) -> Expr | None:
+        if node.tag != ARG:
+            return None
+        if node in used_vars:
+            name = node.name
+            if name is None:
+                name = _get_new_name(node.type, used_names)
         else:
-            expr.name = None
-        _arg_set_name(expr.type, used_vars, used_names)
-    elif isinstance(expr, App):
-        _arg_set_name(expr.func, used_vars, used_names)
-        _arg_set_name(expr.arg, used_vars, used_names)
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        _arg_set_name(expr.var_type, used_vars, used_names)
-        _arg_set_name(expr.body, used_vars, used_names)
+            name = None
+        # 先确定名字再处理类型, 与先序的命名顺序一致; 只有 binder 类型中的 binder 会嵌套调用
+        # 每次出现都分配新名字, 不能按节点缓存
+        return Arg(replace(node.type, set_name, memoize=False), name)
+
+    return replace(expr, set_name, memoize=False)
 
 def _get_new_name(expr_type: Expr, used_names: set[str]) -> tuple[str, int]:
     index = 0
     while True:
-        if isinstance(expr_type, Sort):
+        if expr_type.tag == SORT:
             name = f's{index}'
             if name not in used_names:
                 used_names.add(name)
                 return name
             index += 1
-        elif isinstance(expr_type, Forall):
+        elif expr_type.tag == FORALL:
             name = f"f{index}"
             if name not in used_names:
                 used_names.add(name)
@@ -317,160 +403,169 @@ def _get_new_name(expr_type: Expr, used_names: set[str]) -> tuple[str, int]:
             index += 1
 
 
-def expr_clean_unsed_name(expr: Expr):
+def expr_clean_unsed_name(expr: Expr) -> Expr:
     used_vars = _get_used_args(expr, [])
-    _clean_unused_name(expr, used_vars)
+    return _clean_unused_name(expr, used_vars)
 
 def expr_clean_all_names(expr: Expr) -> Expr:
-    if isinstance(expr, Arg):
-        return Arg(expr.type, None)
-    elif isinstance(expr, App):
-        return App(expr_clean_all_names(expr.func), expr_clean_all_names(expr.arg))
-    elif isinstance(expr, Lambda):
-        return Lambda(expr_clean_all_names(expr.var_type), expr_clean_all_names(expr.body))
-    elif isinstance(expr, Forall):
-        return Forall(expr_clean_all_names(expr.var_type), expr_clean_all_names(expr.body))
-    return expr
-
-def _clean_unused_name(expr: Expr, used_vars: list[Arg]):
-    if isinstance(expr, Arg):
-        if len(used_vars) == 0 or expr not in used_vars:
-            expr.name = None
-    elif isinstance(expr, App):
-        _clean_unused_name(expr.func, used_vars)
-        _clean_unused_name(expr.arg, used_vars)
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        _clean_unused_name(expr.var_type, used_vars)
-        _clean_unused_name(expr.body, used_vars)
+    def clean(node: Expr, depth: int) -> Expr | None:
+        if node.tag == ARG:
+            return Arg(node.type, None)
+        return None
+
+    return replace(expr, clean)
+
+def _clean_unused_name(expr: Expr, used_vars: list[Arg]) -> Expr:
+    def clean(node: Expr, depth: int) -> Expr | None:
+        if node.tag == ARG:
+            if len(used_vars) == 0 or node not in used_vars:
+                return Arg(node.type, None)
+            return node
+        return None
+
+    return replace(expr, clean)
 
     
-def expr_rename_level(expr: Expr, used_free_symbols: set[str]) -> Expr:
-    if len(used_free_symbols) == 0: 
-        return expr, []
-    renamed_symbols = {} 
-    new_expr = _set_new_level(expr, used_free_symbols, renamed_symbols) 
-    return new_expr, renamed_symbols.values()
-
-def _set_new_level(expr: Expr, used_free_symbols: set[str], renamed_symbols: dict[str, str]) -> Expr:
-    if isinstance(expr, Sort):
-        new_level = level_subs_symbols(expr.level, used_free_symbols, renamed_symbols)
-        return Sort(new_level)
-    elif isinstance(expr, Const):
-        return expr
-    elif isinstance(expr, Arg):
-        return Arg(_set_new_level(expr.type, used_free_symbols, renamed_symbols), expr.name)
-    elif isinstance(expr, BoundVar):
-        return expr
-    elif isinstance(expr, App):
-        return App(_set_new_level(expr.func, used_free_symbols, renamed_symbols), _set_new_level(expr.arg, used_free_symbols, renamed_symbols))
-    elif isinstance(expr, Lambda):
-        return Lambda(_set_new_level(expr.var_type, used_free_symbols, renamed_symbols), _set_new_level(expr.body, used_free_symbols, renamed_symbols))
-    elif isinstance(expr, Forall):
-        return Forall(_set_new_level(expr.var_type, used_free_symbols, renamed_symbols), _set_new_level(expr.body, used_free_symbols, renamed_symbols))
+def get_level_symbols(expr: Expr) -> set[str]:
+    symbols: set[str] = set()
+    for node in walk(expr, unique=True):
+        if node.tag == SORT:
+            symbols.update(node.level.get_variables())
+    return symbols
+
+# 常量的类型和定义在池中只存一份, 每次使用时按需实例化 level 参数.
+# 池中的项的 level 变量集合, 以及每种改名方式实例化的结果按节点缓存, 键中的节点用 id 表示,
+# 缓存项持有节点本身, 命中时用 is 确认. 同一常量以相同的 level 参数多次出现时共享同一个实例.
+_level_symbols_cache = LRUCache(maxsize=16384)
+_level_instances = LRUCache(maxsize=16384)
+profiler.register_cache("level_symbols", _level_symbols_cache)
+profiler.register_cache("level_instances", _level_instances)
+
+def _get_pool_level_symbols(expr: Expr) -> frozenset[str]:
+    entry = _level_symbols_cache.get(id(expr))
+    if entry is not None and entry[0] is expr:
+        return entry[1]
+    symbols = frozenset(get_level_symbols(expr))
+    _level_symbols_cache.put(id(expr), (expr, symbols))
+    return symbols
+
+def expr_rename_level(expr: Expr, used_free_symbols: set[str], renamed_symbols: dict[str, str] = None) -> tuple[Expr, set[str]]:
+    # 把与 used_free_symbols 冲突的 level 变量换成新名字, 返回新表达式和其中出现的全部 level 变量
+    # 同一常量的类型和定义共享 renamed_symbols, 保证两者的 level 参数一致
+    if renamed_symbols is None:
+        renamed_symbols = {}
+    symbols = _get_pool_level_symbols(expr)
+    if len(symbols) == 0:
+        return expr, set()
+    reserved = used_free_symbols | symbols | set(renamed_symbols.values())
+    for symbol in sorted(symbols & used_free_symbols):
+        if symbol not in renamed_symbols:
+            new_name = _get_new_level_name(reserved)
+            renamed_symbols[symbol] = new_name
+            reserved.add(new_name)
+    mapping = {symbol: renamed_symbols[symbol] for symbol in symbols if symbol in renamed_symbols}
+    if len(mapping) == 0:
+        return expr, set(symbols)
+    key = (id(expr), tuple(sorted(mapping.items())))
+    entry = _level_instances.get(key)
+    if entry is not None and entry[0] is expr:
+        new_expr = entry[1]
     else:
-        raise ValueError("Unknown expr", expr)
+        new_expr = _set_new_level(expr, mapping)
+        _level_instances.put(key, (expr, new_expr))
+    return new_expr, {mapping.get(symbol, symbol) for symbol in symbols}
+
+def _get_new_level_name(reserved: set[str]) -> str:
+    index = 0
+    while f"u{index}" in reserved:
+        index += 1
+    return f"u{index}"
+
+def _set_new_level(expr: Expr, mapping: dict[str, str]) -> Expr:
+    def set_level(node: Expr, depth: int) -> Expr | None:
+        if node.tag == SORT:
+            return Sort(node.level.subs(mapping))
+        return None
+
+    return replace(expr, set_level)
 
 def expr_todef(expr: Expr, def_pool: dict[str, Expr]) -> Expr:
     if def_pool is None or len(def_pool) == 0:
         return expr
-    if isinstance(expr, Sort):
-        return expr
-    elif isinstance(expr, Const):
-        if expr.label in def_pool:
-            return expr_rename_level(def_pool[expr.label], set())[0]
-        return expr
-    elif isinstance(expr, Arg):
-        return Arg(expr_todef(expr.type, def_pool), expr.name)
-    elif isinstance(expr, BoundVar):
-        return expr
-    elif isinstance(expr, App):
-        return App(expr_todef(expr.func, def_pool), expr_todef(expr.arg, def_pool))
-    elif isinstance(expr, Lambda):
-        return Lambda(expr_todef(expr.var_type, def_pool), expr_todef(expr.body, def_pool))
-    elif isinstance(expr, Forall):
-        return Forall(expr_todef(expr.var_type, def_pool), expr_todef(expr.body, def_pool))
-    else:
-        raise ValueError("Unknown expr", expr)
 
-def get_sort_eq_conditions(target: Expr, source: Expr) -> list[str]:
+    def unfold(node: Expr, depth: int) -> Expr | None:
+        if node.tag == CONST and node.label in def_pool:
+            return expr_rename_level(def_pool[node.label], set())[0]
+        return None
+
+    return replace(expr, unfold)
+
+def get_sort_eq_conditions(target: Expr, source: Expr) -> list[tuple[Level, Level]]:
     if target != source:
         return []
-    if isinstance(target, Arg):
-        target = target.type
-    if isinstance(source, Arg):
-        source = source.type
-    if isinstance(target, Sort):
-        if isinstance(source, Sort):
-            eq = Eq(target.level.symbol, source.level.symbol)
-            if eq.has_free():
-                return [str(eq)]
-        return []
-    elif isinstance(target, Const):
-        return []
-    elif isinstance(target, BoundVar):
-        return []
-    elif isinstance(target, App):
-        return get_sort_eq_conditions(target.func, source.func) + get_sort_eq_conditions(target.arg, source.arg)
-    elif isinstance(target, Lambda) or isinstance(target, Forall):
-        return get_sort_eq_conditions(target.var_type, source.var_type) + get_sort_eq_conditions(target.body, source.body)
-    else:
-        raise ValueError("Unknown expr", target)
+    # 结构相等的项的对应子项也结构相等, 只需要在最外层判断一次
+    conditions: list[tuple[Level, Level]] = []
+    stack = [(target, source)]
+    while stack:
+        target, source = stack.pop()
+        if target is source:
+            continue
+        if target.tag == ARG:
+            target = target.type
+        if source.tag == ARG:
+            source = source.type
+        if target.tag == SORT:
+            if source.tag == SORT and not target.level.is_equivalent(source.level):
+                conditions.append((target.level, source.level))
+        elif target.tag == APP:
+            stack.append((target.arg, source.arg))
+            stack.append((target.func, source.func))
+        elif target.tag in (LAMBDA, FORALL):
+            stack.append((target.body, source.body))
+            stack.append((target.var_type, source.var_type))
+    return conditions
 
 def const_to_boundvar(expr: Expr, context: list[Arg]):
-    if isinstance(expr, Sort):
-        return expr
-    elif isinstance(expr, Const):
-        for idx, arg in enumerate(context):
-            if arg.name == expr.label:
-                return BoundVar(idx)
-        return expr
-    elif isinstance(expr, Arg):
-        return Arg(const_to_boundvar(expr.type, context), expr.name)
-    elif isinstance(expr, BoundVar):
-        return expr
-    elif isinstance(expr, App):
-        return App(const_to_boundvar(expr.func, context), const_to_boundvar(expr.arg, context))
-    elif isinstance(expr, Lambda):
-        return Lambda(const_to_boundvar(expr.var_type, context), const_to_boundvar(expr.body, [expr.var_type] + context))
-    elif isinstance(expr, Forall):
-        return Forall(const_to_boundvar(expr.var_type, context), const_to_boundvar(expr.body, [expr.var_type] + context))
-    else:
-        raise ValueError("Unknown expr", expr)
-
-def set_boundvar_name(expr: Expr, context: list[Arg]) -> None:
-    # inmemory change expr
-    if isinstance(expr, Sort):
-        return
-    elif isinstance(expr, Const):
-        return
-    elif isinstance(expr, Arg):
-        return set_boundvar_name(expr.type, context)
-    elif isinstance(expr, BoundVar):
-        if expr.name is not None:
-            context[expr.index].name = expr.name
-            expr.name = None
-    elif isinstance(expr, App):
-        set_boundvar_name(expr.func, context)
-        set_boundvar_name(expr.arg, context)
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        set_boundvar_name(expr.var_type, context)
-        set_boundvar_name(expr.body, [expr.var_type] + context)
-    else:
-        raise ValueError("Unknown expr", expr)
-
-def get_all_consts(expr: Expr) -> None:
-    # inmemory change expr
-    if isinstance(expr, Sort):
-        return []
-    elif isinstance(expr, Const):
-        return [expr.label]
-    elif isinstance(expr, Arg):
-        return get_all_consts(expr.type)
-    elif isinstance(expr, BoundVar):
-        return []
-    elif isinstance(expr, App):
-        return get_all_consts(expr.func) + get_all_consts(expr.arg)
-    elif isinstance(expr, Lambda) or isinstance(expr, Forall):
-        return get_all_consts(expr.var_type) + get_all_consts(expr.body)
-    else:
-        raise ValueError("Unknown expr", expr)
+    # context[0] 是最内层的绑定变量, 与常量同名的最内层绑定变量替换为 BoundVar
+    binders = context[::-1]
+    # 不是任何绑定变量名字的常量不需要在 binders 中查找
+    binder_names = {arg.name for arg in context} | {node.name for node in walk(expr, unique=True) if node.tag == ARG}
+
+    def convert(node: Expr, depth: int) -> Expr | None:
+        if node.tag == CONST:
+            if node.label not in binder_names:
+                return node
+            for idx in range(len(binders)):
+                if binders[-1 - idx].name == node.label:
+                    return BoundVar(idx)
+            return node
+        return None
+
+    return replace(expr, convert, binders=binders)
+
+def set_boundvar_name(expr: Expr, context: list[list[str | None]] = None) -> Expr:
+    # 把 `#i:name` 形式的变量名转移到对应的绑定变量 Arg 上
+    # 节点不可修改, binders 中保存的是每个绑定变量名字的可变单元, 返回新的表达式
+    binders = [] if context is None else context[::-1]
+
+    def visit(node: Expr, results: list, binders: list[list[str | None]]) -> Expr:
+        tag = node.tag
+        if tag == BOUNDVAR:
+            if node.name is not None:
+                binders[-1 - node.index][0] = node.name
+                return BoundVar(node.index)
+            return node
+        elif tag == ARG:
+            return Arg(results[0], node.name)
+        elif tag == APP:
+            return App(results[0], results[1])
+        elif tag in (LAMBDA, FORALL):
+            # body 已经处理完, 栈顶的名字单元就是这个 binder 最终的名字
+            return type(node)(Arg(results[0].type, binders[-1][0]), results[1])
+        return node
+
+    return fold(expr, visit, binders, bind=lambda node: [node.var_type.name])
+
+def get_all_consts(expr: Expr) -> list[str]:
+    # 按第一次出现的顺序返回, 共享的子项只遍历一次
+    return [node.label for node in walk(expr, unique=True) if node.tag == CONST]
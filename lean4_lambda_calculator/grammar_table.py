@@ -0,0 +1,1316 @@
+# -*- coding: utf-8 -*-
+# 由 python -m lean4_lambda_calculator.parser --generate-table 生成, 不要手动修改.
+# lark 1.3.1
+GRAMMAR_SHA256 = 'aaf06b4ba285d748a50192562b2013e0e520e7929208759d141b2a2318b7146d'
+
+DATA = {'__type__': 'Lark',
+ 'options': {'_plugins': {},
+             'ambiguity': 'auto',
+             'cache': False,
+             'cache_grammar': False,
+             'debug': False,
+             'edit_terminals': None,
+             'g_regex_flags': 0,
+             'import_paths': [],
+             'keep_all_tokens': False,
+             'lexer': 'contextual',
+             'lexer_callbacks': {},
+             'maybe_placeholders': True,
+             'ordered_sets': True,
+             'parser': 'lalr',
+             'postlex': None,
+             'priority': 'normal',
+             'propagate_positions': False,
+             'regex': False,
+             'source_path': None,
+             'start': ['start'],
+             'strict': False,
+             'transformer': None,
+             'tree_class': None,
+             'use_bytes': False},
+ 'parser': {'__type__': 'ParsingFrontend',
+            'lexer_conf': {'__type__': 'LexerConf',
+                           'g_regex_flags': 0,
+                           'ignore': ['WS'],
+                           'lexer_type': 'contextual',
+                           'terminals': [{'@': 0},
+                                         {'@': 1},
+                                         {'@': 2},
+                                         {'@': 3},
+                                         {'@': 4},
+                                         {'@': 5},
+                                         {'@': 6},
+                                         {'@': 7},
+                                         {'@': 8},
+                                         {'@': 9},
+                                         {'@': 10},
+                                         {'@': 11},
+                                         {'@': 12},
+                                         {'@': 13},
+                                         {'@': 14},
+                                         {'@': 15},
+                                         {'@': 16}],
+                           'use_bytes': False},
+            'parser': {'end_states': {'start': 2},
+                       'start_states': {'start': 50},
+                       'states': {0: {0: (0, 78), 1: (0, 77)},
+                                  1: {2: (0, 57)},
+                                  2: {},
+                                  3: {3: (0, 79), 4: (0, 86), 5: (0, 20), 6: (0, 85), 7: (0, 44), 8: (0, 37)},
+                                  4: {2: (0, 27),
+                                      5: (0, 5),
+                                      6: (0, 85),
+                                      9: (0, 83),
+                                      10: (0, 15),
+                                      11: (0, 26),
+                                      12: (0, 35),
+                                      13: (0, 63),
+                                      14: (0, 13),
+                                      15: (0, 8),
+                                      16: (0, 19),
+                                      17: (0, 55),
+                                      18: (0, 51),
+                                      19: (0, 84),
+                                      20: (0, 46),
+                                      21: (0, 6),
+                                      22: (0, 1),
+                                      23: (0, 64)},
+                                  5: {1: (1, {'@': 53}),
+                                      2: (1, {'@': 53}),
+                                      6: (1, {'@': 53}),
+                                      19: (1, {'@': 53}),
+                                      22: (1, {'@': 53}),
+                                      24: (1, {'@': 53}),
+                                      25: (1, {'@': 53}),
+                                      26: (1, {'@': 53}),
+                                      27: (1, {'@': 53}),
+                                      28: (1, {'@': 53})},
+                                  6: {1: (0, 36)},
+                                  7: {27: (1, {'@': 22})},
+                                  8: {1: (1, {'@': 29}),
+                                      2: (1, {'@': 29}),
+                                      6: (1, {'@': 29}),
+                                      19: (1, {'@': 29}),
+                                      22: (1, {'@': 29}),
+                                      24: (1, {'@': 29}),
+                                      25: (1, {'@': 29}),
+                                      26: (0, 21)},
+                                  9: {24: (1, {'@': 44}), 25: (1, {'@': 36})},
+                                  10: {1: (1, {'@': 41}), 24: (1, {'@': 41}), 27: (1, {'@': 41}), 28: (1, {'@': 41})},
+                                  11: {27: (1, {'@': 19})},
+                                  12: {27: (1, {'@': 18})},
+                                  13: {1: (1, {'@': 26}), 24: (1, {'@': 48}), 27: (1, {'@': 26}), 28: (1, {'@': 26})},
+                                  14: {1: (1, {'@': 39}),
+                                       2: (0, 75),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       10: (0, 15),
+                                       15: (0, 81),
+                                       16: (0, 38),
+                                       19: (0, 84),
+                                       20: (0, 60),
+                                       22: (0, 1),
+                                       23: (0, 64),
+                                       24: (1, {'@': 39}),
+                                       25: (1, {'@': 39}),
+                                       27: (1, {'@': 39}),
+                                       28: (1, {'@': 39})},
+                                  15: {1: (1, {'@': 30}),
+                                       2: (1, {'@': 30}),
+                                       6: (1, {'@': 30}),
+                                       19: (1, {'@': 30}),
+                                       22: (1, {'@': 30}),
+                                       24: (1, {'@': 30}),
+                                       25: (1, {'@': 30}),
+                                       27: (1, {'@': 30}),
+                                       28: (1, {'@': 30})},
+                                  16: {1: (0, 32)},
+                                  17: {1: (1, {'@': 35}), 24: (1, {'@': 35}), 27: (1, {'@': 35}), 28: (1, {'@': 35})},
+                                  18: {1: (1, {'@': 52}),
+                                       2: (1, {'@': 52}),
+                                       6: (1, {'@': 52}),
+                                       19: (1, {'@': 52}),
+                                       22: (1, {'@': 52}),
+                                       24: (1, {'@': 52}),
+                                       25: (1, {'@': 52}),
+                                       27: (1, {'@': 52}),
+                                       28: (1, {'@': 52})},
+                                  19: {1: (1, {'@': 24}),
+                                       2: (1, {'@': 33}),
+                                       6: (1, {'@': 33}),
+                                       19: (1, {'@': 33}),
+                                       22: (1, {'@': 33}),
+                                       24: (1, {'@': 46}),
+                                       25: (1, {'@': 38}),
+                                       27: (1, {'@': 24}),
+                                       28: (1, {'@': 24})},
+                                  20: {0: (1, {'@': 58}), 1: (1, {'@': 58}), 29: (1, {'@': 58})},
+                                  21: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 56),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  22: {0: (1, {'@': 56}), 1: (1, {'@': 56}), 29: (1, {'@': 56})},
+                                  23: {1: (0, 82)},
+                                  24: {1: (1, {'@': 29}),
+                                       2: (1, {'@': 29}),
+                                       6: (1, {'@': 29}),
+                                       19: (1, {'@': 29}),
+                                       22: (1, {'@': 29}),
+                                       24: (1, {'@': 29}),
+                                       25: (1, {'@': 29}),
+                                       26: (0, 71)},
+                                  25: {5: (0, 73), 6: (0, 85)},
+                                  26: {25: (0, 87)},
+                                  27: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 24),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 16),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  28: {1: (0, 9)},
+                                  29: {26: (0, 42), 28: (0, 72)},
+                                  30: {27: (1, {'@': 23})},
+                                  31: {1: (1, {'@': 51}), 24: (1, {'@': 45}), 27: (1, {'@': 51}), 28: (1, {'@': 51})},
+                                  32: {1: (1, {'@': 49}),
+                                       2: (1, {'@': 34}),
+                                       6: (1, {'@': 34}),
+                                       19: (1, {'@': 34}),
+                                       22: (1, {'@': 34}),
+                                       24: (1, {'@': 49}),
+                                       25: (1, {'@': 40}),
+                                       27: (1, {'@': 49}),
+                                       28: (1, {'@': 49})},
+                                  33: {5: (0, 29), 6: (0, 85)},
+                                  34: {0: (1, {'@': 60}), 1: (1, {'@': 60}), 29: (1, {'@': 60})},
+                                  35: {25: (1, {'@': 37})},
+                                  36: {1: (1, {'@': 40}),
+                                       2: (1, {'@': 34}),
+                                       6: (1, {'@': 34}),
+                                       19: (1, {'@': 34}),
+                                       22: (1, {'@': 34}),
+                                       24: (1, {'@': 40}),
+                                       25: (1, {'@': 40}),
+                                       27: (1, {'@': 40}),
+                                       28: (1, {'@': 40})},
+                                  37: {2: (0, 41)},
+                                  38: {1: (1, {'@': 33}),
+                                       2: (1, {'@': 33}),
+                                       6: (1, {'@': 33}),
+                                       19: (1, {'@': 33}),
+                                       22: (1, {'@': 33}),
+                                       24: (1, {'@': 33}),
+                                       25: (1, {'@': 33}),
+                                       27: (1, {'@': 33}),
+                                       28: (1, {'@': 33})},
+                                  39: {3: (0, 74), 4: (0, 86), 5: (0, 20), 6: (0, 85), 7: (0, 44), 8: (0, 37)},
+                                  40: {5: (0, 68), 6: (0, 85)},
+                                  41: {3: (0, 54), 4: (0, 86), 5: (0, 20), 6: (0, 85), 7: (0, 44), 8: (0, 37)},
+                                  42: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 49),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  43: {27: (1, {'@': 21})},
+                                  44: {2: (0, 39)},
+                                  45: {1: (1, {'@': 43}), 27: (1, {'@': 43}), 28: (1, {'@': 43})},
+                                  46: {2: (0, 75),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       10: (0, 15),
+                                       15: (0, 81),
+                                       16: (0, 38),
+                                       19: (0, 84),
+                                       20: (0, 76),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  47: {3: (0, 0), 4: (0, 86), 5: (0, 20), 6: (0, 85), 7: (0, 44), 8: (0, 37)},
+                                  48: {27: (1, {'@': 17})},
+                                  49: {27: (1, {'@': 20}), 28: (0, 52)},
+                                  50: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 11),
+                                       22: (0, 1),
+                                       23: (0, 64),
+                                       30: (0, 33),
+                                       31: (0, 12),
+                                       32: (0, 48),
+                                       33: (0, 2),
+                                       34: (0, 40)},
+                                  51: {1: (1, {'@': 27}), 27: (1, {'@': 27}), 28: (1, {'@': 27})},
+                                  52: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 7),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  53: {1: (1, {'@': 48}), 24: (1, {'@': 48}), 27: (1, {'@': 48}), 28: (1, {'@': 48})},
+                                  54: {0: (0, 78), 29: (0, 47)},
+                                  55: {24: (1, {'@': 45})},
+                                  56: {1: (0, 69)},
+                                  57: {3: (0, 67), 4: (0, 86), 5: (0, 20), 6: (0, 85), 7: (0, 44), 8: (0, 37)},
+                                  58: {1: (1, {'@': 47}),
+                                       2: (0, 75),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       10: (0, 15),
+                                       15: (0, 81),
+                                       16: (0, 38),
+                                       19: (0, 84),
+                                       20: (0, 60),
+                                       22: (0, 1),
+                                       23: (0, 64),
+                                       24: (1, {'@': 47}),
+                                       25: (1, {'@': 39}),
+                                       27: (1, {'@': 47}),
+                                       28: (1, {'@': 47})},
+                                  59: {1: (1, {'@': 50}), 27: (1, {'@': 50}), 28: (1, {'@': 50})},
+                                  60: {1: (1, {'@': 31}),
+                                       2: (1, {'@': 31}),
+                                       6: (1, {'@': 31}),
+                                       19: (1, {'@': 31}),
+                                       22: (1, {'@': 31}),
+                                       24: (1, {'@': 31}),
+                                       25: (1, {'@': 31}),
+                                       27: (1, {'@': 31}),
+                                       28: (1, {'@': 31})},
+                                  61: {1: (1, {'@': 46}),
+                                       2: (1, {'@': 33}),
+                                       6: (1, {'@': 33}),
+                                       19: (1, {'@': 33}),
+                                       22: (1, {'@': 33}),
+                                       24: (1, {'@': 46}),
+                                       25: (1, {'@': 38}),
+                                       27: (1, {'@': 46}),
+                                       28: (1, {'@': 46})},
+                                  62: {1: (1, {'@': 55}),
+                                       2: (1, {'@': 55}),
+                                       6: (1, {'@': 55}),
+                                       19: (1, {'@': 55}),
+                                       22: (1, {'@': 55}),
+                                       24: (1, {'@': 55}),
+                                       25: (1, {'@': 55}),
+                                       26: (0, 25),
+                                       27: (1, {'@': 55}),
+                                       28: (1, {'@': 55})},
+                                  63: {1: (1, {'@': 25}),
+                                       2: (0, 75),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       10: (0, 15),
+                                       15: (0, 81),
+                                       16: (0, 38),
+                                       19: (0, 84),
+                                       20: (0, 60),
+                                       22: (0, 1),
+                                       23: (0, 64),
+                                       24: (1, {'@': 47}),
+                                       25: (1, {'@': 39}),
+                                       27: (1, {'@': 25}),
+                                       28: (1, {'@': 25})},
+                                  64: {1: (1, {'@': 28}),
+                                       2: (1, {'@': 28}),
+                                       6: (1, {'@': 28}),
+                                       19: (1, {'@': 28}),
+                                       22: (1, {'@': 28}),
+                                       24: (1, {'@': 28}),
+                                       25: (1, {'@': 28}),
+                                       27: (1, {'@': 28}),
+                                       28: (1, {'@': 28})},
+                                  65: {1: (1, {'@': 42}),
+                                       24: (1, {'@': 42}),
+                                       25: (1, {'@': 37}),
+                                       27: (1, {'@': 42}),
+                                       28: (1, {'@': 42})},
+                                  66: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 30),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  67: {0: (0, 78), 1: (0, 18)},
+                                  68: {26: (0, 66)},
+                                  69: {25: (1, {'@': 36})},
+                                  70: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 58),
+                                       14: (0, 53),
+                                       15: (0, 81),
+                                       16: (0, 61),
+                                       17: (0, 31),
+                                       18: (0, 59),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       22: (0, 1),
+                                       23: (0, 64),
+                                       35: (0, 45)},
+                                  71: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 28),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  72: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 43),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  73: {1: (1, {'@': 54}),
+                                       2: (1, {'@': 54}),
+                                       6: (1, {'@': 54}),
+                                       19: (1, {'@': 54}),
+                                       22: (1, {'@': 54}),
+                                       24: (1, {'@': 54}),
+                                       25: (1, {'@': 54}),
+                                       27: (1, {'@': 54}),
+                                       28: (1, {'@': 54})},
+                                  74: {0: (0, 78), 29: (0, 3)},
+                                  75: {2: (0, 27),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       9: (0, 83),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 35),
+                                       13: (0, 63),
+                                       14: (0, 13),
+                                       15: (0, 81),
+                                       16: (0, 19),
+                                       17: (0, 55),
+                                       18: (0, 51),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       21: (0, 23),
+                                       22: (0, 1),
+                                       23: (0, 64)},
+                                  76: {1: (1, {'@': 32}),
+                                       2: (1, {'@': 32}),
+                                       6: (1, {'@': 32}),
+                                       19: (1, {'@': 32}),
+                                       22: (1, {'@': 32}),
+                                       24: (1, {'@': 32}),
+                                       25: (1, {'@': 32}),
+                                       27: (1, {'@': 32}),
+                                       28: (1, {'@': 32})},
+                                  77: {0: (1, {'@': 59}), 1: (1, {'@': 59}), 29: (1, {'@': 59})},
+                                  78: {4: (0, 22)},
+                                  79: {0: (0, 78), 1: (0, 34)},
+                                  80: {1: (1, {'@': 38}),
+                                       2: (1, {'@': 33}),
+                                       6: (1, {'@': 33}),
+                                       19: (1, {'@': 33}),
+                                       22: (1, {'@': 33}),
+                                       24: (1, {'@': 38}),
+                                       25: (1, {'@': 38}),
+                                       27: (1, {'@': 38}),
+                                       28: (1, {'@': 38})},
+                                  81: {1: (1, {'@': 29}),
+                                       2: (1, {'@': 29}),
+                                       6: (1, {'@': 29}),
+                                       19: (1, {'@': 29}),
+                                       22: (1, {'@': 29}),
+                                       24: (1, {'@': 29}),
+                                       25: (1, {'@': 29}),
+                                       27: (1, {'@': 29}),
+                                       28: (1, {'@': 29})},
+                                  82: {1: (1, {'@': 34}),
+                                       2: (1, {'@': 34}),
+                                       6: (1, {'@': 34}),
+                                       19: (1, {'@': 34}),
+                                       22: (1, {'@': 34}),
+                                       24: (1, {'@': 34}),
+                                       25: (1, {'@': 34}),
+                                       27: (1, {'@': 34}),
+                                       28: (1, {'@': 34})},
+                                  83: {24: (0, 70)},
+                                  84: {4: (0, 62)},
+                                  85: {0: (1, {'@': 61}),
+                                       1: (1, {'@': 61}),
+                                       2: (1, {'@': 61}),
+                                       6: (1, {'@': 61}),
+                                       19: (1, {'@': 61}),
+                                       22: (1, {'@': 61}),
+                                       24: (1, {'@': 61}),
+                                       25: (1, {'@': 61}),
+                                       26: (1, {'@': 61}),
+                                       27: (1, {'@': 61}),
+                                       28: (1, {'@': 61}),
+                                       29: (1, {'@': 61})},
+                                  86: {0: (1, {'@': 57}), 1: (1, {'@': 57}), 29: (1, {'@': 57})},
+                                  87: {2: (0, 4),
+                                       5: (0, 5),
+                                       6: (0, 85),
+                                       10: (0, 15),
+                                       11: (0, 26),
+                                       12: (0, 65),
+                                       13: (0, 14),
+                                       14: (0, 10),
+                                       15: (0, 81),
+                                       16: (0, 80),
+                                       19: (0, 84),
+                                       20: (0, 46),
+                                       22: (0, 1),
+                                       23: (0, 64),
+                                       36: (0, 17)}},
+                       'tokens': {0: 'PLUS',
+                                  1: 'RPAR',
+                                  2: 'LPAR',
+                                  3: 'level',
+                                  4: 'INT',
+                                  5: 'identifier',
+                                  6: '__ANON_3',
+                                  7: 'IMAX',
+                                  8: 'MAX',
+                                  9: 'forallarg',
+                                  10: 'boundvar',
+                                  11: 'lambdaarg',
+                                  12: 'lambdaargexpr',
+                                  13: 'app',
+                                  14: 'lambda',
+                                  15: 'const',
+                                  16: 'primary',
+                                  17: 'forallargexpr',
+                                  18: 'forall',
+                                  19: 'HASH',
+                                  20: 'appexpr',
+                                  21: 'expr',
+                                  22: 'SORT',
+                                  23: 'sort',
+                                  24: '__ANON_2',
+                                  25: '__ANON_1',
+                                  26: 'COLON',
+                                  27: '$END',
+                                  28: '__ANON_0',
+                                  29: 'COMMA',
+                                  30: 'DEF',
+                                  31: 'thm',
+                                  32: 'definition',
+                                  33: 'start',
+                                  34: 'THM',
+                                  35: 'forallbody',
+                                  36: 'lambdabody'}},
+            'parser_conf': {'__type__': 'ParserConf',
+                            'parser_type': 'lalr',
+                            'rules': [{'@': 17},
+                                      {'@': 18},
+                                      {'@': 19},
+                                      {'@': 20},
+                                      {'@': 21},
+                                      {'@': 22},
+                                      {'@': 23},
+                                      {'@': 24},
+                                      {'@': 25},
+                                      {'@': 26},
+                                      {'@': 27},
+                                      {'@': 28},
+                                      {'@': 29},
+                                      {'@': 30},
+                                      {'@': 31},
+                                      {'@': 32},
+                                      {'@': 33},
+                                      {'@': 34},
+                                      {'@': 35},
+                                      {'@': 36},
+                                      {'@': 37},
+                                      {'@': 38},
+                                      {'@': 39},
+                                      {'@': 40},
+                                      {'@': 41},
+                                      {'@': 42},
+                                      {'@': 43},
+                                      {'@': 44},
+                                      {'@': 45},
+                                      {'@': 46},
+                                      {'@': 47},
+                                      {'@': 48},
+                                      {'@': 49},
+                                      {'@': 50},
+                                      {'@': 51},
+                                      {'@': 52},
+                                      {'@': 53},
+                                      {'@': 54},
+                                      {'@': 55},
+                                      {'@': 56},
+                                      {'@': 57},
+                                      {'@': 58},
+                                      {'@': 59},
+                                      {'@': 60},
+                                      {'@': 61}],
+                            'start': ['start']}},
+ 'rules': [{'@': 17},
+           {'@': 18},
+           {'@': 19},
+           {'@': 20},
+           {'@': 21},
+           {'@': 22},
+           {'@': 23},
+           {'@': 24},
+           {'@': 25},
+           {'@': 26},
+           {'@': 27},
+           {'@': 28},
+           {'@': 29},
+           {'@': 30},
+           {'@': 31},
+           {'@': 32},
+           {'@': 33},
+           {'@': 34},
+           {'@': 35},
+           {'@': 36},
+           {'@': 37},
+           {'@': 38},
+           {'@': 39},
+           {'@': 40},
+           {'@': 41},
+           {'@': 42},
+           {'@': 43},
+           {'@': 44},
+           {'@': 45},
+           {'@': 46},
+           {'@': 47},
+           {'@': 48},
+           {'@': 49},
+           {'@': 50},
+           {'@': 51},
+           {'@': 52},
+           {'@': 53},
+           {'@': 54},
+           {'@': 55},
+           {'@': 56},
+           {'@': 57},
+           {'@': 58},
+           {'@': 59},
+           {'@': 60},
+           {'@': 61}]}
+
+MEMO = {0: {'__type__': 'TerminalDef',
+     'name': 'INT',
+     'pattern': {'__type__': 'PatternRE',
+                 '_width': [1, 18446744073709551616],
+                 'flags': [],
+                 'raw': None,
+                 'value': '(?:[0-9])+'},
+     'priority': 0},
+ 1: {'__type__': 'TerminalDef',
+     'name': 'WS',
+     'pattern': {'__type__': 'PatternRE',
+                 '_width': [1, 18446744073709551616],
+                 'flags': [],
+                 'raw': None,
+                 'value': '(?:[ \t\x0c\r\n])+'},
+     'priority': 0},
+ 2: {'__type__': 'TerminalDef',
+     'name': 'DEF',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"def"', 'value': 'def'},
+     'priority': 0},
+ 3: {'__type__': 'TerminalDef',
+     'name': 'COLON',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '":"', 'value': ':'},
+     'priority': 0},
+ 4: {'__type__': 'TerminalDef',
+     'name': '__ANON_0',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '":="', 'value': ':='},
+     'priority': 0},
+ 5: {'__type__': 'TerminalDef',
+     'name': 'THM',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"thm"', 'value': 'thm'},
+     'priority': 0},
+ 6: {'__type__': 'TerminalDef',
+     'name': 'LPAR',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"("', 'value': '('},
+     'priority': 0},
+ 7: {'__type__': 'TerminalDef',
+     'name': 'RPAR',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '")"', 'value': ')'},
+     'priority': 0},
+ 8: {'__type__': 'TerminalDef',
+     'name': '__ANON_1',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"=>"', 'value': '=>'},
+     'priority': 0},
+ 9: {'__type__': 'TerminalDef',
+     'name': '__ANON_2',
+     'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"->"', 'value': '->'},
+     'priority': 0},
+ 10: {'__type__': 'TerminalDef',
+      'name': 'SORT',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"Sort"', 'value': 'Sort'},
+      'priority': 0},
+ 11: {'__type__': 'TerminalDef',
+      'name': 'HASH',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"#"', 'value': '#'},
+      'priority': 0},
+ 12: {'__type__': 'TerminalDef',
+      'name': 'PLUS',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"+"', 'value': '+'},
+      'priority': 0},
+ 13: {'__type__': 'TerminalDef',
+      'name': 'MAX',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"Max"', 'value': 'Max'},
+      'priority': 0},
+ 14: {'__type__': 'TerminalDef',
+      'name': 'COMMA',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '","', 'value': ','},
+      'priority': 0},
+ 15: {'__type__': 'TerminalDef',
+      'name': 'IMAX',
+      'pattern': {'__type__': 'PatternStr', 'flags': [], 'raw': '"IMax"', 'value': 'IMax'},
+      'priority': 0},
+ 16: {'__type__': 'TerminalDef',
+      'name': '__ANON_3',
+      'pattern': {'__type__': 'PatternRE',
+                  '_width': [1, 18446744073709551616],
+                  'flags': [],
+                  'raw': "/[\\w_\\.']+/",
+                  'value': "[\\w_\\.']+"},
+      'priority': 0},
+ 17: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'definition'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'start'}},
+ 18: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'thm'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'start'}},
+ 19: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'expr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'start'}},
+ 20: {'__type__': 'Rule',
+      'alias': 'typedef',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'DEF'},
+                    {'__type__': 'NonTerminal', 'name': 'identifier'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'definition'}},
+ 21: {'__type__': 'Rule',
+      'alias': 'eqdef',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'DEF'},
+                    {'__type__': 'NonTerminal', 'name': 'identifier'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': '__ANON_0'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'definition'}},
+ 22: {'__type__': 'Rule',
+      'alias': 'projdef',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'DEF'},
+                    {'__type__': 'NonTerminal', 'name': 'identifier'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': '__ANON_0'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'definition'}},
+ 23: {'__type__': 'Rule',
+      'alias': 'thmdef',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'THM'},
+                    {'__type__': 'NonTerminal', 'name': 'identifier'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'thm'}},
+ 24: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'primary'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'expr'}},
+ 25: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'app'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'expr'}},
+ 26: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'lambda'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'expr'}},
+ 27: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'forall'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 3,
+      'origin': {'__type__': 'NonTerminal', 'name': 'expr'}},
+ 28: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'sort'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'primary'}},
+ 29: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'const'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'primary'}},
+ 30: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'boundvar'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'primary'}},
+ 31: {'__type__': 'Rule',
+      'alias': 'app',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'app'}, {'__type__': 'NonTerminal', 'name': 'appexpr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'app'}},
+ 32: {'__type__': 'Rule',
+      'alias': 'app',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'appexpr'}, {'__type__': 'NonTerminal', 'name': 'appexpr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'app'}},
+ 33: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'primary'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'appexpr'}},
+ 34: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'appexpr'}},
+ 35: {'__type__': 'Rule',
+      'alias': 'lam',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'lambdaarg'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': '__ANON_1'},
+                    {'__type__': 'NonTerminal', 'name': 'lambdabody'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambda'}},
+ 36: {'__type__': 'Rule',
+      'alias': 'arg',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'const'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdaarg'}},
+ 37: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'lambdaargexpr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdaarg'}},
+ 38: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'primary'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdaargexpr'}},
+ 39: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'app'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdaargexpr'}},
+ 40: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdaargexpr'}},
+ 41: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'lambda'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdabody'}},
+ 42: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'lambdaargexpr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'lambdabody'}},
+ 43: {'__type__': 'Rule',
+      'alias': 'forall',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'forallarg'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': '__ANON_2'},
+                    {'__type__': 'NonTerminal', 'name': 'forallbody'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forall'}},
+ 44: {'__type__': 'Rule',
+      'alias': 'arg',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'const'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallarg'}},
+ 45: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'forallargexpr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallarg'}},
+ 46: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'primary'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallargexpr'}},
+ 47: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'app'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallargexpr'}},
+ 48: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'lambda'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallargexpr'}},
+ 49: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'expr'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 3,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallargexpr'}},
+ 50: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'forall'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallbody'}},
+ 51: {'__type__': 'Rule',
+      'alias': None,
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'forallargexpr'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'forallbody'}},
+ 52: {'__type__': 'Rule',
+      'alias': 'sort',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'SORT'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'level'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'sort'}},
+ 53: {'__type__': 'Rule',
+      'alias': 'const',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'identifier'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'const'}},
+ 54: {'__type__': 'Rule',
+      'alias': 'boundvar',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'HASH'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'INT'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COLON'},
+                    {'__type__': 'NonTerminal', 'name': 'identifier'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'boundvar'}},
+ 55: {'__type__': 'Rule',
+      'alias': 'boundvar',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'HASH'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'INT'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'boundvar'}},
+ 56: {'__type__': 'Rule',
+      'alias': 'succlevel',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'level'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'PLUS'},
+                    {'__type__': 'Terminal', 'filter_out': False, 'name': 'INT'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'level'}},
+ 57: {'__type__': 'Rule',
+      'alias': 'integer',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': 'INT'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 1,
+      'origin': {'__type__': 'NonTerminal', 'name': 'level'}},
+ 58: {'__type__': 'Rule',
+      'alias': 'unwrap',
+      'expansion': [{'__type__': 'NonTerminal', 'name': 'identifier'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 2,
+      'origin': {'__type__': 'NonTerminal', 'name': 'level'}},
+ 59: {'__type__': 'Rule',
+      'alias': 'maxlevel',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'MAX'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'level'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COMMA'},
+                    {'__type__': 'NonTerminal', 'name': 'level'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 3,
+      'origin': {'__type__': 'NonTerminal', 'name': 'level'}},
+ 60: {'__type__': 'Rule',
+      'alias': 'imaxlevel',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': True, 'name': 'IMAX'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'LPAR'},
+                    {'__type__': 'NonTerminal', 'name': 'level'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'COMMA'},
+                    {'__type__': 'NonTerminal', 'name': 'level'},
+                    {'__type__': 'Terminal', 'filter_out': True, 'name': 'RPAR'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 4,
+      'origin': {'__type__': 'NonTerminal', 'name': 'level'}},
+ 61: {'__type__': 'Rule',
+      'alias': 'identifier',
+      'expansion': [{'__type__': 'Terminal', 'filter_out': False, 'name': '__ANON_3'}],
+      'options': {'__type__': 'RuleOptions',
+                  'empty_indices': (),
+                  'expand1': False,
+                  'keep_all_tokens': False,
+                  'priority': None,
+                  'template_source': None},
+      'order': 0,
+      'origin': {'__type__': 'NonTerminal', 'name': 'identifier'}}}
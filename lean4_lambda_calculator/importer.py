@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Lean 打印格式 (query_const.lean, SimpLemmas.lean) 的流式导入.
+
+文件按声明逐个读取, 只缓存当前声明的行, 内存与文件大小无关:
+- axiom (以及没有定义体的 opaque) 导入为 TypeDef
+- theorem / lemma 导入为带证明项的 ThmDef
+- def / abbrev / instance (可以有 noncomputable 等修饰) 导入为带类型的 EqDef
+- QueryConst.lean 把内核生成的常量打印成注释: -- inductive, -- ctor, -- recursor 导入为 TypeDef,
+  -- def (casesOn 等) 和它以 "--  " 开头的后续行导入为 EqDef, 构造器列表 "--  | ..." 被跳过
+
+支持的项: fun (x : T) => b, 显式, 隐式和实例 binder (x : T) -> B, {x : T} -> B, [x : T] -> B, A -> B,
+@Const, Sort u, Type u, Prop, (max u v), (imax u v), (u + 1), let x := v ; b (展开为代入).
+隐式参数按显式参数处理 (pp.all 打印的项已经写出了所有参数). 声明的名字按原样使用, 不加 namespace 前缀.
+#print, universe, namespace 等命令和注释被跳过. 无法解析的声明产生一条带行号和列号的错误信息, 之后的声明继续导入.
+
+python -m lean4_lambda_calculator.importer query_const.lean
+"""
+
+import argparse
+import re
+from typing import Iterable, Iterator
+
+from lean4_lambda_calculator.expr import Expr, Const, BoundVar, Sort, Arg, Forall, Lambda, App
+from lean4_lambda_calculator.level import SuccLevel, MaxLevel, IMaxLevel
+from lean4_lambda_calculator.calculator import shift_expr, instantiate_expr
+from lean4_lambda_calculator.parser import TypeDef, EqDef, ThmDef
+
+_DECL_KEYWORDS = {"axiom", "theorem", "lemma", "def", "abbrev", "opaque", "instance", "inductive", "ctor", "recursor"}
+# 以注释形式打印的内核常量
+_KERNEL_COMMENT = re.compile(r"-- (inductive|ctor|recursor|def) ")
+_MODIFIERS = {"noncomputable", "private", "protected", "unsafe", "partial", "nonrec"}
+
+# 标识符可以包含 Unicode 字母, 下标, ', !, ?, 用 . 连接的各部分可以用 «» 括起来
+_TOKEN_RE = re.compile(
+    r"\s+"
+    r"|((?:«[^»]*»|[^\W\d][\w'!?]*)(?:\.(?:«[^»]*»|[\w'!?]+))*|\d+)"
+    r"|(:=|->|=>|\.\{[^}]*\}|[→↦∀(){}\[\]⦃⦄:,;@+])"
+)
+_ARROWS = {"->", "→"}
+_MAPS_TO = {"=>", "↦"}
+_OPEN = {"(": ")", "{": "}", "[": "]", "⦃": "⦄"}
+# app 的参数在这些 token 处结束
+_STOP = {None, ")", "}", "]", "⦄", ":", ":=", ",", ";", "->", "→", "=>", "↦", "where"}
+_KEYWORDS = {"fun", "λ", "let", "Sort", "Type", "Prop", "where"}
+
+
+class LeanSyntaxError(Exception):
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.line = line
+        self.column = column
+
+
+def _strip_comments(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    # 去掉 -- 行注释和 /- ... -/ 块注释 (不处理嵌套), 返回 (行号, 剩下的文本)
+    in_comment = False
+    # 是否在注释形式的内核 def 中, 它的后续行以 "--  " 开头
+    kernel_def = False
+    for number, line in enumerate(lines, 1):
+        if not in_comment:
+            match = _KERNEL_COMMENT.match(line)
+            if match is not None:
+                kernel_def = match.group(1) == "def"
+                line = line[3:]
+            elif kernel_def and line.startswith("--  ") and not line.startswith("--  |"):
+                line = line[2:]
+            else:
+                kernel_def = False
+        text = ""
+        rest = line.rstrip("\n")
+        while rest:
+            if in_comment:
+                end = rest.find("-/")
+                if end < 0:
+                    rest = ""
+                else:
+                    in_comment = False
+                    rest = rest[end + 2:]
+                continue
+            line_comment, block_comment = rest.find("--"), rest.find("/-")
+            if line_comment >= 0 and (block_comment < 0 or line_comment < block_comment):
+                text += rest[:line_comment]
+                rest = ""
+            elif block_comment >= 0:
+                text += rest[:block_comment] + " "
+                in_comment = True
+                rest = rest[block_comment + 2:]
+            else:
+                text += rest
+                rest = ""
+        yield number, text
+
+
+def split_declarations(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """
+    按声明切分, 返回 (起始行号, 声明的源码). 以声明关键字或修饰符开头的行开始一条新的声明.
+    声明中间的空行和注释行保留为空行, 源码的第 i 行就是文件的第 start + i 行
+    """
+    start, current = 0, None
+    for number, text in _strip_comments(lines):
+        stripped = text.strip()
+        if not stripped:
+            if current is not None:
+                current += "\n"
+            continue
+        first = stripped.split(None, 1)[0]
+        if first in _DECL_KEYWORDS or first in _MODIFIERS or first.startswith("@["):
+            if current is not None:
+                yield start, current.rstrip()
+            start, current = number, text.rstrip()
+        elif first.startswith("#") or first in ("universe", "universes", "namespace", "end", "section", "open", "set_option", "variable", "import"):
+            if current is not None:
+                yield start, current.rstrip()
+            current = None
+        elif current is None:
+            # 不属于任何声明的文本, 解析时报告错误
+            start, current = number, text.rstrip()
+        else:
+            current += "\n" + text.rstrip()
+    if current is not None:
+        yield start, current.rstrip()
+
+
+class LeanParser:
+    """解析一条 Lean 声明. 绑定变量名在解析时通过作用域表解析为 BoundVar"""
+
+    def __init__(self, code: str, line: int = 1):
+        self.code = code
+        self.line = line
+        self.tokens: list[str | None] = []
+        self.offsets: list[int] = []
+        position = 0
+        while position < len(code):
+            match = _TOKEN_RE.match(code, position)
+            if match is None:
+                self.position = len(self.tokens)
+                self.offsets.append(position)
+                raise self.error(f"unexpected character {code[position]!r}")
+            token = match.group(1) or match.group(2)
+            if token is not None:
+                self.tokens.append(token)
+                self.offsets.append(match.start())
+            position = match.end()
+        self.tokens.append(None)
+        self.offsets.append(len(code))
+        self.position = 0
+        # 从外到内的绑定变量名, 以及名字 -> 在 scope 中的位置
+        self.scope: list[str | None] = []
+        self.bound: dict[str, list[int]] = {}
+
+    def error(self, message: str) -> LeanSyntaxError:
+        offset = self.offsets[min(self.position, len(self.offsets) - 1)]
+        line_start = self.code.rfind("\n", 0, offset) + 1
+        return LeanSyntaxError(message, self.line + self.code.count("\n", 0, offset), offset - line_start + 1)
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position]
+
+    def next(self) -> str | None:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, token: str):
+        if self.peek() != token:
+            raise self.error(f"expected {token!r}, got {self.peek()!r}")
+        self.position += 1
+
+    def ident(self) -> str:
+        token = self.peek()
+        if token is None or not (token[0] == "«" or token[0] == "_" or token[0].isalpha()) or token in _KEYWORDS:
+            raise self.error(f"expected an identifier, got {token!r}")
+        self.position += 1
+        return token
+
+    def push(self, name: str | None):
+        if name == "_":
+            name = None
+        if name is not None:
+            self.bound.setdefault(name, []).append(len(self.scope))
+        self.scope.append(name)
+
+    def pop(self) -> str | None:
+        name = self.scope.pop()
+        if name is not None:
+            self.bound[name].pop()
+        return name
+
+    def declaration(self) -> TypeDef | EqDef | ThmDef:
+        if self.peek() == "@" and self.tokens[self.position + 1] == "[":
+            # 属性 @[...]
+            while self.next() != "]":
+                if self.peek() is None:
+                    raise self.error("unterminated attribute")
+        while self.peek() in _MODIFIERS:
+            self.position += 1
+        keyword = self.next()
+        if keyword not in _DECL_KEYWORDS:
+            self.position -= 1
+            raise self.error(f"expected a declaration, got {keyword!r}")
+        name = self.ident()
+        if self.peek() is not None and self.peek().startswith(".{"):
+            # 声明的 universe 参数, level 变量按名字使用
+            self.position += 1
+        # 冒号前的 binder 同时作用于类型和定义体
+        binders = self.binder_groups()
+        self.expect(":")
+        expr_type = self.term()
+        if keyword == "inductive" and self.peek() == "where":
+            # 构造器单独打印为 ctor
+            self.position += 1
+        body = None
+        if self.peek() == ":=":
+            self.position += 1
+            if self.peek() == "by":
+                raise self.error("tactic proofs are not supported")
+            body = self.term()
+        if self.peek() is not None:
+            raise self.error(f"unexpected {self.peek()!r}")
+        for binder_type in reversed(binders):
+            name_ = self.pop()
+            expr_type = Forall(Arg(binder_type, name_), expr_type)
+            if body is not None:
+                body = Lambda(Arg(binder_type, name_), body)
+        if body is None:
+            if keyword not in ("axiom", "opaque", "inductive", "ctor", "recursor"):
+                raise self.error(f"{keyword} {name} has no body")
+            return TypeDef(name, expr_type)
+        if keyword in ("theorem", "lemma"):
+            return ThmDef(name, expr_type, body)
+        return EqDef(name, body, expr_type)
+
+    def is_binder_group(self) -> bool:
+        # ( x y : T ) 形式的 binder, 与括号中的项区分
+        token = self.peek()
+        if token not in _OPEN:
+            return False
+        index = self.position + 1
+        while self.tokens[index] is not None and self.tokens[index] not in _STOP and self.tokens[index] not in _OPEN and self.tokens[index] != "@" and self.tokens[index] not in _KEYWORDS:
+            index += 1
+        if self.tokens[index] == ":" and index > self.position + 1:
+            return True
+        # 匿名的实例参数 [T]
+        return token == "["
+
+    def binder_group(self) -> list[Expr]:
+        # 解析一组 binder 并压入作用域, 返回每个绑定变量的类型
+        close = _OPEN[self.next()]
+        names = []
+        while self.peek() != ":" and self.peek() != close:
+            names.append(self.ident())
+        if self.peek() == close:
+            # 匿名的实例参数, 括号中的内容是类型
+            self.position -= len(names)
+            names = [None]
+        else:
+            self.position += 1
+        binder_type = self.term()
+        self.expect(close)
+        types = []
+        for index, name in enumerate(names):
+            # 同一组中后面的变量的类型处于前面的变量的作用域中
+            types.append(shift_expr(binder_type, 0, index))
+            self.push(name)
+        return types
+
+    def binder_groups(self) -> list[Expr]:
+        types = []
+        while self.is_binder_group():
+            types += self.binder_group()
+        return types
+
+    def term(self) -> Expr:
+        # 右结合的 fun, let, binder 和箭头用循环处理, 最后统一构造
+        pending: list[tuple] = []
+        while True:
+            token = self.peek()
+            if token == "fun" or token == "λ":
+                self.position += 1
+                types = self.binder_groups()
+                if not types:
+                    raise self.error("fun binders need a type annotation")
+                if self.next() not in _MAPS_TO:
+                    self.position -= 1
+                    raise self.error("expected '=>'")
+                pending += [(Lambda, binder_type) for binder_type in types]
+            elif token == "∀":
+                self.position += 1
+                types = self.binder_groups()
+                self.expect(",")
+                pending += [(Forall, binder_type) for binder_type in types]
+            elif token == "let":
+                self.position += 1
+                name = self.ident()
+                if self.peek() == ":":
+                    self.position += 1
+                    self.term()
+                self.expect(":=")
+                value = self.term()
+                if self.peek() == ";":
+                    self.position += 1
+                self.push(name)
+                pending.append((None, value))
+            elif self.is_binder_group():
+                types = self.binder_groups()
+                if self.next() not in _ARROWS:
+                    self.position -= 1
+                    raise self.error("expected '->' after binder")
+                pending += [(Forall, binder_type) for binder_type in types]
+            else:
+                item = self.app()
+                if self.peek() not in _ARROWS:
+                    break
+                self.position += 1
+                self.push(None)
+                pending.append((Forall, item))
+        for kind, value in reversed(pending):
+            name = self.pop()
+            if kind is None:
+                # let x := v ; b 展开为 b[x := v]
+                item = instantiate_expr(item, [value])
+            else:
+                item = kind(Arg(value, name), item)
+        return item
+
+    def app(self) -> Expr:
+        func = self.atom()
+        while self.peek() not in _STOP:
+            if self.peek() in ("fun", "λ", "let", "∀"):
+                # 末尾的参数可以是不加括号的 fun
+                return App(func, self.term())
+            func = App(func, self.atom())
+        return func
+
+    def atom(self) -> Expr:
+        token = self.peek()
+        if token == "(":
+            self.position += 1
+            expr = self.term()
+            self.expect(")")
+            return expr
+        if token == "@":
+            self.position += 1
+            return self.resolve(self.ident())
+        if token is not None and token.isdigit():
+            # 自然数字面量作为常量
+            self.position += 1
+            return Const(token)
+        if token == "Prop":
+            self.position += 1
+            return Sort(0)
+        if token == "Sort" or token == "Type":
+            self.position += 1
+            if self.peek() not in _STOP and self.peek() not in _KEYWORDS and self.peek() != "@":
+                level = self.level_atom()
+            else:
+                level = 0
+            return Sort(SuccLevel(level) if token == "Type" else level)
+        return self.resolve(self.ident())
+
+    def resolve(self, name: str) -> Expr:
+        positions = self.bound.get(name)
+        if positions:
+            return BoundVar(len(self.scope) - 1 - positions[-1])
+        head = name.split(".", 1)[0]
+        if head != name and self.bound.get(head):
+            # x.1 形式的结构体投影在演算中没有对应
+            self.position -= 1
+            raise self.error(f"projection {name} is not supported")
+        return Const(name)
+
+    def level_atom(self):
+        token = self.next()
+        if token == "(":
+            level = self.level()
+            self.expect(")")
+            return level
+        if token is not None and token.isdigit():
+            return int(token)
+        self.position -= 1
+        return self.ident()
+
+    def level(self):
+        token = self.peek()
+        if token == "max" or token == "imax":
+            self.position += 1
+            args = [self.level_atom()]
+            while self.peek() != ")":
+                args.append(self.level_atom())
+            if len(args) < 2:
+                raise self.error(f"{token} expects at least two levels")
+            level = args[-1]
+            for arg in reversed(args[:-1]):
+                level = MaxLevel(arg, level) if token == "max" else IMaxLevel(arg, level)
+            return level
+        level = self.level_atom()
+        while self.peek() == "+":
+            self.position += 1
+            step = self.next()
+            if step is None or not step.isdigit():
+                self.position -= 1
+                raise self.error("expected an integer after '+'")
+            for _ in range(int(step)):
+                level = SuccLevel(level)
+        return level
+
+
+def parse_declaration(code: str, line: int = 1) -> TypeDef | EqDef | ThmDef | str:
+    """解析一条声明, 失败时返回带行号和列号的错误信息"""
+    try:
+        return LeanParser(code, line).declaration()
+    except LeanSyntaxError as e:
+        return str(e)
+    except RecursionError:
+        return f"line {line}: declaration is nested too deeply"
+
+
+def read_lean(lines: Iterable[str]) -> Iterator[tuple[int, TypeDef | EqDef | ThmDef | str]]:
+    """逐个导入声明, 返回 (起始行号, 声明); 解析失败时声明是错误信息"""
+    for line, code in split_declarations(lines):
+        yield line, parse_declaration(code, line)
+
+
+def import_file(path: str) -> Iterator[tuple[int, TypeDef | EqDef | ThmDef | str]]:
+    with open(path, "r") as f:
+        yield from read_lean(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a Lean-printed declaration file")
+    parser.add_argument("path", type=str, help="Path of the .lean file")
+    args = parser.parse_args()
+
+    count = errors = 0
+    for line, item in import_file(args.path):
+        count += 1
+        if isinstance(item, str):
+            errors += 1
+            print(f"{args.path}:{item}")
+        else:
+            print(item)
+    print(f"imported {count - errors} declarations, {errors} errors")
@@ -1,49 +1,330 @@
-from sympy import symbols, Eq, solve, Max, simplify, satisfiable, sympify, Piecewise, Integer, Expr as SymExpr
 import re
 
+# Universe level 的规范形 (normal form):
+#   (const, terms)
+#   const: 常数部分, 当 const 不大于任何项的偏移量时记为 0 (被其它项吸收)
+#   terms: 按 base 排序的 (base, offset) 元组, 表示 max(base_1 + offset_1, ...)
+#          base 为参数名 str, 或者无法化简的 ("imax", a, b), 其中 a, b 也是规范形
+# 整体表示 max(const, base_1 + offset_1, ...)
+LevelNF = tuple[int, tuple]
+
+_ZERO: LevelNF = (0, ())
+
+
+def _term_key(term: tuple) -> tuple:
+    base, offset = term
+    if isinstance(base, str):
+        return (0, base, offset)
+    return (1, _nf_repr((0, ((base, 0),))), offset)
+
+
+def _nf_make(const: int, offsets: dict) -> LevelNF:
+    max_offset = max(offsets.values(), default=-1)
+    if const <= max_offset:
+        const = 0
+    return (const, tuple(sorted(offsets.items(), key=_term_key)))
+
+
+def _nf_const(value: int) -> LevelNF:
+    return (value, ())
+
+
+def _nf_param(name: str) -> LevelNF:
+    return (0, ((name, 0),))
+
+
+def _nf_succ(nf: LevelNF, step: int = 1) -> LevelNF:
+    const, terms = nf
+    return _nf_make(const + step, {base: offset + step for base, offset in terms})
+
+
+def _nf_max(left: LevelNF, right: LevelNF) -> LevelNF:
+    offsets = dict(left[1])
+    for base, offset in right[1]:
+        if offsets.get(base, -1) < offset:
+            offsets[base] = offset
+    return _nf_make(max(left[0], right[0]), offsets)
+
+
+def _nf_never_zero(nf: LevelNF) -> bool:
+    const, terms = nf
+    return const > 0 or any(offset > 0 for _, offset in terms)
+
+
+def _nf_imax(left: LevelNF, right: LevelNF) -> LevelNF:
+    # imax(a, b) = 0 当 b = 0, 否则为 max(a, b)
+    if right == _ZERO:
+        return _ZERO
+    if _nf_never_zero(right):
+        return _nf_max(left, right)
+    if left == _ZERO or left == right:
+        return right
+    if len(right[1]) == 1 and not isinstance(right[1][0][0], str):
+        # imax(a, imax(c, d)) = imax(max(a, c), d)
+        _, inner_left, inner_right = right[1][0][0]
+        return _nf_imax(_nf_max(left, inner_left), inner_right)
+    return (0, ((("imax", left, right), 0),))
+
+
+def _nf_subs(nf: LevelNF, mapping: dict[str, LevelNF]) -> LevelNF:
+    const, terms = nf
+    rst = _nf_const(const)
+    for base, offset in terms:
+        if isinstance(base, str):
+            value = mapping.get(base)
+            if value is None:
+                value = _nf_param(base)
+        else:
+            _, left, right = base
+            value = _nf_imax(_nf_subs(left, mapping), _nf_subs(right, mapping))
+        rst = _nf_max(rst, _nf_succ(value, offset) if offset else value)
+    return rst
+
+
+def _nf_params(nf: LevelNF, params: set[str] | None = None) -> set[str]:
+    if params is None:
+        params = set()
+    for base, _ in nf[1]:
+        if isinstance(base, str):
+            params.add(base)
+        else:
+            _nf_params(base[1], params)
+            _nf_params(base[2], params)
+    return params
+
+
+def _nf_eval(nf: LevelNF, assignment: dict[str, int]) -> int:
+    const, terms = nf
+    rst = const
+    for base, offset in terms:
+        if isinstance(base, str):
+            value = assignment[base]
+        else:
+            right = _nf_eval(base[2], assignment)
+            value = 0 if right == 0 else max(_nf_eval(base[1], assignment), right)
+        rst = max(rst, value + offset)
+    return rst
+
+
+def _nf_zero_param(nf: LevelNF) -> str | None:
+    # 可能为 0 的规范形中, 决定它是否为 0 的一个参数: 直接出现的参数, 或者 imax 右侧的参数
+    for base, _ in nf[1]:
+        if isinstance(base, str):
+            return base
+    for base, _ in nf[1]:
+        param = _nf_zero_param(base[2])
+        if param is not None:
+            return param
+    return None
+
+
+def _nf_split_param(nf: LevelNF) -> str | None:
+    # 找到一个出现在 imax 右侧的参数, 按它是否为 0 分情况讨论:
+    # 为 0 时参数消失, 为 u + 1 时 imax 的右侧不为 0, 化为 max. 两种情况都使问题变小
+    for base, _ in nf[1]:
+        if not isinstance(base, str):
+            param = _nf_zero_param(base[2])
+            if param is not None:
+                return param
+    return None
+
+
+def _nf_case_split(left: LevelNF, right: LevelNF, check) -> bool:
+    param = _nf_split_param(left) or _nf_split_param(right)
+    if param is None:
+        return check(left, right)
+    cases = ({param: _ZERO}, {param: _nf_succ(_nf_param(param))})
+    return all(
+        _nf_case_split(_nf_subs(left, case), _nf_subs(right, case), check)
+        for case in cases
+    )
+
+
+def _nf_leq_simple(left: LevelNF, right: LevelNF) -> bool:
+    # 不含 imax 时: left <= right 当且仅当 left 的每一项都被 right 的某一项覆盖
+    right_offsets = dict(right[1])
+    right_min = max([right[0]] + list(right_offsets.values()))
+    if left[0] > right_min:
+        return False
+    return all(right_offsets.get(base, -1) >= offset for base, offset in left[1])
+
+
+def _nf_is_equivalent(left: LevelNF, right: LevelNF) -> bool:
+    if left == right:
+        return True
+    # 不含 imax 的规范形是唯一的, 所以分情况消去 imax 后直接比较
+    return _nf_case_split(left, right, lambda a, b: a == b)
+
+
+def _nf_is_leq(left: LevelNF, right: LevelNF) -> bool:
+    if left == right:
+        return True
+    return _nf_case_split(left, right, _nf_leq_simple)
+
+
+def _nf_atoms(nf: LevelNF) -> list[tuple[str | None, int]]:
+    # 不含 imax 的规范形的各项 (param, offset), 常数项的 param 为 None
+    const, terms = nf
+    atoms = [(base, offset) for base, offset in terms]
+    if const > 0 or not atoms:
+        atoms.append((None, const))
+    return atoms
+
+
+def _difference_solution(constraints: list[tuple[str | None, str | None, int]], names: list[str]) -> dict[str, int] | None:
+    """
+    差分约束 x_a - x_b <= w (None 表示常数 0, 所有参数非负) 的整数解, 无解时返回 None.
+    用 Bellman-Ford 计算最短路: 约束对应边 b -> a, 存在负环当且仅当无解.
+    """
+    edges = [(name, None, 0) for name in names] + [(b, a, w) for a, b, w in constraints]
+    dist = dict.fromkeys(names + [None], 0)
+    for _ in range(len(dist)):
+        changed = False
+        for source, target, weight in edges:
+            if dist[source] + weight < dist[target]:
+                dist[target] = dist[source] + weight
+                changed = True
+        if not changed:
+            return {name: dist[name] - dist[None] for name in names}
+    return None
+
+
+def _nf_solve_max(equations: list[tuple[LevelNF, LevelNF]], names: list[str]) -> dict[str, int] | None:
+    """
+    不含 imax 的方程组: 每个方程两侧的最大值分别由某一项取到, 选定这两项后方程等价于一组差分约束.
+    逐个方程回溯选择取到最大值的项, 每一步检查已选的约束是否仍然有解.
+    """
+    sides = [(_nf_atoms(left), _nf_atoms(right)) for left, right in equations]
+    stack = [(0, [])]
+    while stack:
+        index, constraints = stack.pop()
+        if index == len(sides):
+            return _difference_solution(constraints, names)
+        left_atoms, right_atoms = sides[index]
+        for left_param, left_offset in left_atoms:
+            for right_param, right_offset in right_atoms:
+                # left_param + left_offset = right_param + right_offset, 且两侧其它项都不更大
+                choice = constraints + [
+                    (left_param, right_param, right_offset - left_offset),
+                    (right_param, left_param, left_offset - right_offset),
+                ]
+                choice += [(param, left_param, left_offset - offset) for param, offset in left_atoms]
+                choice += [(param, right_param, right_offset - offset) for param, offset in right_atoms]
+                if _difference_solution(choice, names) is not None:
+                    stack.append((index + 1, choice))
+    return None
+
+
+def _nf_find_solution(equations: list[tuple[LevelNF, LevelNF]]) -> dict[str, int] | None:
+    """
+    在自然数上寻找满足所有方程的参数赋值, 无解时返回 None.
+
+    对 imax 右侧的参数按是否为 0 分情况讨论 (u = 0 或 u = u' + 1) 消去 imax,
+    剩下的 max-plus 方程组由 _nf_solve_max 判定. 两步都是完备的, 不受参数个数限制.
+    """
+    params: set[str] = set()
+    for left, right in equations:
+        _nf_params(left, params)
+        _nf_params(right, params)
+    names = sorted(params)
+    equations = [(a, b) for a, b in equations if not _nf_is_equivalent(a, b)]
+    param = None
+    for left, right in equations:
+        param = _nf_split_param(left) or _nf_split_param(right)
+        if param is not None:
+            break
+    if param is None:
+        return _nf_solve_max(equations, names)
+    for case, shift in (({param: _ZERO}, 0), ({param: _nf_succ(_nf_param(param))}, 1)):
+        solution = _nf_find_solution([(_nf_subs(a, case), _nf_subs(b, case)) for a, b in equations])
+        if solution is not None:
+            # 第二种情况中的 param 表示 u', 原参数为 u' + 1
+            assignment = {name: solution.get(name, 0) for name in names}
+            assignment[param] = assignment[param] + shift if shift else 0
+            return assignment
+    return None
+
+
+def _nf_repr(nf: LevelNF) -> str:
+    const, terms = nf
+    parts = []
+    for base, offset in terms:
+        if isinstance(base, str):
+            text = base
+        else:
+            text = f"IMax({_nf_repr(base[1])}, {_nf_repr(base[2])})"
+        if offset > 0:
+            text = f"{text}+{offset}"
+        parts.append(text)
+    if const > 0 or len(parts) == 0:
+        parts.insert(0, str(const))
+    rst = parts[-1]
+    for part in reversed(parts[:-1]):
+        rst = f"Max({part}, {rst})"
+    return rst
+
 
 class Level:
-    def __init__(self, level: str | int | SymExpr) -> None:
-        if isinstance(level, str):
+    def __init__(self, level: "str | int | Level") -> None:
+        if isinstance(level, Level):
+            self.nf = level.nf
+        elif isinstance(level, str):
             try:
                 int_level = int(level)  # 尝试将level转换为整数
                 assert int_level >= 0, f"Invalid level {level}, which is small than 0."
-                self.symbol = Integer(int_level)
+                self.nf = _nf_const(int_level)
             except ValueError:
                 # 如果转换失败，说明level不是有效的整数
-                self.symbol = symbols(level, integer=True, nonnegative=True)
+                self.nf = _nf_param(level)
         elif isinstance(level, int):
             assert level >= 0, f"Invalid level number {level}, which is small than 0."
-            self.symbol = Integer(level)  # 将输入简化为 sympy 表达式
-        elif isinstance(level, SymExpr):
-            self.symbol = level
+            self.nf = _nf_const(level)
         else:
             raise TypeError("input arg level should be str, int")
 
+    @classmethod
+    def from_nf(cls, nf: LevelNF) -> "Level":
+        level = Level.__new__(Level)
+        level.nf = nf
+        return level
+
     def __repr__(self) -> str:
-        return str(self.symbol)
+        return _nf_repr(self.nf)
 
     def __eq__(self, other: object) -> bool:
+        # 判断两个 level 是否可以相等 (存在参数赋值使其相等), 对任意多个参数都是精确的判定
         if isinstance(other, Level):
-            # 构造方程 self.symbol == other.symbol
-            equation = Eq(self.symbol, other.symbol)
-            rst = satisfiable(equation)
-            return bool(rst)
+            return _nf_find_solution([(self.nf, other.nf)]) is not None
         return False
 
+    def is_equivalent(self, other: "Level") -> bool:
+        """对所有参数赋值都相等"""
+        return _nf_is_equivalent(self.nf, other.nf)
+
+    def is_leq(self, other: "Level") -> bool:
+        """对所有参数赋值都有 self <= other"""
+        return _nf_is_leq(self.nf, other.nf)
+
+    def is_zero(self) -> bool:
+        return self.nf == _ZERO
+
     def get_variables(self) -> set[str]:
         """获取表达式中的所有变量名字符串"""
-        return {str(symbol) for symbol in self.symbol.free_symbols}
+        return _nf_params(self.nf)
+
+    def subs(self, mapping: "dict[str, Level | str | int]") -> "Level":
+        """把参数替换为对应的 level"""
+        nf_mapping = {name: Level(value).nf for name, value in mapping.items()}
+        return Level.from_nf(_nf_subs(self.nf, nf_mapping))
 
     def match(self, level):
         if not isinstance(level, Level):
             return False, None
-        if simplify(self.symbol - level.symbol) == 0:
+        if self.is_equivalent(level):
             return True, None
-        eq = Eq(self.symbol, level.symbol)
-        solution = solve(eq)
-        # 如果有解，返回 True 和 solution 
-        if solution:
+        solution = _nf_find_solution([(self.nf, level.nf)])
+        # 如果有解，返回 True 和 solution
+        if solution is not None:
             return True, solution
         return False, None
 
@@ -52,45 +333,24 @@ LevelType = str | int | Level
 class SuccLevel(Level):
     def __init__(self, level: LevelType) -> None:
         self.origin_level = level if isinstance(level, Level) else Level(level)
-        self.symbol = simplify(self.origin_level.symbol + 1)
-
-    def __repr__(self) -> str:
-        super_str = super().__repr__()
-        if "Piecewise" in super_str:
-            return f"{self.origin_level}+1"
-        return super_str
+        self.nf = _nf_succ(self.origin_level.nf)
 
 class MaxLevel(Level):
     def __init__(self, left: LevelType, right: LevelType) -> None:
         self.left = left if isinstance(left, Level) else Level(left)
-        self.right = right if isinstance(right, Level) else Level(right) 
-        self.symbol = simplify(Max(self.left.symbol, self.right.symbol))
-    
-    def __repr__(self) -> str:
-        super_str = super().__repr__()
-        if "Piecewise" in super_str:
-            return f"Max({self.left},{self.right})"
-        return super_str
+        self.right = right if isinstance(right, Level) else Level(right)
+        self.nf = _nf_max(self.left.nf, self.right.nf)
 
 class IMaxLevel(Level):
     def __init__(self, left: Level, right: Level) -> None:
         self.left = left if isinstance(left, Level) else Level(left)
-        self.right = right if isinstance(right, Level) else Level(right) 
-        self.symbol = simplify(Piecewise(
-            (0, Eq(self.right.symbol, 0)), # 如果 b = 0, 则返回 0
-            (Max(self.left.symbol, self.right.symbol), True),  # 如果 b ≠ 0，返回 max(succ(a), b)
-        ))
-    
-    def __repr__(self) -> str:
-        super_str = super().__repr__()
-        if "Piecewise" in super_str:
-            return f"IMax({self.left},{self.right})"
-        return super_str
+        self.right = right if isinstance(right, Level) else Level(right)
+        # 如果 b = 0, 则返回 0; 如果 b ≠ 0，返回 max(a, b)
+        self.nf = _nf_imax(self.left.nf, self.right.nf)
 
 def level_subs_symbols(level: Level, used_free_symbols: set[str], renamed_symbols: dict[str, str]) -> Level:
-    rst_symbol = level.symbol
-    for symbol in rst_symbol.free_symbols:
-        s_symbol = str(symbol)
+    mapping: dict[str, str] = {}
+    for s_symbol in sorted(level.get_variables()):
         if s_symbol not in used_free_symbols:
             continue
         if s_symbol in renamed_symbols:
@@ -98,61 +358,132 @@ def level_subs_symbols(level: Level, used_free_symbols: set[str], renamed_symbol
         else:
             new_name = _get_new_name(used_free_symbols, set(renamed_symbols.values()))
             renamed_symbols[s_symbol] = new_name
-        new_symbol = symbols(new_name, integer=True, nonnegative=True)
-        rst_symbol = rst_symbol.subs(symbol, new_symbol)
-    return Level(rst_symbol) 
+        mapping[s_symbol] = new_name
+    if not mapping:
+        return level
+    return level.subs(mapping)
 
 def _get_new_name(used_names: set[str], used_new_names: set[str]) -> str:
     index = 0
     while True:
         name = f"u{index}"
-        if name not in used_names:
+        if name not in used_names and name not in used_new_names:
             return name
         index += 1
 
-def is_solvable(equations_str: list[str]) -> bool:
+def _nf_pred(nf: LevelNF, step: int) -> LevelNF | None:
+    # 计算 nf - step, 只有当每一项都至少为 step 时才有定义
+    const, terms = nf
+    if (const < step and (const > 0 or not terms)) or any(offset < step for _, offset in terms):
+        return None
+    return _nf_make(max(const - step, 0), {base: offset - step for base, offset in terms})
+
+
+def _nf_as_param(nf: LevelNF) -> tuple[str, int] | None:
+    # nf 形如 u + k 时返回 (u, k)
+    const, terms = nf
+    if const == 0 and len(terms) == 1 and isinstance(terms[0][0], str):
+        return terms[0]
+    return None
+
+
+class LevelConstraints:
     """
-    检查一个字符串列表形式的方程组是否有解。
+    一次声明检查中的 universe level 约束.
 
-    参数:
-        equations_str (list[str]): 方程组的字符串列表，例如 ["x + y = 10", "y - z = 2"]。
-    
-    返回:
-        bool: 如果方程组有解，返回 True；否则返回 False。
+    直接接收 Level 对象, 能确定唯一解的方程 (u + k = e, 且 u 不出现在 e 中) 被求解并记入 subst,
+    其余方程在代入已有解后暂存, 并检查暂存方程组是否仍然有解.
     """
-    if not equations_str:
-        return True  # 空方程组默认有解
+    def __init__(self) -> None:
+        self.subst: dict[str, LevelNF] = {}
+        self.pending: list[tuple[LevelNF, LevelNF]] = []
+        # 按顺序记录所有被接受的方程, 缓存命中时用于重放
+        self.trail: list[tuple[Level, Level]] = []
+        # 尝试加入非空方程组的次数, 不变说明期间的计算与约束存储无关
+        self.attempts = 0
 
-    # 第一次解析，收集自由符号
-    parsed_equations = []
-    all_symbols = set()
-    
-    for eq_str in equations_str:
-        # 暂时解析字符串
-        if "=" in eq_str:
-            rep_eq_str = eq_str.replace("=", "-(") + ")"
-        else:
-            rep_eq_str = eq_str
-        parsed_eq = sympify(rep_eq_str)  # 转换为表达式格式
-        parsed_equations.append(parsed_eq)
-        all_symbols.update(parsed_eq.free_symbols)
+    def copy(self) -> "LevelConstraints":
+        store = LevelConstraints()
+        store.subst = dict(self.subst)
+        store.pending = list(self.pending)
+        store.trail = list(self.trail)
+        return store
+
+    def save(self) -> tuple:
+        """保存当前状态, 用于回溯多个方程组成的尝试"""
+        return dict(self.subst), list(self.pending), len(self.trail)
+
+    def restore(self, state: tuple) -> None:
+        subst, pending, trail_length = state
+        self.subst, self.pending = dict(subst), list(pending)
+        del self.trail[trail_length:]
+
+    def resolve(self, level: Level) -> Level:
+        """用已求得的解替换 level 中的参数"""
+        if not self.subst:
+            return level
+        return Level.from_nf(_nf_subs(level.nf, self.subst))
+
+    def add(self, left: Level, right: Level) -> bool:
+        """加入方程 left = right, 无解时返回 False 并保持原状态不变"""
+        return self.add_all([(left, right)])
 
-    # 创建统一的符号上下文
-    symbol_context = {str(sym): symbols(str(sym)) for sym in all_symbols}
+    def add_all(self, equations: list[tuple[Level, Level]]) -> bool:
+        """原子地加入一组方程, 无解时返回 False 并保持原状态不变"""
+        if not equations:
+            return True
+        self.attempts += 1
+        subst, pending = dict(self.subst), list(self.pending)
+        if all(self._add_nf(left.nf, right.nf) for left, right in equations):
+            self.trail.extend(equations)
+            return True
+        self.subst, self.pending = subst, pending
+        return False
+
+    def _add_nf(self, left: LevelNF, right: LevelNF) -> bool:
+        if self.subst:
+            left = _nf_subs(left, self.subst)
+            right = _nf_subs(right, self.subst)
+        if _nf_is_equivalent(left, right):
+            return True
+        for lhs, rhs in ((left, right), (right, left)):
+            param = _nf_as_param(lhs)
+            if param is None or param[0] in _nf_params(rhs):
+                continue
+            value = _nf_pred(rhs, param[1])
+            if value is None:
+                continue
+            self._bind(param[0], value)
+            # 新的解可能让暂存的方程可以求解或者出现矛盾
+            pending, self.pending = self.pending, []
+            return all(self._add_nf(lhs, rhs) for lhs, rhs in pending)
+        if not _nf_params(left) and not _nf_params(right):
+            return False
+        self.pending.append((left, right))
+        return _nf_find_solution(self.pending) is not None
+
+    def _bind(self, name: str, value: LevelNF) -> None:
+        mapping = {name: value}
+        for key in self.subst:
+            self.subst[key] = _nf_subs(self.subst[key], mapping)
+        self.subst[name] = value
 
-    # 使用统一的符号上下文重新解析方程组
-    equations = [
-        Eq(sympify(eq_str.split("=")[0], locals=symbol_context), 
-           sympify(eq_str.split("=")[1], locals=symbol_context))
-        for eq_str in equations_str
-    ]
+    def is_satisfiable(self) -> bool:
+        return _nf_find_solution(self.pending) is not None
 
-    # 检查是否有解
-    logical_expression = Eq(0, 0)
-    for eq in equations:
-        logical_expression = logical_expression & eq
+def is_solvable(equations: list[tuple[Level, Level]]) -> bool:
+    """
+    检查一组 level 方程是否有解。
+
+    参数:
+        equations (list[tuple[Level, Level]]): 方程组, 每一项 (a, b) 表示 a = b。
 
-    return bool(satisfiable(logical_expression))
+    返回:
+        bool: 如果方程组有解，返回 True；否则返回 False。
+    """
+    if not equations:
+        return True  # 空方程组默认有解
+    return LevelConstraints().add_all(equations)
 
 def parse_level(code: str) -> Level:
     tokens = _tokenize(code)
@@ -162,38 +493,28 @@ def _parse_level(tokens: list[str]) -> Level:
     """解析 Level 对象"""
     token = tokens.pop(0)
     if token.isdigit():
-        return Level(int(token))
-    elif token == "Max":
-        assert tokens[0] == '(', "Max does not followed by `(`"
-        tokens.pop(0)
-        left = _parse_level(tokens)
-        assert tokens[0] == ',', "need a comma `,`"
-        tokens.pop(0)
-        right = _parse_level(tokens)
-        assert tokens[0] == ')', "Max does not ended with `)`"
-        tokens.pop(0)
-        return MaxLevel(left, right)
-    elif token == "IMax":
-        assert tokens[0] == '(', "Max does not followed by `(`"
+        level = Level(int(token))
+    elif token == "Max" or token == "IMax":
+        assert tokens[0] == '(', f"{token} does not followed by `(`"
         tokens.pop(0)
         left = _parse_level(tokens)
         assert tokens[0] == ',', "need a comma `,`"
         tokens.pop(0)
         right = _parse_level(tokens)
-        assert tokens[0] == ')', "Max does not ended with `)`"
+        assert tokens[0] == ')', f"{token} does not ended with `)`"
         tokens.pop(0)
-        return IMaxLevel(left, right)
+        level = MaxLevel(left, right) if token == "Max" else IMaxLevel(left, right)
     else:
-        if len(tokens) >= 2 and tokens[0] == "+" and tokens[1] == "1":
-            tokens.pop(0)
-            tokens.pop(0)
-            return SuccLevel(Level(token))
-        else:
-            return Level(token)
+        level = Level(token)
+    while len(tokens) >= 2 and tokens[0] == "+" and tokens[1].isdigit():
+        tokens.pop(0)
+        for _ in range(int(tokens.pop(0))):
+            level = SuccLevel(level)
+    return level
 
 def _tokenize(expr: str) -> list[str]:
     """将输入字符串拆分为标记列表"""
     # 使用正则表达式匹配括号、标识符和数字
     pattern = r"[()+]|[A-Za-z0-9_.\u00A0-\uFFFF]+|\S"
     tokens = re.findall(pattern, expr)
-    return tokens
\ No newline at end of file
+    return tokens
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+基于环境的规约机 (Krivine 机), 用闭包代替代入, 最后再把范式读回为 Expr.
+
+beta 化简只是在环境中绑定一个闭包, 不复制函数体, 也不对参数做 shift,
+因此一条 beta-redex 链的化简时间与项的大小成线性关系.
+
+sharing=True 时按需调用 (call-by-need): 闭包是带记忆的 thunk, 弱头范式和读回的结果都只计算一次,
+被多次使用的参数不会被重复化简.
+"""
+
+from lean4_lambda_calculator.expr import Expr, BoundVar, Lambda, Forall, App, Arg, SORT, CONST, BOUNDVAR, ARG, FORALL, LAMBDA, APP, expr_rename_level, get_level_symbols
+from lean4_lambda_calculator.traversal import run
+
+
+class Var:
+    """读回时引入的变量, level 是它所在的 binder 深度 (de Bruijn level)"""
+    __slots__ = ("level",)
+
+    def __init__(self, level: int):
+        self.level = level
+
+
+class Closure:
+    """未求值的项和它的环境. 按需调用时同时作为 thunk, 记录弱头范式和最近一次读回的结果"""
+    __slots__ = ("term", "env", "value", "normal")
+
+    def __init__(self, term: Expr, env: tuple):
+        self.term = term
+        self.env = env
+        self.value = None
+        self.normal = None
+
+
+class FuelExhausted(ValueError):
+    pass
+
+
+class Neutral:
+    """头部无法继续化简的应用: 变量或没有定义的常量, 参数是未求值的闭包"""
+    __slots__ = ("head", "args")
+
+    def __init__(self, head: "Var | Expr", args: list[Closure]):
+        self.head = head
+        self.args = args
+
+
+# 环境是 (items, size): items[size - 1 - i] 是下标 i 的绑定.
+# 扩展时如果 items 恰好没有被其他环境扩展过, 直接在原列表上追加, 否则复制前 size 项,
+# 因此线性扩展的环境共享同一个列表, 查找是 O(1).
+EMPTY_ENV = ([], 0)
+
+def _extend(env: tuple, value) -> tuple:
+    items, size = env
+    if len(items) != size:
+        items = items[:size]
+    items.append(value)
+    return (items, size + 1)
+
+def _lookup(env: tuple, index: int):
+    items, size = env
+    return items[size - 1 - index]
+
+
+class Machine:
+    def __init__(self, def_pool: dict[str, Expr] = None, used_free_symbols: set[str] = None, sharing: bool = False, fuel: int = None):
+        # 给定 def_pool 时同时做 delta 展开
+        self.def_pool = def_pool or {}
+        self.used_free_symbols = used_free_symbols if used_free_symbols is not None else set()
+        self.sharing = sharing
+        # beta 和 delta 步数的上限, None 表示不限制
+        self.fuel = fuel
+
+    def _consume(self):
+        if self.fuel is not None:
+            self.fuel -= 1
+            if self.fuel < 0:
+                raise FuelExhausted("Normalization ran out of fuel")
+
+    def force(self, thunk: Closure):
+        """按需调用: 每个 thunk 最多化简一次"""
+        value = thunk.value
+        if value is None:
+            value = thunk.value = self.eval(thunk.term, thunk.env, [])
+        return value
+
+    def eval(self, term: Expr, env: tuple, stack: list[Closure]):
+        """化简到弱头范式. stack 的末尾是第一个参数"""
+        while True:
+            tag = term.tag
+            if tag == APP:
+                stack.append(Closure(term.arg, env))
+                term = term.func
+            elif tag == LAMBDA:
+                if not stack:
+                    return Closure(term, env)
+                self._consume()
+                env = _extend(env, stack.pop())
+                term = term.body
+            elif tag == BOUNDVAR:
+                value = _lookup(env, term.index)
+                if value.__class__ is Var:
+                    stack.reverse()
+                    return Neutral(value, stack)
+                if self.sharing:
+                    # 共享的弱头范式再应用到当前的参数栈上
+                    value = self.force(value)
+                    if value.__class__ is Neutral:
+                        stack.reverse()
+                        return Neutral(value.head, value.args + stack) if stack else value
+                term, env = value.term, value.env
+            elif tag == CONST:
+                if term.label in self.def_pool:
+                    self._consume()
+                    definition, symbols = expr_rename_level(self.def_pool[term.label], self.used_free_symbols)
+                    self.used_free_symbols.update(symbols)
+                    term, env = definition, EMPTY_ENV
+                    continue
+                stack.reverse()
+                return Neutral(term, stack)
+            elif tag == ARG:
+                term = term.type
+            else:
+                if stack:
+                    raise ValueError(f"Function application to a non-function: {term}")
+                return Closure(term, env)
+
+    def readback(self, value, depth: int) -> Expr:
+        # 读回写成生成器, 由 traversal.run 驱动, 很深的 binder 链和很长的参数列表不会触及递归上限
+        return run(self._readback(value, depth))
+
+    def _readback(self, value, depth: int):
+        if value.__class__ is Neutral:
+            head = value.head
+            expr = BoundVar(depth - head.level - 1) if head.__class__ is Var else head
+            for arg in value.args:
+                expr = App(expr, (yield self._readback_thunk(arg, depth)))
+            return expr
+        term, env = value.term, value.env
+        if term.tag == SORT:
+            return term
+        var_type = yield self._readback(self.eval(term.var_type.type, env, []), depth)
+        body = yield self._readback(self.eval(term.body, _extend(env, Var(depth)), []), depth + 1)
+        if term.tag == LAMBDA:
+            return Lambda(Arg(var_type, term.var_type.name), body)
+        return Forall(Arg(var_type, term.var_type.name), body)
+
+    def _readback_thunk(self, thunk: Closure, depth: int):
+        if not self.sharing:
+            return (yield self._readback(self.eval(thunk.term, thunk.env, []), depth))
+        normal = thunk.normal
+        if normal is not None and normal[0] == depth:
+            return normal[1]
+        expr = yield self._readback(self.force(thunk), depth)
+        thunk.normal = (depth, expr)
+        return expr
+
+    def normalize(self, expr: Expr) -> Expr:
+        # 自由的 BoundVar(i) 对应深度 n-1-i 的变量, 从深度 n 开始读回, 读回后下标不变
+        depth = expr.loose_bvar_range
+        env = ([Var(level) for level in range(depth)], depth)
+        return self.readback(self.eval(expr, env, []), depth)
+
+
+def normalize(expr: Expr, def_pool: dict[str, Expr] = None, used_free_symbols: set[str] = None, sharing: bool = False, fuel: int = None) -> Expr:
+    """
+    用环境机求 beta 范式; 给定 def_pool 时同时展开其中的定义 (beta-delta 范式).
+    sharing=True 时按需调用, fuel 限制 beta 和 delta 的总步数, 用完时抛出 FuelExhausted.
+    """
+    if def_pool and used_free_symbols is None:
+        used_free_symbols = get_level_symbols(expr)
+    return Machine(def_pool, used_free_symbols, sharing, fuel).normalize(expr)
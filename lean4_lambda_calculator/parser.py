@@ -1,4 +1,11 @@
-from lark import Lark, Transformer, UnexpectedInput
+import hashlib
+import os
+import pprint
+import re
+import sys
+from lark import Lark, Transformer, UnexpectedInput, __version__ as lark_version
+from lark.grammar import Rule
+from lark.lexer import TerminalDef
 from lean4_lambda_calculator.expr import BoundVar, Const, Lambda, Forall, App, Sort, Arg, print_expr_by_name, Expr, const_to_boundvar, set_boundvar_name
 from lean4_lambda_calculator.level import SuccLevel, MaxLevel, IMaxLevel
 from lean4_lambda_calculator.calculator import calc
@@ -13,18 +20,23 @@ class TypeDef:
         pass
 
 class EqDef:
-    def __init__(self, name: str, expr: Expr):
+    def __init__(self, name: str, expr: Expr, type: Expr = None):
         self.name = name
         self.expr = expr
+        # 导入的定义带有声明的类型
+        self.type = type
 
     def __repr__(self):
-        return f"def {self.name} := {self.type}"
-        pass
+        if self.type is None:
+            return f"def {self.name} := {self.expr}"
+        return f"def {self.name} : {self.type} := {self.expr}"
 
 class ThmDef:
-    def __init__(self, name: str, type: Expr):
+    def __init__(self, name: str, type: Expr, proof: Expr = None):
         self.name = name
         self.type = type
+        # 导入的定理带有证明项, 否则证明在 shell 中逐步给出
+        self.proof = proof
 
     def __repr__(self):
         return f"thm {self.name} : {self.type}"
@@ -69,7 +81,7 @@ expr_grammar = r"""
     boundvar: "#" INT (":" identifier)? -> boundvar
 
     // 层级表达式
-    level: level "+" "1" -> succlevel
+    level: level "+" INT -> succlevel
          | INT -> integer
          | identifier -> unwrap
          | "Max" "(" level "," level ")"  -> maxlevel
@@ -137,7 +149,10 @@ class ExprTransformer(Transformer):
         return str(items[0])
     
     def succlevel(self, items):
-        return SuccLevel(items[0])
+        level = items[0]
+        for _ in range(int(items[1])):
+            level = SuccLevel(level)
+        return level
     
     def maxlevel(self, items):
         return MaxLevel(items[0], items[1])
@@ -184,30 +199,292 @@ class ExprTransformer(Transformer):
     def thmdef(self, items):
         return ThmDef(items[0], items[1])
 
+# 预编译的 LALR 分析表: grammar_table.py 由 write_grammar_table 从 expr_grammar 生成, 提交到仓库并随包发布.
+# 修改文法后运行 python -m lean4_lambda_calculator.parser --generate-table 重新生成, tests/test_parser.py 检查它是否过期.
+GRAMMAR_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar_table.py")
+
+# 分析表过期或当前的 lark 无法读取时才编译文法. 编译结果缓存到环境变量 LEAN4_PARSER_CACHE 指定的路径,
+# 未设置时使用 lark 在临时目录中的缓存 (不写入包目录), 设为空字符串时不使用缓存.
+GRAMMAR_CACHE = os.environ.get("LEAN4_PARSER_CACHE")
+
+_lark: Lark | None = None
+
+def grammar_hash() -> str:
+    return hashlib.sha256(expr_grammar.encode("utf-8")).hexdigest()
+
+def write_grammar_table(path: str = GRAMMAR_TABLE):
+    lark = Lark(expr_grammar, parser="lalr")
+    data, memo = lark.memo_serialize([TerminalDef, Rule])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# -*- coding: utf-8 -*-\n")
+        f.write("# 由 python -m lean4_lambda_calculator.parser --generate-table 生成, 不要手动修改.\n")
+        f.write(f"# lark {lark_version}\n")
+        f.write(f"GRAMMAR_SHA256 = {grammar_hash()!r}\n\n")
+        f.write(f"DATA = {pprint.pformat(data, width=120)}\n\n")
+        f.write(f"MEMO = {pprint.pformat(memo, width=120)}\n")
+
+def _load_table() -> Lark | None:
+    from lean4_lambda_calculator import grammar_table
+    if grammar_table.GRAMMAR_SHA256 != grammar_hash():
+        return None
+    try:
+        return Lark._load_from_dict(grammar_table.DATA, grammar_table.MEMO, transformer=ExprTransformer())
+    except Exception:
+        # 其他版本的 lark 生成的表格式不兼容
+        return None
+
+def _build_lark() -> Lark:
+    lark = _load_table()
+    if lark is not None:
+        return lark
+    # 缓存文件不完整 (另一个进程正在写入) 或不可写时, lark 直接编译文法, 不影响结果.
+    # 同时写入的进程写的是相同的内容.
+    cache = True if GRAMMAR_CACHE is None else GRAMMAR_CACHE or False
+    return Lark(expr_grammar, parser="lalr", transformer=ExprTransformer(), cache=cache)
+
+def get_lark() -> Lark:
+    # 同一个进程中的 Parser 共享分析器, ExprTransformer 没有状态
+    global _lark
+    if _lark is None:
+        _lark = _build_lark()
+    return _lark
+
+# 手写的解析器: 词法分析后自顶向下按优先级解析, 直接构造 Expr.
+# 绑定变量名在同一遍中通过作用域表解析为 BoundVar, `#i:name` 的名字同时转移到对应的 binder 上,
+# 结果与 lark 路径 (解析, ExprTransformer, const_to_boundvar, set_boundvar_name) 完全相同.
+# 右结合的 -> 和 => 链用循环处理, 只有括号嵌套会递归.
+# 不支持的输入抛出 PrattError, Parser 改用 lark 解析并给出错误信息.
+
+PARSER_BACKEND = os.environ.get("LEAN4_PARSER", "pratt")
+
+_TOKEN_RE = re.compile(r"[ \t\f\r\n]+|([\w.']+)|(:=|->|=>|[():#,+])")
+_INT_RE = re.compile(r"[0-9]+")
+_OPERATORS = {":=", "->", "=>", "(", ")", ":", "#", ",", "+"}
+
+class PrattError(Exception):
+    pass
+
+class _NamedArg:
+    # `(name : type)` 只能出现在 => 或 -> 之前
+    __slots__ = ("name", "type")
+
+    def __init__(self, name: str, type: Expr):
+        self.name = name
+        self.type = type
+
+def _tokenize(code: str) -> list[str]:
+    tokens = []
+    position = 0
+    while position < len(code):
+        match = _TOKEN_RE.match(code, position)
+        if match is None:
+            raise PrattError(f"unexpected character {code[position]!r}")
+        token = match.group(1) or match.group(2)
+        if token is not None:
+            tokens.append(token)
+        position = match.end()
+    # 结束标记, 向前看两个 token 时不会越界
+    tokens += [None, None]
+    return tokens
+
+class PrattParser:
+    def __init__(self, code: str):
+        self.tokens = _tokenize(code)
+        self.position = 0
+        # 从外到内的绑定变量, 每项是 [最终的名字, 原来的名字]
+        self.scope: list[list[str | None]] = []
+        # 名字 -> 以此为名的绑定变量在 scope 中的位置
+        self.bound: dict[str, list[int]] = {}
+
+    def parse(self) -> Expr | TypeDef | EqDef | ThmDef:
+        head = self.tokens[0]
+        if head == "def" or head == "thm":
+            self.position = 1
+            name = self.word()
+            if head == "thm":
+                self.expect(":")
+                return ThmDef(name, self.expr_until_end())
+            if self.peek() == ":=":
+                self.position += 1
+                return EqDef(name, self.expr_until_end())
+            self.expect(":")
+            expr_type = self.expr()
+            if self.peek() is None:
+                return TypeDef(name, expr_type)
+            self.expect(":=")
+            value = self.expr_until_end()
+            if "Proj" in print_expr_by_name(value):
+                return TypeDef(name, expr_type)
+            return EqDef(name, value)
+        return self.expr_until_end()
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position]
+
+    def expect(self, token: str):
+        if self.tokens[self.position] != token:
+            raise PrattError(f"expected {token!r} at token {self.position}")
+        self.position += 1
+
+    def word(self) -> str:
+        token = self.tokens[self.position]
+        if token is None or token in _OPERATORS:
+            raise PrattError(f"expected an identifier at token {self.position}")
+        self.position += 1
+        return token
+
+    def expr_until_end(self) -> Expr:
+        # 每个表达式有独立的作用域
+        self.scope, self.bound = [], {}
+        expr = self.expr()
+        if self.peek() is not None:
+            raise PrattError(f"unexpected {self.peek()!r} at token {self.position}")
+        return expr
+
+    def push(self, name: str | None):
+        if name is not None:
+            self.bound.setdefault(name, []).append(len(self.scope))
+        self.scope.append([name, name])
+
+    def pop(self) -> str | None:
+        name, origin = self.scope.pop()
+        if origin is not None:
+            self.bound[origin].pop()
+        return name
+
+    def push_arg(self, item) -> Expr:
+        # 返回 binder 的类型, 绑定变量在 binder 的 body 中可见
+        if isinstance(item, _NamedArg):
+            self.push(item.name)
+            return item.type
+        self.push(None)
+        return item
+
+    def expr(self) -> Expr:
+        # forall: lambda (-> lambda)*, 右结合; lambda: app (=> app)*, 右结合, 优先级高于 forall
+        forall_types = []
+        while True:
+            lambda_types = []
+            item = self.app()
+            while self.peek() == "=>":
+                self.position += 1
+                lambda_types.append(self.push_arg(item))
+                item = self.app()
+            if isinstance(item, _NamedArg) and (lambda_types or self.peek() != "->"):
+                raise PrattError(f"unexpected binder at token {self.position}")
+            for var_type in reversed(lambda_types):
+                item = Lambda(Arg(var_type, self.pop()), item)
+            if self.peek() != "->":
+                break
+            self.position += 1
+            forall_types.append(self.push_arg(item))
+        for var_type in reversed(forall_types):
+            item = Forall(Arg(var_type, self.pop()), item)
+        return item
+
+    def app(self) -> Expr | _NamedArg:
+        func = self.app_expr(True)
+        if isinstance(func, _NamedArg):
+            return func
+        while True:
+            token = self.peek()
+            if token is None or (token in _OPERATORS and token != "(" and token != "#"):
+                return func
+            func = App(func, self.app_expr(False))
+
+    def app_expr(self, allow_named: bool) -> Expr | _NamedArg:
+        token = self.peek()
+        if token == "(":
+            if self.tokens[self.position + 2] == ":" and self.tokens[self.position + 1] not in _OPERATORS and self.tokens[self.position + 1] not in (None, "Sort"):
+                if not allow_named:
+                    raise PrattError(f"unexpected binder at token {self.position}")
+                name = self.tokens[self.position + 1]
+                self.position += 3
+                expr = self.expr()
+                self.expect(")")
+                return _NamedArg(name, expr)
+            self.position += 1
+            expr = self.expr()
+            self.expect(")")
+            return expr
+        if token == "#":
+            self.position += 1
+            index = self.word()
+            if not _INT_RE.fullmatch(index):
+                raise PrattError(f"expected an index at token {self.position}")
+            index = int(index)
+            if self.peek() == ":":
+                self.position += 1
+                if index >= len(self.scope):
+                    raise PrattError(f"unbound variable #{index}")
+                self.scope[-1 - index][0] = self.word()
+            return BoundVar(index)
+        label = self.word()
+        if label == "Sort":
+            self.expect("(")
+            level = self.level()
+            self.expect(")")
+            return Sort(level)
+        positions = self.bound.get(label)
+        if positions:
+            return BoundVar(len(self.scope) - 1 - positions[-1])
+        return Const(label)
+
+    def level(self):
+        token = self.word()
+        if token == "Max" or token == "IMax":
+            self.expect("(")
+            left = self.level()
+            self.expect(",")
+            right = self.level()
+            self.expect(")")
+            level = MaxLevel(left, right) if token == "Max" else IMaxLevel(left, right)
+        elif _INT_RE.fullmatch(token):
+            level = int(token)
+        else:
+            level = token
+        while self.peek() == "+":
+            self.position += 1
+            step = self.word()
+            if not _INT_RE.fullmatch(step):
+                raise PrattError(f"expected an integer at token {self.position}")
+            for _ in range(int(step)):
+                level = SuccLevel(level)
+        return level
+
 class Parser:
-    def __init__(self):
-        self.parser = Lark(expr_grammar, parser="lalr", transformer=ExprTransformer())
+    def __init__(self, backend: str = None):
+        # "pratt" 使用手写的解析器, 失败时交给 lark; "lark" 只使用 lark (参考实现)
+        self.backend = backend if backend is not None else PARSER_BACKEND
+        self.parser = get_lark() if self.backend == "lark" else None
 
     def parse(self, code: str) -> Expr|str:
         code = code.strip()
         if len(code) == 0:
             return ""
+        if self.backend != "lark":
+            try:
+                return PrattParser(code).parse()
+            except (PrattError, RecursionError):
+                pass
+        if self.parser is None:
+            self.parser = get_lark()
         try:
             expr = self.parser.parse(code)
             if isinstance(expr, Expr):
                 expr = const_to_boundvar(expr, [])
-                set_boundvar_name(expr, [])
+                expr = set_boundvar_name(expr)
             elif isinstance(expr, TypeDef):
                 tmp = const_to_boundvar(expr.type, [])
-                set_boundvar_name(tmp, [])
+                tmp = set_boundvar_name(tmp)
                 expr = TypeDef(expr.name, tmp)
             elif isinstance(expr, EqDef):
                 tmp = const_to_boundvar(expr.expr, [])
-                set_boundvar_name(tmp, [])
+                tmp = set_boundvar_name(tmp)
                 expr = EqDef(expr.name, tmp)
             elif isinstance(expr, ThmDef):
                 tmp = const_to_boundvar(expr.type, [])
-                set_boundvar_name(tmp, [])
+                tmp = set_boundvar_name(tmp)
                 expr = ThmDef(expr.name, tmp)
             return expr
         except Exception as e:
@@ -222,6 +499,11 @@ class Parser:
         return message
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--generate-table"]:
+        write_grammar_table()
+        print(f"wrote {GRAMMAR_TABLE}")
+        sys.exit(0)
+
     # 解析 Unicode 表达式
     Prop = Sort(0)
     Iff = Const("Iff")
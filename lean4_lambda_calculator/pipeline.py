@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+大文件的并行解析: 在声明边界切分文件, 多个进程并行解析, 结果按源码顺序返回.
+
+切分只按行扫描, 不做词法分析: .lean 文件用 importer.split_declarations, history 格式每个非空行是一个单元.
+单元按 chunksize 分组发送给 worker, worker 解析后用 serialize.ExprWriter 把一组结果写成二进制格式
+(字符串表, level 表, 节点记录), 主进程解码. 进程之间只传递字节串和整数, 不 pickle Expr 对象.
+
+python -m lean4_lambda_calculator.pipeline query_const.lean [--jobs N] [--chunksize K]
+"""
+
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from lean4_lambda_calculator.expr import Expr
+from lean4_lambda_calculator.parser import Parser, TypeDef, EqDef, ThmDef
+from lean4_lambda_calculator.importer import split_declarations, parse_declaration
+from lean4_lambda_calculator.serialize import ExprEncoder, ExprWriter, ExprReader
+
+# 单元结果的种类
+_EXPR, _TYPEDEF, _EQDEF, _THMDEF, _ERROR = range(5)
+
+
+class Parsed:
+    # 一个解析单元: 源码在文件中的行范围 [start, end] (行号从 1 开始, 包含两端),
+    # code 是源码 (history 格式保留行首的缩进), item 是解析结果, 失败时是错误信息
+    def __init__(self, start: int, end: int, code: str, item):
+        self.start = start
+        self.end = end
+        self.code = code
+        self.item = item
+
+    def __repr__(self):
+        return f"Parsed({self.start}-{self.end}: {self.item})"
+
+
+def split_units(lines: Iterable[str], lean: bool) -> list[tuple[int, str]]:
+    """把文件切分为 (起始行号, 源码) 单元"""
+    if lean:
+        return list(split_declarations(lines))
+    units = []
+    for number, line in enumerate(lines, 1):
+        code = line.rstrip()
+        if code.strip():
+            units.append((number, code))
+    return units
+
+
+def _parse_units(units: list[tuple[int, str]], lean: bool) -> list:
+    parser = None if lean else Parser()
+    items = []
+    for line, code in units:
+        if lean:
+            items.append(parse_declaration(code, line))
+            continue
+        step = code[0].isspace()
+        code = code.strip()
+        try:
+            # 证明步骤中的 .giveup 是 shell 命令, 按原样保留
+            items.append(code if step and code == ".giveup" else parser.parse(code))
+        except RecursionError:
+            items.append(f"line {line}: expression is nested too deeply")
+    return items
+
+
+def _encode(items: list, encoder: ExprEncoder) -> list[tuple]:
+    rst = []
+    for item in items:
+        if isinstance(item, str):
+            rst.append((_ERROR, item, -1, -1))
+        elif isinstance(item, Expr):
+            rst.append((_EXPR, None, encoder.encode(item), -1))
+        elif isinstance(item, TypeDef):
+            rst.append((_TYPEDEF, item.name, encoder.encode(item.type), -1))
+        elif isinstance(item, EqDef):
+            rst.append((_EQDEF, item.name, encoder.encode(item.expr), -1 if item.type is None else encoder.encode(item.type)))
+        else:
+            rst.append((_THMDEF, item.name, encoder.encode(item.type), -1 if item.proof is None else encoder.encode(item.proof)))
+    return rst
+
+
+def _decode(message: tuple) -> list:
+    data, encoded = message
+    reader = ExprReader(io.BytesIO(data))
+    # 只有节点, 没有条目
+    for _ in reader:
+        pass
+    nodes = reader.decoder.nodes
+    rst = []
+    for kind, text, a, b in encoded:
+        if kind == _ERROR:
+            rst.append(text)
+        elif kind == _EXPR:
+            rst.append(nodes[a])
+        elif kind == _TYPEDEF:
+            rst.append(TypeDef(text, nodes[a]))
+        elif kind == _EQDEF:
+            rst.append(EqDef(text, nodes[a], None if b < 0 else nodes[b]))
+        else:
+            rst.append(ThmDef(text, nodes[a], None if b < 0 else nodes[b]))
+    return rst
+
+
+def _parse_chunk(units: list[tuple[int, str]], lean: bool) -> tuple:
+    # worker 的入口: 解析一组单元, 结果编码到同一组表中
+    stream = io.BytesIO()
+    writer = ExprWriter(stream)
+    encoded = _encode(_parse_units(units, lean), writer.encoder)
+    writer.close()
+    return stream.getvalue(), encoded
+
+
+def parse_lines(lines: Iterable[str], lean: bool, jobs: int = None, chunksize: int = 64) -> list[Parsed]:
+    """
+    解析所有单元, 按源码顺序返回. jobs 为进程数, 默认为 CPU 个数; jobs <= 1 时在当前进程中解析, 不经过编码.
+    lean 为 True 时按 Lean 打印格式解析, 否则按 history 格式解析.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    units = split_units(lines, lean)
+    if jobs <= 1 or len(units) <= chunksize:
+        items = _parse_units(units, lean)
+    else:
+        chunks = [units[i:i + chunksize] for i in range(0, len(units), chunksize)]
+        items = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # map 按提交顺序返回结果
+            for message in executor.map(_parse_chunk, chunks, [lean] * len(chunks)):
+                items += _decode(message)
+    return [Parsed(line, line + code.count("\n"), code, item) for (line, code), item in zip(units, items)]
+
+
+def parse_file(path: str, jobs: int = None, chunksize: int = 64) -> list[Parsed]:
+    """.lean 文件按 Lean 打印格式解析, 其他文件按 history 格式解析"""
+    with open(path, "r") as f:
+        return parse_lines(f, path.endswith(".lean"), jobs, chunksize)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse a declaration file in parallel")
+    parser.add_argument("path", type=str, help="Path of the declaration file (.lean or history.txt format)")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes, 1 parses in this process")
+    parser.add_argument("--chunksize", type=int, default=64, help="Number of declarations sent to a worker at once")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = parse_file(args.path, args.jobs, args.chunksize)
+    elapsed = time.perf_counter() - start
+    for result in results:
+        if isinstance(result.item, str):
+            print(f"{args.path}:{result.start}-{result.end}: {result.item}")
+    errors = sum(1 for result in results if isinstance(result.item, str))
+    print(f"parsed {len(results)} units, {errors} errors, {elapsed:.2f}s")
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+低开销的函数级性能统计, 替代原来基于 logging 的 log_execution_time.
+
+关闭时被装饰的函数只多一次布尔判断; 打开后在内存中累计调用次数, 累计时间和自身时间,
+按需输出报告. 可以通过环境变量 LEAN4_PROFILE=1 (或 LEAN4_PROFILE=N, 每 N 棵调用树采样一棵) 在启动时打开.
+"""
+
+import os
+import sys
+import time
+from functools import wraps
+
+
+class FunctionStats:
+    __slots__ = ("name", "calls", "sampled_calls", "cumulative_time", "self_time", "depth")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0  # 总调用次数, 不受采样影响
+        self.sampled_calls = 0  # 被计时的调用次数
+        self.cumulative_time = 0.0  # 递归调用只在最外层计入
+        self.self_time = 0.0  # 扣除被统计的子调用后的时间
+        self.depth = 0  # 当前递归深度
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1
+        self.stats: dict[str, FunctionStats] = {}
+        self.counters: dict[str, int] = {}
+        # 注册的缓存, 报告中输出它们的 stats()
+        self.caches: dict[str, object] = {}
+        # 每个活动调用的子调用耗时累加器
+        self._child_times: list[float] = []
+        self._sampling = False
+        self._roots = 0
+
+    def enable(self, sample_rate: int = 1):
+        """打开统计. sample_rate=N 时只对每 N 棵调用树中的一棵计时, 调用次数始终精确"""
+        assert sample_rate >= 1, "sample_rate must be positive"
+        self.sample_rate = sample_rate
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def register_cache(self, name: str, cache):
+        """缓存需要提供 stats() 和 reset_stats(), 命中率等统计始终开启"""
+        self.caches[name] = cache
+
+    def reset(self):
+        self.stats.clear()
+        self.counters.clear()
+        for cache in self.caches.values():
+            cache.reset_stats()
+        self._child_times.clear()
+        self._sampling = False
+        self._roots = 0
+
+    def count(self, name: str, step: int = 1):
+        """自定义计数器, 例如缓存命中次数; 关闭时不计数"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + step
+
+    def _get_stats(self, name: str) -> FunctionStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = FunctionStats(name)
+        return stats
+
+    def call(self, name: str, func, args, kwargs):
+        stats = self._get_stats(name)
+        stats.calls += 1
+        child_times = self._child_times
+        if not child_times:
+            # 新的调用树: 决定是否采样
+            self._sampling = self._roots % self.sample_rate == 0
+            self._roots += 1
+        if not self._sampling:
+            child_times.append(0.0)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child_times.pop()
+        stats.sampled_calls += 1
+        stats.depth += 1
+        child_times.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.depth -= 1
+            stats.self_time += elapsed - child_times.pop()
+            if stats.depth == 0:
+                stats.cumulative_time += elapsed
+            if child_times:
+                child_times[-1] += elapsed
+
+    def report(self, sort_by: str = "cumulative_time", limit: int = None) -> str:
+        rows = sorted(self.stats.values(), key=lambda stats: getattr(stats, sort_by), reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+        lines = []
+        if self.sample_rate > 1:
+            lines.append(f"sampling 1/{self.sample_rate} call trees, times are measured on sampled calls only")
+        lines.append(f"{'function':<24} {'calls':>10} {'sampled':>10} {'cum ms':>12} {'self ms':>12} {'us/call':>10}")
+        for stats in rows:
+            per_call = stats.self_time / stats.sampled_calls * 1e6 if stats.sampled_calls else 0.0
+            lines.append(
+                f"{stats.name:<24} {stats.calls:>10} {stats.sampled_calls:>10} "
+                f"{stats.cumulative_time * 1000:>12.2f} {stats.self_time * 1000:>12.2f} {per_call:>10.2f}"
+            )
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<24} {value:>10}")
+        for name, cache in sorted(self.caches.items()):
+            stats = cache.stats()
+            hits = stats.get("hits", 0) + stats.get("failure_hits", 0)
+            lookups = hits + stats.get("misses", 0)
+            hit_rate = hits / lookups * 100 if lookups else 0.0
+            details = " ".join(f"{key}={value}" for key, value in stats.items())
+            lines.append(f"{name:<24} hit rate {hit_rate:5.1f}%  {details}")
+        return "\n".join(lines)
+
+    def dump(self, path: str = None, sort_by: str = "cumulative_time", limit: int = None):
+        """输出报告到文件, 不指定路径时输出到 stderr"""
+        text = self.report(sort_by, limit)
+        if path is None:
+            print(text, file=sys.stderr)
+        else:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        return text
+
+
+profiler = Profiler()
+
+
+def profile(func):
+    """装饰器: 统计函数的调用次数和耗时. 关闭时只多一次属性判断"""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        return profiler.call(name, func, args, kwargs)
+
+    return wrapper
+
+
+_env_value = os.environ.get("LEAN4_PROFILE", "")
+if _env_value not in ("", "0"):
+    profiler.enable(int(_env_value) if _env_value.isdigit() else 1)
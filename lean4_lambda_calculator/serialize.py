@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+Expr 的紧凑编码, 用于进程间传递, 快照和缓存, 不 pickle Expr 对象.
+
+- 字符串表: Const 的名字和绑定变量名, 每个字符串只保存一次, 下标 0 表示 None
+- level 表: Sort 的 level 规范形, 每种只保存一次
+- 节点记录: 每个节点三个整数 (tag, a, b), 子节点先于父节点编码, a / b 是子节点的编号 (向后引用),
+  共享的子项只编码一次
+
+    SORT      (level 下标, 0)        CONST   (字符串下标, 0)
+    BOUNDVAR  (下标, 名字)           ARG     (类型节点, 名字)
+    FORALL / LAMBDA  (Arg 节点, body 节点)   APP  (func 节点, arg 节点)
+
+解码时按顺序构造节点, 节点经过 hash-consing, 与编码前的节点是同一个对象.
+
+二进制格式 (ExprWriter / ExprReader): 文件头 MAGIC + 格式版本, 之后是一串段, 每段为 (类型字节, 长度, 内容),
+所有整数都是无符号 varint (LEB128). 写入方每次 flush 只输出新增的表项, 读取方按段追加, 两边都可以流式处理:
+
+    'S' 字符串表: 个数, 每个字符串 (字节数, UTF-8)
+    'L' level 表: 个数, 每个规范形 (常数, 项数, 每项 (0, 参数名) 或 (1, imax 的两个规范形), 偏移量)
+    'N' 节点记录: 个数, 每个记录 tag 与两个字段, 子节点用相对编号 (当前编号 - 子节点编号) 表示
+    'E' 条目: 个数, 每个条目 (种类, 键的字符串下标, 节点编号)
+    'Z' 结束
+
+python -m lean4_lambda_calculator.serialize snapshot.lexpr  # 输出快照的统计
+"""
+
+import argparse
+import io
+import time
+from typing import BinaryIO, Iterator
+
+from lean4_lambda_calculator.expr import Expr, Sort, Const, BoundVar, Arg, Forall, Lambda, App
+from lean4_lambda_calculator.cache import VersionedPool
+from lean4_lambda_calculator.level import Level, LevelNF
+from lean4_lambda_calculator.traversal import SORT, CONST, BOUNDVAR, ARG, FORALL, LAMBDA, APP
+
+
+class ExprEncoder:
+    """把多个 Expr 编码到同一组表中, 它们之间共享的子项只编码一次"""
+
+    def __init__(self):
+        self.strings: list[str] = []
+        self.levels: list[LevelNF] = []
+        self.records: list[int] = []
+        self._string_index: dict[str, int] = {}
+        self._level_index: dict[LevelNF, int] = {}
+        # id(node) -> 节点编号; _nodes 保持节点存活, id 不会被复用
+        self._node_index: dict[int, int] = {}
+        self._nodes: list[Expr] = []
+
+    def string(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        index = self._string_index.get(value)
+        if index is None:
+            self.strings.append(value)
+            index = self._string_index[value] = len(self.strings)
+        return index
+
+    def level(self, level: Level) -> int:
+        index = self._level_index.get(level.nf)
+        if index is None:
+            # 参数名也放进字符串表, level 表可以用下标引用它们
+            self._level_strings(level.nf)
+            index = self._level_index[level.nf] = len(self.levels)
+            self.levels.append(level.nf)
+        return index
+
+    def _level_strings(self, nf: LevelNF):
+        for base, _ in nf[1]:
+            if isinstance(base, str):
+                self.string(base)
+            else:
+                self._level_strings(base[1])
+                self._level_strings(base[2])
+
+    def encode(self, expr: Expr) -> int:
+        """返回节点编号"""
+        node_index = self._node_index
+        index = node_index.get(id(expr))
+        if index is not None:
+            return index
+        records = self.records
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if id(node) in node_index:
+                stack.pop()
+                continue
+            tag = node.tag
+            if tag == APP:
+                children = (node.func, node.arg)
+            elif tag == FORALL or tag == LAMBDA:
+                children = (node.var_type, node.body)
+            elif tag == ARG:
+                children = (node.type,)
+            else:
+                children = ()
+            pending = [child for child in children if id(child) not in node_index]
+            if pending:
+                stack.extend(reversed(pending))
+                continue
+            stack.pop()
+            if tag == APP or tag == FORALL or tag == LAMBDA:
+                records += (tag, node_index[id(children[0])], node_index[id(children[1])])
+            elif tag == ARG:
+                records += (tag, node_index[id(children[0])], self.string(node.name))
+            elif tag == BOUNDVAR:
+                records += (tag, node.index, self.string(node.name))
+            elif tag == CONST:
+                records += (tag, self.string(node.label), 0)
+            else:
+                records += (tag, self.level(node.level), 0)
+            node_index[id(node)] = len(self._nodes)
+            self._nodes.append(node)
+        return node_index[id(expr)]
+
+
+class ExprDecoder:
+    """按顺序解码节点记录. 表可以分多次追加, 之后的记录可以引用之前解码的节点"""
+
+    def __init__(self):
+        self.strings: list[str | None] = [None]
+        self.levels: list[Level] = []
+        self.nodes: list[Expr] = []
+
+    def add_strings(self, strings: list[str]):
+        self.strings += strings
+
+    def add_levels(self, levels: list[LevelNF]):
+        self.levels += [Level.from_nf(nf) for nf in levels]
+
+    def decode(self, records: list[int]) -> list[Expr]:
+        """解码记录, 返回所有已解码的节点 (下标为节点编号)"""
+        strings, levels, nodes = self.strings, self.levels, self.nodes
+        it = iter(records)
+        for tag, a, b in zip(it, it, it):
+            if tag == APP:
+                node = App(nodes[a], nodes[b])
+            elif tag == FORALL:
+                node = Forall(nodes[a], nodes[b])
+            elif tag == LAMBDA:
+                node = Lambda(nodes[a], nodes[b])
+            elif tag == ARG:
+                node = Arg(nodes[a], strings[b])
+            elif tag == BOUNDVAR:
+                node = BoundVar(a, strings[b])
+            elif tag == CONST:
+                node = Const(strings[a])
+            elif tag == SORT:
+                node = Sort(levels[a])
+            else:
+                raise ValueError(f"unknown node tag {tag}")
+            nodes.append(node)
+        return nodes
+
+
+MAGIC = b"L4EX"
+FORMAT_VERSION = 1
+
+_STRINGS, _LEVELS, _NODES, _ENTRIES, _END = b"S", b"L", b"N", b"E", b"Z"
+
+# 条目的种类, 用于保存 type_pool / def_pool
+TYPE_ENTRY, DEF_ENTRY = 0, 1
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_nf(out: bytearray, nf: LevelNF, string_index: dict[str, int]):
+    const, terms = nf
+    _write_varint(out, const)
+    _write_varint(out, len(terms))
+    for base, offset in terms:
+        if isinstance(base, str):
+            out.append(0)
+            _write_varint(out, string_index[base])
+        else:
+            out.append(1)
+            _write_nf(out, base[1], string_index)
+            _write_nf(out, base[2], string_index)
+        _write_varint(out, offset)
+
+
+def _read_nf(data: bytes, pos: int, strings: list) -> tuple[LevelNF, int]:
+    const, pos = _read_varint(data, pos)
+    count, pos = _read_varint(data, pos)
+    terms = []
+    for _ in range(count):
+        kind = data[pos]
+        pos += 1
+        if kind == 0:
+            index, pos = _read_varint(data, pos)
+            base = strings[index]
+        else:
+            left, pos = _read_nf(data, pos, strings)
+            right, pos = _read_nf(data, pos, strings)
+            base = ("imax", left, right)
+        offset, pos = _read_varint(data, pos)
+        terms.append((base, offset))
+    return (const, tuple(terms)), pos
+
+
+class ExprWriter:
+    """
+    流式写入二进制格式. write 返回节点编号, write_entry 记录一个带键的条目;
+    新增的表项和条目在 flush 时写出, 之前写出的节点可以被之后的记录引用
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.encoder = ExprEncoder()
+        # 已经写出的字符串, level 和节点记录的个数
+        self._strings = 0
+        self._levels = 0
+        self._records = 0
+        self._entries: list[tuple[int, int, int]] = []
+        header = bytearray(MAGIC)
+        _write_varint(header, FORMAT_VERSION)
+        stream.write(header)
+
+    def write(self, expr: Expr) -> int:
+        return self.encoder.encode(expr)
+
+    def write_entry(self, key: str | None, expr: Expr, kind: int = 0):
+        self._entries.append((kind, self.encoder.string(key), self.encoder.encode(expr)))
+
+    def _section(self, tag: bytes, payload: bytearray):
+        header = bytearray(tag)
+        _write_varint(header, len(payload))
+        self.stream.write(header)
+        self.stream.write(payload)
+
+    def flush(self):
+        encoder = self.encoder
+        if len(encoder.strings) > self._strings:
+            payload = bytearray()
+            _write_varint(payload, len(encoder.strings) - self._strings)
+            for value in encoder.strings[self._strings:]:
+                data = value.encode()
+                _write_varint(payload, len(data))
+                payload += data
+            self._strings = len(encoder.strings)
+            self._section(_STRINGS, payload)
+        if len(encoder.levels) > self._levels:
+            payload = bytearray()
+            _write_varint(payload, len(encoder.levels) - self._levels)
+            for nf in encoder.levels[self._levels:]:
+                _write_nf(payload, nf, encoder._string_index)
+            self._levels = len(encoder.levels)
+            self._section(_LEVELS, payload)
+        records = encoder.records
+        if len(records) > self._records:
+            payload = bytearray()
+            _write_varint(payload, (len(records) - self._records) // 3)
+            number = self._records // 3
+            for i in range(self._records, len(records), 3):
+                tag, a, b = records[i], records[i + 1], records[i + 2]
+                payload.append(tag)
+                if tag == APP or tag == FORALL or tag == LAMBDA:
+                    _write_varint(payload, number - a)
+                    _write_varint(payload, number - b)
+                elif tag == ARG:
+                    _write_varint(payload, number - a)
+                    _write_varint(payload, b)
+                elif tag == BOUNDVAR:
+                    _write_varint(payload, a)
+                    _write_varint(payload, b)
+                else:
+                    _write_varint(payload, a)
+                number += 1
+            self._records = len(records)
+            self._section(_NODES, payload)
+        if self._entries:
+            payload = bytearray()
+            _write_varint(payload, len(self._entries))
+            for kind, key, node in self._entries:
+                _write_varint(payload, kind)
+                _write_varint(payload, key)
+                _write_varint(payload, node)
+            self._entries = []
+            self._section(_ENTRIES, payload)
+
+    def close(self):
+        self.flush()
+        self._section(_END, bytearray())
+
+
+class ExprReader:
+    """流式读取二进制格式, 迭代时按写入顺序返回条目 (种类, 键, Expr)"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.decoder = ExprDecoder()
+        header = stream.read(len(MAGIC))
+        if header != MAGIC:
+            raise ValueError("not an Expr stream")
+        version = self._read_header_varint()
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported format version {version}")
+
+    def _read_header_varint(self) -> int:
+        value, shift = 0, 0
+        while True:
+            byte = self.stream.read(1)
+            if not byte:
+                raise ValueError("truncated Expr stream")
+            value |= (byte[0] & 0x7F) << shift
+            if byte[0] < 0x80:
+                return value
+            shift += 7
+
+    def __iter__(self) -> Iterator[tuple[int, str | None, Expr]]:
+        decoder = self.decoder
+        while True:
+            tag = self.stream.read(1)
+            if not tag:
+                raise ValueError("truncated Expr stream")
+            length = self._read_header_varint()
+            data = self.stream.read(length)
+            if len(data) != length:
+                raise ValueError("truncated Expr stream")
+            if tag == _END:
+                return
+            count, pos = _read_varint(data, 0)
+            if tag == _STRINGS:
+                strings = []
+                for _ in range(count):
+                    size, pos = _read_varint(data, pos)
+                    strings.append(data[pos:pos + size].decode())
+                    pos += size
+                decoder.add_strings(strings)
+            elif tag == _LEVELS:
+                levels = []
+                for _ in range(count):
+                    nf, pos = _read_nf(data, pos, decoder.strings)
+                    levels.append(nf)
+                decoder.add_levels(levels)
+            elif tag == _NODES:
+                decoder.decode(self._records(data, pos, count, len(decoder.nodes)))
+            elif tag == _ENTRIES:
+                nodes, strings = decoder.nodes, decoder.strings
+                for _ in range(count):
+                    kind, pos = _read_varint(data, pos)
+                    key, pos = _read_varint(data, pos)
+                    node, pos = _read_varint(data, pos)
+                    yield kind, strings[key], nodes[node]
+            else:
+                raise ValueError(f"unknown section {tag!r}")
+
+    @staticmethod
+    def _records(data: bytes, pos: int, count: int, number: int) -> list[int]:
+        # 把相对编号换回绝对编号, 得到 ExprDecoder 的记录. 字段大多小于 128, 单字节的 varint 直接读取
+        records = []
+        read = _read_varint
+        for _ in range(count):
+            tag = data[pos]
+            a = data[pos + 1]
+            pos += 2
+            if a >= 0x80:
+                a, pos = read(data, pos - 1)
+            if tag == SORT or tag == CONST:
+                records += (tag, a, 0)
+                number += 1
+                continue
+            b = data[pos]
+            pos += 1
+            if b >= 0x80:
+                b, pos = read(data, pos - 1)
+            if tag == BOUNDVAR:
+                records += (tag, a, b)
+            elif tag == ARG:
+                records += (tag, number - a, b)
+            else:
+                records += (tag, number - a, number - b)
+            number += 1
+        return records
+
+
+def dumps(exprs: list[Expr]) -> bytes:
+    """把一组 Expr 编码为字节串, 共享的子项只保存一次"""
+    stream = io.BytesIO()
+    writer = ExprWriter(stream)
+    for expr in exprs:
+        writer.write_entry(None, expr)
+    writer.close()
+    return stream.getvalue()
+
+
+def loads(data: bytes) -> list[Expr]:
+    return [expr for _, _, expr in ExprReader(io.BytesIO(data))]
+
+
+def save_pools(stream: BinaryIO, type_pool: dict[str, Expr], def_pool: dict[str, Expr], flush_every: int = 256):
+    """保存 type_pool 和 def_pool, 每 flush_every 个常量写出一次"""
+    writer = ExprWriter(stream)
+    for count, (name, expr_type) in enumerate(type_pool.items(), 1):
+        writer.write_entry(name, expr_type, TYPE_ENTRY)
+        if name in def_pool:
+            writer.write_entry(name, def_pool[name], DEF_ENTRY)
+        if count % flush_every == 0:
+            writer.flush()
+    for name, definition in def_pool.items():
+        # 没有类型的定义 (一般不会出现) 也保存
+        if name not in type_pool:
+            writer.write_entry(name, definition, DEF_ENTRY)
+    writer.close()
+
+
+def load_pools(stream: BinaryIO) -> tuple[VersionedPool, VersionedPool]:
+    type_pool: VersionedPool = VersionedPool(bump_on_insert=False)
+    def_pool: VersionedPool = VersionedPool()
+    for kind, name, expr in ExprReader(stream):
+        if kind == TYPE_ENTRY:
+            type_pool[name] = expr
+        elif kind == DEF_ENTRY:
+            def_pool[name] = expr
+    return type_pool, def_pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show statistics of a saved type_pool / def_pool snapshot")
+    parser.add_argument("path", type=str)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.path, "rb") as f:
+        type_pool, def_pool = load_pools(f)
+    elapsed = time.perf_counter() - start
+    print(f"{len(type_pool)} types, {len(def_pool)} definitions, loaded in {elapsed * 1000:.1f} ms")
@@ -1,7 +1,15 @@
 import os
 from lean4_lambda_calculator.expr import print_expr_by_name, Expr, expr_clean_all_names
-from lean4_lambda_calculator.calculator import calc, expr_todef, proof_step
+from lean4_lambda_calculator.calculator import calc, infer_type, proof_step
+from lean4_lambda_calculator.machine import normalize, FuelExhausted
 from lean4_lambda_calculator.parser import Parser, EqDef, TypeDef, ThmDef
+from lean4_lambda_calculator.level import LevelConstraints
+from lean4_lambda_calculator.profiler import profiler
+from lean4_lambda_calculator.traversal import dag_size, tree_size
+from lean4_lambda_calculator.cache import VersionedPool
+from lean4_lambda_calculator.store import DeclarationStore
+from lean4_lambda_calculator.batch import IncrementalChecker
+from lean4_lambda_calculator.serialize import save_pools, load_pools
 from colorama import Fore, Style, init
 from prompt_toolkit import prompt
 from prompt_toolkit.shortcuts import CompleteStyle
@@ -11,23 +19,54 @@ import argparse  # 用于解析命令行参数
 
 init(autoreset=True)
 
+# 显示和保存类型前化简的步数上限
+NORMALIZE_FUEL = 100000
+
 class Shell:
-    def __init__(self, history_file="./history.txt"):
+    def __init__(self, history_file="./history.txt", store_path: str = None):
         self.parser = Parser()
-        self.type_pool: dict[str, Expr] = {}
-        self.def_pool: dict[str, Expr] = {}
+        # 带版本号的常量池, calc 的缓存以版本号区分环境; 新增常量不会使 type_pool 的缓存失效
+        self.type_pool: dict[str, Expr] = VersionedPool(bump_on_insert=False)
+        self.def_pool: dict[str, Expr] = VersionedPool()
         self.is_in_proof = False
         self.goals: list[Expr] = []
         self.history_file = history_file  # 使用传入的 history_file 参数
+        # 给定 store_path 时, 启动时从磁盘读取已经检查过的声明
+        self.store = DeclarationStore(store_path) if store_path is not None else None
         self.load_history()
         self.history = FileHistory("./prompt_history.txt")
 
     def load_history(self):
-        if os.path.exists(self.history_file):
-            with open(self.history_file, "r") as f:
-                for line in f:
-                    print(">>" if not self.is_in_proof else "[Proof] >>", line.strip())
-                    self.execute(line.strip())
+        if not os.path.exists(self.history_file):
+            return
+        with open(self.history_file, "r") as f:
+            lines = f.readlines()
+        if self.store is not None:
+            lines = self.load_from_store(lines)
+        for line in lines:
+            print(">>" if not self.is_in_proof else "[Proof] >>", line.strip())
+            self.execute(line.strip())
+
+    def load_from_store(self, lines: list[str]) -> list[str]:
+        # 最后一条 thm 的证明可能还没有完成, 留给 execute 恢复证明状态, 返回这些行
+        start = len(lines)
+        for index in range(len(lines) - 1, -1, -1):
+            if lines[index].strip() and not lines[index][0].isspace():
+                if lines[index].startswith("thm "):
+                    start = index
+                break
+        checker = IncrementalChecker(jobs=1, store=self.store)
+        results, type_pool, def_pool = checker.check(lines[:start])
+        for result in results:
+            if result.ok:
+                if result.type is not None:
+                    print(Fore.CYAN + result.name, ":" + Style.RESET_ALL, print_expr_by_name(result.type))
+            else:
+                print(Fore.RED + f"[Error] line {result.line}: " + str(result.error) + Style.RESET_ALL)
+        self.type_pool.update(type_pool)
+        self.def_pool.update(def_pool)
+        print(Fore.YELLOW + "[Store]" + Style.RESET_ALL, f"{len(results)} declarations, {checker.reused} loaded from {self.store.path}")
+        return lines[start:]
 
     def save_history(self, code: str):
         with open(self.history_file, "a") as f:
@@ -44,13 +83,16 @@ class Shell:
             # error
             print(Fore.RED + "[Error] " + expr + Style.RESET_ALL)
             return False
+        # 每条声明 (或证明步骤) 使用一个 universe 约束存储
+        level_constraints = LevelConstraints()
         if self.is_in_proof:
             if isinstance(expr, Expr):
                 try:
-                    expr, expr_type = calc(expr, None, self.type_pool, self.def_pool, None)
+                    # 证明步骤只需要类型, 不需要化简证明项本身
+                    expr_type = self.normal_form(infer_type(expr, None, self.type_pool, self.def_pool, None, level_constraints=level_constraints))
                     s_expr_type = print_expr_by_name(expr_type)
                     print(Fore.GREEN + "[Proof]" + Style.RESET_ALL, s_expr_type)
-                    next_goals = proof_step(expr_type, self.goals[0], type_pool=self.type_pool, def_pool=self.def_pool)
+                    next_goals = proof_step(expr_type, self.goals[0], type_pool=self.type_pool, def_pool=self.def_pool, level_constraints=level_constraints)
                     if next_goals is not None:
                         self.goals = next_goals + self.goals[1:]
                     if len(self.goals) == 0:
@@ -68,7 +110,7 @@ class Shell:
         if isinstance(expr, EqDef):
             # 展开定义 
             try:
-                definition, expr_type = calc(expr_todef(expr.expr, self.def_pool), None, self.type_pool, self.def_pool, None)
+                definition, expr_type = calc(expr.expr, None, self.type_pool, self.def_pool, None, level_constraints=level_constraints)
                 self.def_pool[expr.name] = expr_clean_all_names(definition)
                 self.type_pool[expr.name] = expr_clean_all_names(expr_type)
                 print(Fore.CYAN + expr.name, ":" + Style.RESET_ALL, print_expr_by_name(expr_type), Fore.CYAN + ":=" + Style.RESET_ALL, print_expr_by_name(expr.expr))
@@ -76,25 +118,40 @@ class Shell:
                 print(Fore.RED + "[Error] " + str(e) + Style.RESET_ALL)
                 return False
         elif isinstance(expr, TypeDef):
-            expr_type, _ = calc(expr_todef(expr.type, self.def_pool), None, self.type_pool, self.def_pool, None)
-            self.type_pool[expr.name] = expr_clean_all_names(expr_type)
+            try:
+                infer_type(expr.type, None, self.type_pool, self.def_pool, None, level_constraints=level_constraints)
+            except Exception as e:
+                print(Fore.RED + "[Error] " + str(e) + Style.RESET_ALL)
+                return False
+            self.type_pool[expr.name] = expr_clean_all_names(self.normal_form(expr.type))
             print(Fore.CYAN + expr.name, ":" + Style.RESET_ALL, print_expr_by_name(expr.type))
         elif isinstance(expr, ThmDef):
             # 证明
+            try:
+                infer_type(expr.type, None, self.type_pool, self.def_pool, None, level_constraints=level_constraints)
+            except Exception as e:
+                print(Fore.RED + "[Error] " + str(e) + Style.RESET_ALL)
+                return False
             self.is_in_proof = True
-            expr_type, _ = calc(expr_todef(expr.type, self.def_pool), None, self.type_pool, self.def_pool, None)
-            self.type_pool[expr.name] = expr_clean_all_names(expr_type)
+            self.type_pool[expr.name] = expr_clean_all_names(self.normal_form(expr.type))
             self.goals = [expr.type]
             print(Fore.CYAN + expr.name, ":" + Style.RESET_ALL, print_expr_by_name(expr.type))
             print(Fore.GREEN + "[Proof] [Goal]" + Style.RESET_ALL, print_expr_by_name(expr.type))
         else:
             try: 
-                expr, expr_type = calc(expr, None, self.type_pool, self.def_pool, None)
+                expr_type = self.normal_form(infer_type(expr, None, self.type_pool, self.def_pool, None, level_constraints=level_constraints))
                 print(print_expr_by_name(expr_type))
             except Exception as e:
                 print(Fore.RED + "[Error] " + str(e) + Style.RESET_ALL)
                 return False
         return True
+
+    def normal_form(self, expr: Expr) -> Expr:
+        # 表达式已经检查过, 化简超出步数上限或嵌套过深时按原样使用
+        try:
+            return normalize(expr, sharing=True, fuel=NORMALIZE_FUEL)
+        except (FuelExhausted, RecursionError):
+            return expr
     
     def get_default_input(self):
         if not self.is_in_proof:
@@ -134,10 +191,62 @@ class Shell:
         else:
             print(Fore.YELLOW + "[QUERY]" + Style.RESET_ALL, "unknown")
 
+    def size_command(self, names: list[str]):
+        # .size <ConstName>...: 类型和定义的 DAG 大小 (不同节点数) 与展开成树后的大小
+        for name in names:
+            if name not in self.type_pool:
+                print(Fore.YELLOW + "[SIZE]" + Style.RESET_ALL, name, "unknown")
+                continue
+            for kind, pool in (("type", self.type_pool), ("def", self.def_pool)):
+                if name in pool:
+                    print(Fore.YELLOW + "[SIZE]" + Style.RESET_ALL, name, kind, f"dag={dag_size(pool[name])} tree={tree_size(pool[name])}")
+
+    def save_command(self, args: list[str]):
+        # .save <path>: 把 type_pool 和 def_pool 保存为二进制快照
+        if len(args) != 1:
+            print(Fore.RED + "[Error] usage: .save <path>" + Style.RESET_ALL)
+            return
+        with open(args[0], "wb") as f:
+            save_pools(f, self.type_pool, self.def_pool)
+        print(Fore.YELLOW + "[SAVE]" + Style.RESET_ALL, f"{len(self.type_pool)} constants saved to {args[0]}")
+
+    def load_command(self, args: list[str]):
+        # .load <path>: 读取快照中的常量, 快照中的条目覆盖同名常量, 不重新检查
+        if len(args) != 1:
+            print(Fore.RED + "[Error] usage: .load <path>" + Style.RESET_ALL)
+            return
+        try:
+            with open(args[0], "rb") as f:
+                type_pool, def_pool = load_pools(f)
+        except (OSError, ValueError, IndexError) as e:
+            print(Fore.RED + f"[Error] {e}" + Style.RESET_ALL)
+            return
+        self.type_pool.update(type_pool)
+        self.def_pool.update(def_pool)
+        print(Fore.YELLOW + "[LOAD]" + Style.RESET_ALL, f"{len(type_pool)} constants loaded from {args[0]}")
+
+    def profile_command(self, args: list[str]):
+        # .profile on [N] | off | reset | dump [path]
+        action = args[0] if args else "dump"
+        if action == "on":
+            profiler.enable(int(args[1]) if len(args) > 1 else 1)
+        elif action == "off":
+            profiler.disable()
+        elif action == "reset":
+            profiler.reset()
+        elif action == "dump":
+            if len(args) > 1:
+                profiler.dump(args[1])
+                print(Fore.YELLOW + "[PROFILE]" + Style.RESET_ALL, f"report written to {args[1]}")
+            else:
+                print(profiler.report())
+        else:
+            print(Fore.RED + "[Error] usage: .profile on [N] | off | reset | dump [path]" + Style.RESET_ALL)
+
     def run(self):
         try:
             while True:
-                completer = WordCompleter(['def', 'thm', '->', '=>', '.giveup', '.exit'] + list(self.type_pool.keys()))
+                completer = WordCompleter(['def', 'thm', '->', '=>', '.giveup', '.exit', '.profile', '.size', '.save', '.load'] + list(self.type_pool.keys()))
                 # 提示用户输入
                 code = prompt(
                     ">> " if not self.is_in_proof else "[Proof] >> ", 
@@ -152,6 +261,18 @@ class Shell:
                 if code.startswith(".query "):
                     for name in code.split(' ')[1:]:
                         self.query_const(name)
+                if code == ".profile" or code.startswith(".profile "):
+                    self.profile_command(code.split()[1:])
+                    continue
+                if code.startswith(".size "):
+                    self.size_command(code.split()[1:])
+                    continue
+                if code == ".save" or code.startswith(".save "):
+                    self.save_command(code.split()[1:])
+                    continue
+                if code == ".load" or code.startswith(".load "):
+                    self.load_command(code.split()[1:])
+                    continue
                 if len(code) == 0:
                     continue
                 prefix = "  " if self.is_in_proof else ""
@@ -163,7 +284,11 @@ class Shell:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Lean4 Shell")
     parser.add_argument("--history", type=str, default="./history.txt", help="Path to the history file")
+    parser.add_argument("--store", type=str, default=None, help="Directory of the on-disk store of checked declarations")
+    parser.add_argument("--profile", type=int, nargs="?", const=1, default=None, metavar="N", help="Enable profiling, sampling one of every N call trees")
     args = parser.parse_args()
 
-    shell = Shell(history_file=args.history)
+    if args.profile is not None:
+        profiler.enable(args.profile)
+    shell = Shell(history_file=args.history, store_path=args.store)
     shell.run()
\ No newline at end of file
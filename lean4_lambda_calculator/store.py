@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+检查结果的磁盘存储: 以内容哈希为地址, 每个声明一个文件, 多个进程可以同时读写.
+
+键由声明的内容哈希 (batch.Declaration.digest, 包含源码和依赖的哈希) 与检查器版本计算.
+检查器版本是检查器各模块源码的哈希, 修改检查器后旧的结果自动失效.
+写入时先写临时文件再 os.replace, 读者只会看到完整的文件; 读到损坏的文件时视为未命中.
+
+文件的第一行是 JSON 编码的 [name, ok, error], 之后是 serialize 的二进制格式, 保存 type 和 definition.
+编码和解码都是迭代的, 很深的项也可以保存; 读取时不执行文件中的任何代码.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from lean4_lambda_calculator import calculator
+from lean4_lambda_calculator.serialize import ExprWriter, ExprReader, TYPE_ENTRY, DEF_ENTRY
+
+# 影响检查结果的模块
+_CHECKER_MODULES = ["batch.py", "cache.py", "calculator.py", "Context.py", "expr.py", "importer.py", "level.py", "machine.py", "parser.py", "pipeline.py", "serialize.py", "store.py", "traversal.py"]
+
+
+def checker_version() -> str:
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in _CHECKER_MODULES:
+        with open(os.path.join(directory, module), "rb") as f:
+            digest.update(f.read())
+    # 化简方式和步数上限会影响结果
+    digest.update(f"{calculator.NORMALIZER}:{calculator.NORMALIZER_FUEL}".encode())
+    return digest.hexdigest()
+
+
+class DeclarationStore:
+    """以 digest 为键保存 (name, ok, error, type, definition), 共享的子项只保存一次"""
+
+    def __init__(self, path: str, version: str = None):
+        self.path = path
+        self.version = version if version is not None else checker_version()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, digest: str) -> str:
+        key = hashlib.sha256(f"{self.version}:{digest}".encode()).hexdigest()
+        return os.path.join(self.path, key[:2], key[2:])
+
+    def get(self, digest: str) -> tuple | None:
+        try:
+            with open(self._file(digest), "rb") as f:
+                name, ok, error = json.loads(f.readline())
+                exprs = {TYPE_ENTRY: None, DEF_ENTRY: None}
+                for kind, _, expr in ExprReader(f):
+                    exprs[kind] = expr
+            value = (name, ok, error, exprs[TYPE_ENTRY], exprs[DEF_ENTRY])
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # 损坏或不兼容的文件视为未命中, 之后会被覆盖
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, digest: str, value: tuple):
+        path = self._file(digest)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            name, ok, error, expr_type, definition = value
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps([name, ok, error]).encode() + b"\n")
+                writer = ExprWriter(f)
+                if expr_type is not None:
+                    writer.write_entry(None, expr_type, TYPE_ENTRY)
+                if definition is not None:
+                    writer.write_entry(None, definition, DEF_ENTRY)
+                writer.close()
+            # 同一个键的内容总是相同, 并发写入时谁最后替换都可以
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.writes += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self._file(digest))
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
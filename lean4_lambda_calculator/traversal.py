@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Expr 的迭代遍历框架: 用显式栈代替 Python 递归, 很长的应用链和很深的 Forall 链不会触及递归上限.
+
+- walk: 先序枚举所有节点
+- fold: 后序折叠, 子节点的结果传给父节点, 同时维护绑定变量栈
+- replace: 自顶向下替换子项, 只重建发生变化的节点, 保持共享
+- dag_size / tree_size: 不同节点的个数与展开成树后的节点个数
+- run: 驱动写成生成器的递归算法 (calc, infer_type)
+
+子节点的访问顺序与原来的递归实现一致: Arg 为 type, 应用为 func, arg, binder 为 var_type, body.
+本模块不依赖 expr.py, 重建节点时使用原节点的类.
+"""
+
+# 节点类型标签, 遍历时用整数比较代替 isinstance 链
+SORT, CONST, BOUNDVAR, ARG, FORALL, LAMBDA, APP = range(7)
+
+# 显式栈上的操作: 进入节点, 合并子节点的结果, 压入和弹出绑定变量
+_ENTER, _EXIT, _BIND, _UNBIND = range(4)
+
+
+def walk(expr, unique: bool = False):
+    """先序遍历. 默认共享的子项每次出现都会被枚举, unique=True 时每个节点只枚举一次"""
+    seen = {id(expr)} if unique else None
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        yield node
+        tag = node.tag
+        if tag == APP:
+            children = (node.arg, node.func)
+        elif tag == FORALL or tag == LAMBDA:
+            children = (node.body, node.var_type)
+        elif tag == ARG:
+            children = (node.type,)
+        else:
+            continue
+        for child in children:
+            if seen is not None:
+                if id(child) in seen:
+                    continue
+                seen.add(id(child))
+            stack.append(child)
+
+
+def fold(expr, visit, binders: list = None, bind=None):
+    """
+    后序折叠: 对每个节点调用 visit(node, results, binders), results 是子节点的结果列表, 返回根节点的结果.
+    binders 是从外到内的绑定变量栈, 下标为 i 的 BoundVar 对应 binders[-1 - i].
+    进入 binder 的 body 前压入 var_type, 给定 bind 时压入 bind(node).
+    调用 binder 节点自己的 visit 时, 它的绑定变量仍在栈顶.
+    """
+    if binders is None:
+        binders = []
+    results = []
+    stack = [(_ENTER, expr)]
+    while stack:
+        op, node = stack.pop()
+        if op == _ENTER:
+            tag = node.tag
+            if tag == APP:
+                stack.append((_EXIT, node))
+                stack.append((_ENTER, node.arg))
+                stack.append((_ENTER, node.func))
+            elif tag == FORALL or tag == LAMBDA:
+                stack.append((_UNBIND, node))
+                stack.append((_EXIT, node))
+                stack.append((_ENTER, node.body))
+                stack.append((_BIND, node))
+                stack.append((_ENTER, node.var_type))
+            elif tag == ARG:
+                stack.append((_EXIT, node))
+                stack.append((_ENTER, node.type))
+            else:
+                results.append(visit(node, (), binders))
+        elif op == _EXIT:
+            num_children = 1 if node.tag == ARG else 2
+            children = results[-num_children:]
+            del results[-num_children:]
+            results.append(visit(node, children, binders))
+        elif op == _BIND:
+            binders.append(node.var_type if bind is None else bind(node))
+        else:
+            binders.pop()
+    return results[0]
+
+
+def replace(expr, fn, offset: int = 0, binders: list = None, memoize: bool = True):
+    """
+    自顶向下替换: fn(node, depth) 返回替换后的节点, 返回 None 时继续处理子节点.
+    depth 是 offset 加上经过的 binder 个数. 子节点都没有变化时保留原节点.
+    给定 binders 时与 fold 一样维护从外到内的绑定变量栈, fn 可以通过闭包读取.
+
+    没有给定 binders 时, 结果只由 (节点, depth) 决定: 同一次调用中每个 (节点 id, depth) 只处理一次,
+    输入中共享的子项在结果中仍然共享, DAG 不会被展开成树. fn 有副作用时传入 memoize=False.
+    """
+    memo = {} if memoize and binders is None else None
+    results = []
+    stack = [(_ENTER, expr, offset)]
+    while stack:
+        op, node, depth = stack.pop()
+        if op == _ENTER:
+            if memo is not None:
+                new_node = memo.get((id(node), depth))
+                if new_node is not None:
+                    results.append(new_node)
+                    continue
+            new_node = fn(node, depth)
+            if new_node is not None:
+                if memo is not None:
+                    memo[(id(node), depth)] = new_node
+                results.append(new_node)
+                continue
+            tag = node.tag
+            if tag == APP:
+                stack.append((_EXIT, node, depth))
+                stack.append((_ENTER, node.arg, depth))
+                stack.append((_ENTER, node.func, depth))
+            elif tag == FORALL or tag == LAMBDA:
+                if binders is not None:
+                    stack.append((_UNBIND, node, depth))
+                stack.append((_EXIT, node, depth))
+                stack.append((_ENTER, node.body, depth + 1))
+                if binders is not None:
+                    stack.append((_BIND, node, depth))
+                stack.append((_ENTER, node.var_type, depth))
+            elif tag == ARG:
+                stack.append((_EXIT, node, depth))
+                stack.append((_ENTER, node.type, depth))
+            else:
+                results.append(node)
+        elif op == _EXIT:
+            tag = node.tag
+            if tag == ARG:
+                new_type = results.pop()
+                new_node = node.__class__(new_type, node.name) if new_type is not node.type else node
+                results.append(new_node)
+            else:
+                second = results.pop()
+                first = results[-1]
+                if tag == APP:
+                    changed = first is not node.func or second is not node.arg
+                else:
+                    changed = first is not node.var_type or second is not node.body
+                new_node = node.__class__(first, second) if changed else node
+                results[-1] = new_node
+            if memo is not None:
+                memo[(id(node), depth)] = new_node
+        elif op == _BIND:
+            binders.append(node.var_type)
+        else:
+            binders.pop()
+    return results[0]
+
+
+def _children(node) -> tuple:
+    tag = node.tag
+    if tag == APP:
+        return (node.func, node.arg)
+    elif tag == FORALL or tag == LAMBDA:
+        return (node.var_type, node.body)
+    elif tag == ARG:
+        return (node.type,)
+    return ()
+
+
+def dag_size(expr) -> int:
+    """不同节点 (按对象) 的个数"""
+    seen = {id(expr)}
+    stack = [expr]
+    while stack:
+        for child in _children(stack.pop()):
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append(child)
+    return len(seen)
+
+
+def tree_size(expr) -> int:
+    """把共享的子项展开成树后的节点个数, 每个节点只计算一次, 耗时与 dag_size 成正比"""
+    sizes: dict[int, int] = {}
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in sizes:
+            continue
+        children = _children(node)
+        if expanded or not children:
+            sizes[id(node)] = 1 + sum(sizes[id(child)] for child in children)
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children if id(child) not in sizes)
+    return sizes[id(expr)]
+
+
+def run(task):
+    """
+    驱动生成器形式的递归算法: 生成器 yield 一个子任务 (同样是生成器) 表示递归调用,
+    子任务 return 的值通过 send 传回. 子任务中的异常在父任务的 yield 处重新抛出.
+    调用链保存在列表中, 深度不受 Python 递归上限限制.
+    """
+    stack = [task]
+    value = None
+    error = None
+    traceback = None
+    while True:
+        pending_error = None
+        try:
+            if error is None:
+                subtask = stack[-1].send(value)
+            else:
+                pending_error, error = error, None
+                subtask = stack[-1].throw(pending_error)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            value = stop.value
+            continue
+        except BaseException as e:
+            stack.pop()
+            if e is pending_error:
+                # 异常沿调用链向上传递时不累积 traceback, 只保留抛出处的调用栈
+                e.with_traceback(traceback)
+            else:
+                traceback = e.__traceback__
+            if not stack:
+                raise
+            error = e
+            continue
+        stack.append(subtask)
+        value = None
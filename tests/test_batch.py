@@ -0,0 +1,66 @@
+import os
+from lean4_lambda_calculator.batch import read_declarations, check_declarations, check_file, IncrementalChecker
+from lean4_lambda_calculator.expr import Sort
+
+HISTORY = os.path.join(os.path.dirname(__file__), "..", "history.txt")
+
+CODE = """def Prop := Sort(0)
+def And : Prop -> Prop -> Prop
+def And.intro : (a:Prop)->(b:Prop)->a->b->And a b
+def Bad : Prop -> Missing
+def UsesBad : Bad
+thm And.self : (a:Prop)->a->And a a
+  (a:Prop)=>(h:a)=>And.intro a a h h
+thm Wrong : (a:Prop)->a
+  (a:Prop)=>(h:a)=>h
+def UsesWrong := Wrong
+"""
+
+def test_dependencies():
+    declarations = read_declarations(CODE.splitlines())
+    assert [d.name for d in declarations] == ["Prop", "And", "And.intro", "Bad", "UsesBad", "And.self", "Wrong", "UsesWrong"]
+    assert declarations[2].deps == [0, 1]
+    assert declarations[4].deps == [3]
+    assert len(declarations[5].steps) == 1
+    assert declarations[5].deps == [0, 1, 2]
+
+def test_check_declarations():
+    declarations = read_declarations(CODE.splitlines())
+    for jobs in [1, 2]:
+        results, type_pool, def_pool = check_declarations(declarations, jobs=jobs)
+        assert [r.ok for r in results] == [True, True, True, False, False, True, False, True]
+        # 依赖检查失败的声明时不再检查; 证明失败的定理仍然加入环境
+        assert "depends on failed declaration Bad" in results[4].error
+        assert results[6].type is not None
+        assert def_pool["Prop"] == Sort(0)
+        assert "UsesBad" not in type_pool and "UsesWrong" in type_pool
+
+def test_parallel_matches_sequential():
+    sequential, type_pool, def_pool = check_file(HISTORY, jobs=1)
+    parallel, parallel_type_pool, parallel_def_pool = check_file(HISTORY, jobs=2, chunksize=4)
+    assert [(r.name, r.ok, r.error) for r in sequential] == [(r.name, r.ok, r.error) for r in parallel]
+    assert dict(type_pool) == dict(parallel_type_pool)
+    assert dict(def_pool) == dict(parallel_def_pool)
+
+def test_incremental():
+    with open(HISTORY) as f:
+        lines = f.readlines()
+    checker = IncrementalChecker()
+    results, _, _ = checker.check(lines)
+    assert checker.reused == 0
+    checker.check(lines)
+    assert checker.reused == len(results)
+    # 修改 False 的类型: 只有传递依赖 False 的声明重新检查
+    edited = [line.replace("def False : Prop", "def False : Sort(1)") for line in lines]
+    assert edited != lines
+    declarations = read_declarations(edited)
+    index = next(d.index for d in declarations if d.name == "False")
+    affected = {index}
+    for d in declarations:
+        if affected.intersection(d.deps):
+            affected.add(d.index)
+    new_results, type_pool, _ = checker.check(edited)
+    assert checker.reused == len(declarations) - len(affected)
+    fresh, fresh_type_pool, _ = check_declarations(declarations, jobs=1)
+    assert [(r.line, r.ok, r.error) for r in new_results] == [(r.line, r.ok, r.error) for r in fresh]
+    assert dict(type_pool) == dict(fresh_type_pool)
@@ -0,0 +1,65 @@
+from lean4_lambda_calculator.cache import LRUCache, VersionedPool, DefEqCache
+from lean4_lambda_calculator.calculator import calc, calc_cache
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, App, BoundVar, print_expr_by_index
+from lean4_lambda_calculator.Context import Context
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # b 最久未被使用, 被淘汰
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 1, "evictions": 1}
+
+def test_versioned_pool():
+    pool = VersionedPool(bump_on_insert=False)
+    version = pool.version
+    pool["a"] = Sort(0)
+    assert pool.version == version
+    pool["a"] = Sort(1)
+    assert pool.version != version
+    other = VersionedPool()
+    other["a"] = Sort(0)
+    assert other.version != pool.version
+
+def test_calc_cache_is_env_aware():
+    expr = App(Const("f"), Const("x"))
+    type_pool1 = VersionedPool({"f": Forall(Arg(Sort(1)), Sort(1)), "x": Sort(1)})
+    type_pool2 = VersionedPool({"f": Forall(Arg(Sort(2)), Sort(2)), "x": Sort(2)})
+    _, type1 = calc(expr, None, type_pool1, VersionedPool())
+    _, type2 = calc(expr, None, type_pool2, VersionedPool())
+    assert print_expr_by_index(type1) == "Sort(1)"
+    assert print_expr_by_index(type2) == "Sort(2)"
+
+def test_calc_cache_closed_term_under_context():
+    type_pool = VersionedPool({"f": Forall(Arg(Sort(1)), Sort(1)), "x": Sort(1)})
+    def_pool = VersionedPool()
+    expr = App(Const("f"), Const("x"))
+    calc(expr, None, type_pool, def_pool)
+    hits = calc_cache.hits
+    context = Context[Arg]()
+    context.push(Arg(Sort(1), "y"))
+    _, expr_type = calc(expr, context, type_pool, def_pool)
+    assert calc_cache.hits == hits + 1
+    assert print_expr_by_index(expr_type) == "Sort(1)"
+    # 含自由 BoundVar 的项不进入缓存
+    calc(App(Const("f"), BoundVar(0)), context, type_pool, def_pool)
+    assert calc_cache.hits == hits + 1
+
+def test_defeq_cache_union_find():
+    cache = DefEqCache()
+    a, b, c, d = Const("a"), Const("b"), Const("c"), Const("d")
+    cache.add_equal(1, a, b)
+    cache.add_equal(1, b, c)
+    # 传递性
+    assert cache.lookup(1, c, a) is True
+    assert cache.lookup(1, a, d) is None
+    cache.add_unequal(1, a, d)
+    assert cache.lookup(1, d, a) is False
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["failure_hits"] == 1
+    # def_pool 版本变化时清空
+    assert cache.lookup(2, a, c) is None
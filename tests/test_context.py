@@ -0,0 +1,56 @@
+import pytest
+from lean4_lambda_calculator.Context import Context
+from lean4_lambda_calculator.calculator import proof_step
+from lean4_lambda_calculator.expr import Const, Arg, Forall
+
+def test_push_pop_lookup():
+    context = Context[str]()
+    for name in ["a", "b", "c"]:
+        context.push(name)
+    # 下标 0 是最后压入的元素
+    assert len(context) == 3
+    assert [context[i] for i in range(3)] == ["c", "b", "a"]
+    assert list(context) == ["c", "b", "a"]
+    assert repr(context) == "['c', 'b', 'a']"
+    assert context.pop() == "c"
+    assert len(context) == 2 and context[0] == "b"
+    with pytest.raises(IndexError):
+        context[2]
+
+def test_sharing():
+    base = Context[str]()
+    base.push("a")
+    left = base.extend("l")
+    right = base.extend("r")
+    # 分支共享 base 的节点, base 本身不变
+    assert list(left) == ["l", "a"] and list(right) == ["r", "a"]
+    assert list(base) == ["a"]
+    assert left.head[1] is base.head
+    copy = left.copy()
+    copy.pop()
+    assert list(left) == ["l", "a"]
+    left[1] = "b"
+    assert list(left) == ["l", "b"] and list(base) == ["a"]
+
+def test_add():
+    outer = Context[str]()
+    outer.push("a")
+    outer.push("b")
+    inner = Context[str]()
+    inner.push("c")
+    combined = outer + inner
+    assert list(combined) == ["c", "b", "a"]
+    assert combined.head[1] is outer.head
+    assert list(outer) == ["b", "a"] and list(inner) == ["c"]
+
+def test_deep_proof_step():
+    A, B = Const("A"), Const("B")
+    type_pool = {"A": A, "B": A}
+    action = B
+    for _ in range(300):
+        action = Forall(Arg(A), action)
+    goals = proof_step(action, B, type_pool=type_pool, def_pool={})
+    # 每个参数一个目标, 内层参数的目标依赖外层的参数
+    assert len(goals) == 300
+    assert goals[-1] == A
+    assert goals[-2] == Forall(Arg(A), A)
@@ -0,0 +1,89 @@
+import sys
+from lean4_lambda_calculator.calculator import DefEq, whnf, calc, proof_step
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, Lambda, App, BoundVar, print_expr_by_index
+from lean4_lambda_calculator.level import Level, LevelConstraints
+
+Prop = Sort(0)
+
+def make_pools():
+    type_pool = {
+        "Prop": Sort(1),
+        "False": Prop,
+        "Not": Forall(Arg(Prop), Prop),
+        "Not2": Forall(Arg(Prop), Prop),
+        "P": Prop,
+        "f": Forall(Arg(Prop), Prop),
+    }
+    def_pool = {
+        "Prop": Prop,
+        "Not": Lambda(Arg(Prop), Forall(Arg(BoundVar(0)), Const("False"))),
+        # Not2 由 Not 构造, 高度更大
+        "Not2": Lambda(Arg(Prop), App(Const("Not"), BoundVar(0))),
+    }
+    return type_pool, def_pool
+
+def test_whnf():
+    _, def_pool = make_pools()
+    expr = App(Const("Not2"), Const("P"))
+    assert print_expr_by_index(whnf(expr, def_pool)) == "P -> False"
+    # 没有定义的常量保持不变
+    assert whnf(App(Const("f"), Const("P")), def_pool) is App(Const("f"), Const("P"))
+
+def test_defeq_delta():
+    type_pool, def_pool = make_pools()
+    not_p = App(Const("Not"), Const("P"))
+    assert DefEq(not_p, Forall(Arg(Const("P")), Const("False")), [], type_pool, def_pool)
+    assert DefEq(App(Const("Not2"), Const("P")), not_p, [], type_pool, def_pool)
+    assert not DefEq(not_p, Const("P"), [], type_pool, def_pool)
+    assert DefEq(Const("Prop"), Sort(0), [], type_pool, def_pool)
+
+def test_defeq_eta():
+    type_pool, def_pool = make_pools()
+    eta = Lambda(Arg(Prop), App(Const("f"), BoundVar(0)))
+    assert DefEq(eta, Const("f"), [], type_pool, def_pool)
+    assert DefEq(Const("f"), eta, [], type_pool, def_pool)
+
+def test_defeq_level_constraints():
+    type_pool, def_pool = make_pools()
+    store = LevelConstraints()
+    assert DefEq(Const("Prop"), Sort(Level("u")), [], type_pool, def_pool, level_constraints=store)
+    assert repr(store.resolve(Level("u"))) == "0"
+    # 失败的比较不留下约束
+    store = LevelConstraints()
+    target = Forall(Arg(Sort(Level("v"))), Const("P"))
+    assert not DefEq(target, Forall(Arg(Sort(0)), Const("False")), [], type_pool, def_pool, level_constraints=store)
+    assert store.trail == []
+
+def test_calc_keeps_definitions_folded():
+    type_pool, def_pool = make_pools()
+    expr, expr_type = calc(Lambda(Arg(Const("Prop")), App(Const("Not"), BoundVar(0))), None, type_pool, def_pool)
+    assert print_expr_by_index(expr) == "Prop => Not #0"
+    # 函数类型是定义时按需化简到 Forall
+    type_pool["g"] = App(Const("Not"), Const("P"))
+    type_pool["p"] = Const("P")
+    _, app_type = calc(App(Const("g"), Const("p")), None, type_pool, def_pool)
+    assert app_type == Const("False")
+
+def test_proof_step_unfolds_goal():
+    type_pool, def_pool = make_pools()
+    goal = App(Const("Not"), Const("P"))
+    action = Forall(Arg(Const("P")), Forall(Arg(Const("P")), Const("False")))
+    assert proof_step(action, goal, type_pool=type_pool, def_pool=def_pool) == [Forall(Arg(Const("P")), Const("P"))]
+
+def _telescope(domain, depth):
+    expr = domain
+    for _ in range(depth):
+        expr = Forall(Arg(domain), expr)
+    return expr
+
+def test_defeq_deep_chain():
+    depth = sys.getrecursionlimit() * 2
+    type_pool = {"A": Sort(1), "B": Sort(1)}
+    def_pool = {"B": Const("A")}
+    # 比较按 binder 逐层进行, 不受递归上限限制
+    assert DefEq(_telescope(Const("A"), depth), _telescope(Const("B"), depth), [], type_pool, def_pool)
+    assert not DefEq(_telescope(Const("A"), depth), _telescope(Const("B"), depth + 1), [], type_pool, def_pool)
+    # calc 在应用中比较参数类型
+    type_pool["f"] = Forall(Arg(_telescope(Const("A"), depth)), Const("A"))
+    type_pool["x"] = _telescope(Const("B"), depth)
+    assert calc(App(Const("f"), Const("x")), None, type_pool, def_pool)[1] is Const("A")
@@ -1,5 +1,5 @@
 import pytest
-from lean4_lambda_calculator.expr import Const, Sort, BoundVar, Arg, Forall, Lambda, App, print_expr_by_name, print_expr_by_index, expr_rename_args, Level
+from lean4_lambda_calculator.expr import Const, Sort, BoundVar, Arg, Forall, Lambda, App, print_expr_by_name, print_expr_by_index, expr_rename_args, expr_rename_level, Level
 
 def test_sort():
     expr = Sort(0)
@@ -69,7 +69,7 @@ def test_print_expr_by_index():
 
 def test_rename_expr():
     expr = Forall(Const("Prop"), Forall(Const("Prop"), App(Const("Iff"), BoundVar(1))))
-    expr_rename_args(expr)
+    expr = expr_rename_args(expr)
     result = print_expr_by_name(expr)
     assert result == "(a : Prop) -> (b : Prop) -> Iff a"
 
@@ -94,5 +94,52 @@ def test_nested_forall():
     assert expr.body.body == BoundVar(1)
     assert repr(expr) == "Nat -> Nat -> #1"
 
+def test_hash_consing():
+    expr1 = Forall(Arg(Const("Nat"), "n"), App(Const("Nat.succ"), BoundVar(0)))
+    expr2 = Forall(Arg(Const("Nat"), "n"), App(Const("Nat.succ"), BoundVar(0)))
+    assert expr1 is expr2
+    assert hash(expr1) == hash(expr2)
+    # 名字不同的节点是不同的对象, 但仍然相等
+    expr3 = Forall(Arg(Const("Nat"), "m"), App(Const("Nat.succ"), BoundVar(0)))
+    assert expr3 is not expr1
+    assert expr3 == expr1
+    assert hash(expr3) == hash(expr1)
+
+def test_loose_bvar_range():
+    assert Const("Nat").loose_bvar_range == 0
+    assert BoundVar(2).loose_bvar_range == 3
+    assert Lambda(Const("Nat"), BoundVar(0)).loose_bvar_range == 0
+    assert Lambda(Const("Nat"), App(BoundVar(0), BoundVar(2))).loose_bvar_range == 2
+    assert Forall(BoundVar(1), BoundVar(0)).loose_bvar_range == 2
+
+def test_immutable():
+    expr = Arg(Const("Nat"), "n")
+    with pytest.raises(AttributeError):
+        expr.name = "m"
+
+def test_rename_level():
+    expr = Forall(Sort(Level("u")), Forall(Sort(Level("v")), Sort(Level("u0"))))
+    # 冲突的 level 变量各自得到不同的新名字, 且不与表达式中已有的变量重名
+    new_expr, symbols = expr_rename_level(expr, {"u", "v"})
+    assert print_expr_by_index(new_expr) == "Sort(u1) -> Sort(u2) -> Sort(u0)"
+    assert symbols == {"u0", "u1", "u2"}
+    # 类型与定义共享重命名表
+    renamed = {}
+    expr_rename_level(Sort(Level("u")), {"u"}, renamed)
+    new_def, _ = expr_rename_level(Sort(Level("u")), {"u", "u0"}, renamed)
+    assert print_expr_by_index(new_def) == "Sort(u0)"
+
+def test_rename_level_shares_instances():
+    expr = Forall(Sort(Level("u")), Sort(Level("u")))
+    # 没有冲突时直接返回池中的项
+    assert expr_rename_level(expr, {"v"})[0] is expr
+    # 同一常量以相同的 level 参数实例化时共享同一个结果
+    first, symbols = expr_rename_level(expr, {"u"})
+    second, _ = expr_rename_level(expr, {"u"})
+    assert first is second and first is not expr
+    assert symbols == {"u0"}
+    symbols.add("w")
+    assert expr_rename_level(expr, {"u"})[1] == {"u0"}
+
 if __name__ == "__main__":
-    pytest.main()
\ No newline at end of file
+    pytest.main()
@@ -0,0 +1,88 @@
+import os
+from lean4_lambda_calculator.importer import read_lean, split_declarations, import_file
+from lean4_lambda_calculator.parser import Parser, TypeDef, EqDef, ThmDef
+from lean4_lambda_calculator.batch import read_lean_declarations, check_declarations
+from lean4_lambda_calculator.expr import Sort, Const, BoundVar, Arg, Forall, Lambda, App
+from lean4_lambda_calculator.level import SuccLevel, MaxLevel
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+SOURCE = """\
+namespace Test
+universe u v
+-- 注释中的 def x : y 不是声明
+/- 块注释
+axiom hidden : Prop -/
+-- inductive Nat : Type
+axiom f : {α : Sort u} -> (a b : α) -> @Eq α a b
+def id : {α : Sort u} -> α -> α :=
+  fun {α : Sort u} => fun (a : α) =>
+    a
+theorem t : (p : Prop) -> p -> p :=
+  fun (p : Prop) => fun (h : p) => let x := h ; x
+noncomputable def lvl : Type (max u v) := Sort (max (u + 1) v)
+axiom broken : (x : Prop) -> x +
+end Test
+"""
+
+def test_split_declarations():
+    chunks = list(split_declarations(SOURCE.splitlines(True)))
+    assert [line for line, _ in chunks] == [6, 7, 8, 11, 13, 14]
+    assert "hidden" not in "".join(code for _, code in chunks)
+
+def test_read_lean():
+    items = dict((line, item) for line, item in read_lean(SOURCE.splitlines(True)))
+    assert isinstance(items[6], TypeDef) and items[6].name == "Nat" and items[6].type is Sort(SuccLevel(0))
+    # 同一组中的 b 的类型在 a 的作用域中
+    assert items[7].type == Forall(Arg(Sort("u")), Forall(Arg(BoundVar(0)), Forall(Arg(BoundVar(1)), App(App(App(Const("Eq"), BoundVar(2)), BoundVar(1)), BoundVar(0)))))
+    assert isinstance(items[8], EqDef)
+    assert items[8].expr == Lambda(Arg(Sort("u")), Lambda(Arg(BoundVar(0)), BoundVar(0)))
+    assert items[8].type == Forall(Arg(Sort("u")), Forall(Arg(BoundVar(0)), BoundVar(1)))
+    assert repr(items[8]).startswith("def id : ")
+    # let 展开为代入
+    assert isinstance(items[11], ThmDef)
+    assert items[11].proof == Lambda(Arg(Sort(0)), Lambda(Arg(BoundVar(0)), BoundVar(0)))
+    assert items[13].type is Sort(SuccLevel(MaxLevel("u", "v")))
+    assert items[13].expr is Sort(MaxLevel(SuccLevel("u"), "v"))
+    # 错误带有行号和列号
+    assert items[14] == "line 14, column 32: expected an identifier, got '+'"
+
+def test_import_matches_parser():
+    # 与 history 格式的解析器得到相同的项
+    item = next(item for _, item in read_lean(["axiom Iff.intro : (a : Prop) -> (b : Prop) -> (a -> b) -> (b -> a) -> @Iff a b\n"]))
+    assert item.type == Parser().parse("def Iff.intro : (a:Sort(0))->(b:Sort(0))->(a->b)->(b->a)->Iff a b").type
+
+def test_import_corpus():
+    for name in ("query_const.lean", "SimpLemmas.lean"):
+        items = [item for _, item in import_file(os.path.join(ROOT, name))]
+        errors = [item for item in items if isinstance(item, str)]
+        assert len(items) > 200 and len(errors) <= 2, errors
+
+def test_check_imported():
+    source = [
+        "-- inductive Eq : {α : Sort u_1} -> α -> α -> Prop\n",
+        "-- ctor Eq.refl : {α : Sort u_1} -> (a : α) -> @Eq α a a\n",
+        "theorem rfl : {α : Sort u} -> {a : α} -> @Eq α a a :=\n",
+        "  fun {α : Sort u} => fun {a : α} => @Eq.refl α a\n",
+        "def my_id : (p : Prop) -> p -> p :=\n",
+        "  fun (p : Prop) => fun (h : p) => h\n",
+        "theorem wrong : (p : Prop) -> p :=\n",
+        "  fun (p : Prop) => p\n",
+    ]
+    declarations = read_lean_declarations(source)
+    assert [declaration.deps for declaration in declarations] == [[], [0], [0, 1], [], []]
+    results, type_pool, def_pool = check_declarations(declarations, jobs=1)
+    assert [result.ok for result in results] == [True, True, True, True, False]
+    assert "my_id" in def_pool and "wrong" in type_pool
+
+def test_check_level_params():
+    # outParam 的 u 与声明自己的 u 重名, 实例化时必须改名
+    source = [
+        "def outParam : Sort u -> Sort u :=\n",
+        "  fun (α : Sort u) => α\n",
+        "axiom Membership : @outParam (Type u) -> Type v -> Sort (max (u + 1) (v + 1))\n",
+        "def Membership' : Type u -> Type v -> Type (max u v) :=\n",
+        "  fun (α : Type u) => fun (β : Type v) => Membership α β\n",
+    ]
+    results, _, _ = check_declarations(read_lean_declarations(source), jobs=1)
+    assert [result.error for result in results] == [None, None, None]
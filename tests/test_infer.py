@@ -0,0 +1,39 @@
+import pytest
+from lean4_lambda_calculator.calculator import calc, infer_type, check
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, Lambda, App, BoundVar
+from lean4_lambda_calculator.machine import normalize
+
+A = Const("A")
+type_pool = {
+    "A": Sort(1),
+    "a": A,
+    "f": Forall(Arg(A), A),
+}
+
+def test_infer_type_matches_calc():
+    identity = Lambda(Arg(A), BoundVar(0))
+    for expr in [
+        App(identity, Const("a")),
+        Lambda(Arg(A), App(Const("f"), App(identity, BoundVar(0)))),
+        Forall(Arg(A), A),
+        App(Lambda(Arg(Sort(1)), Lambda(Arg(BoundVar(0)), BoundVar(0))), A),
+    ]:
+        _, expr_type = calc(expr, None, type_pool, {})
+        assert normalize(infer_type(expr, None, type_pool, {})) == expr_type
+
+def test_infer_type_does_not_reduce():
+    # 类型中的 beta-redex 保留到调用者需要时再化简
+    redex = App(Lambda(Arg(Sort(1)), BoundVar(0)), A)
+    expr = Lambda(Arg(redex), BoundVar(0))
+    expr_type = infer_type(expr, None, type_pool, {})
+    assert expr_type.var_type.type is redex
+    assert normalize(expr_type) == Forall(Arg(A), A)
+
+def test_infer_type_mismatch():
+    with pytest.raises(ValueError):
+        infer_type(App(Const("f"), A), None, type_pool, {})
+
+def test_check():
+    check(App(Const("f"), Const("a")), A, None, type_pool, {})
+    with pytest.raises(ValueError):
+        check(Const("a"), Sort(1), None, type_pool, {})
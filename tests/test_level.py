@@ -0,0 +1,86 @@
+import pytest
+from lean4_lambda_calculator.level import Level, SuccLevel, MaxLevel, IMaxLevel, LevelConstraints, parse_level, is_solvable, level_subs_symbols
+
+def test_normal_form():
+    assert repr(Level(0)) == "0"
+    assert repr(SuccLevel(SuccLevel("u"))) == "u+2"
+    assert repr(MaxLevel("u", 0)) == "u"
+    assert repr(MaxLevel(SuccLevel("u"), 1)) == "u+1"
+    assert repr(MaxLevel("v", "u")) == "Max(u, v)"
+    assert repr(IMaxLevel("u", 0)) == "0"
+    assert repr(IMaxLevel("u", SuccLevel("v"))) == "Max(u, v+1)"
+    assert repr(IMaxLevel("u", "v")) == "IMax(u, v)"
+
+def test_parse_level():
+    for code in ["0", "u+1", "Max(u, v+2)", "IMax(u, v)", "IMax(u, v)+1"]:
+        assert repr(parse_level(code)) == code
+    assert repr(parse_level("Max(u+1,Max(1,v))")) == "Max(u+1, v)"
+
+def test_is_equivalent():
+    assert MaxLevel("u", "v").is_equivalent(MaxLevel("v", "u"))
+    assert IMaxLevel("u", "u").is_equivalent(Level("u"))
+    assert IMaxLevel(IMaxLevel("u", "v"), "v").is_equivalent(IMaxLevel("u", "v"))
+    assert not Level("u").is_equivalent(Level("v"))
+    assert not IMaxLevel("u", "v").is_equivalent(MaxLevel("u", "v"))
+
+def test_is_leq():
+    assert Level("u").is_leq(SuccLevel("u"))
+    assert Level(1).is_leq(SuccLevel("u"))
+    assert IMaxLevel("u", "v").is_leq(MaxLevel("u", "v"))
+    assert not MaxLevel("u", "v").is_leq(IMaxLevel("u", "v"))
+    assert not SuccLevel("u").is_leq(Level("u"))
+
+def test_satisfiable_eq():
+    assert Level("u") == Level("v")
+    assert Level("u") == SuccLevel("v")
+    assert Level(0) != Level(1)
+    assert Level("u") != SuccLevel("u")
+    assert Level(0) == IMaxLevel("u", "v")
+    # 参数很多时同样精确判定, 不会因为搜索空间大而回答相等
+    many = parse_level("Max(a, Max(b, Max(c, Max(d, Max(e, f)))))")
+    assert many != SuccLevel(many)
+    assert MaxLevel(many, 3) != Level(2)
+    assert many == parse_level("Max(g, 7)+2")
+    matched, solution = many.match(parse_level("Max(g, 7)+2"))
+    assert matched and max(solution[name] for name in "abcdef") == max(solution["g"], 7) + 2
+
+def test_is_solvable():
+    assert is_solvable([])
+    assert is_solvable([(parse_level("u"), parse_level("v+1")), (parse_level("v"), Level(3))])
+    assert not is_solvable([(parse_level("u"), parse_level("v+1")), (parse_level("v"), parse_level("u+1"))])
+    assert not is_solvable([(parse_level("Max(u, 1)"), Level(0))])
+
+def test_level_constraints():
+    store = LevelConstraints()
+    assert store.add(Level("u0"), SuccLevel("u"))
+    assert repr(store.resolve(MaxLevel("u0", "v"))) == "Max(u+1, v)"
+    # 矛盾的方程被拒绝, 且不影响已有的解
+    assert not store.add(Level("u0"), Level("u"))
+    assert repr(store.resolve(Level("u0"))) == "u+1"
+    # 无法直接求解的方程被暂存
+    assert store.add(MaxLevel("v", "w"), Level(2))
+    assert store.pending
+    assert not store.add_all([(Level("v"), Level(3))])
+    assert store.add_all([(Level("v"), Level(1)), (Level("w"), Level(2))])
+    assert not store.pending
+
+def test_level_constraints_many_params():
+    # 每个方程单独有解, 合起来无解; 参数个数不影响判定
+    store = LevelConstraints()
+    assert store.add(parse_level("Max(a, b)"), parse_level("Max(c, d)"))
+    assert store.add(parse_level("Max(c, d)"), parse_level("Max(e, 3)"))
+    assert not store.add(parse_level("Max(a, b)"), parse_level("Max(e, 3)+1"))
+    assert store.add(parse_level("Max(a, b)"), parse_level("Max(e, 3)"))
+    # Max(x_i, x_{i+1}) = x_{i+1} + 1 等价于 x_i = x_{i+1} + 1, 所以 x0 = x8 + 8
+    chain = [(parse_level(f"Max(x{i}, x{i + 1})"), parse_level(f"x{i + 1}+1")) for i in range(8)]
+    assert not is_solvable(chain + [(parse_level("x0"), Level(3))])
+    assert is_solvable(chain + [(parse_level("IMax(y, x8)"), Level(0)), (parse_level("x0"), Level(8))])
+    assert not is_solvable(chain + [(parse_level("IMax(y, x0)"), Level(0))])
+
+def test_subs():
+    level = MaxLevel("u", SuccLevel("v"))
+    assert repr(level.subs({"v": 0})) == "Max(1, u)"
+    assert repr(IMaxLevel("u", "v").subs({"v": SuccLevel("w")})) == "Max(u, w+1)"
+    renamed = {}
+    assert repr(level_subs_symbols(level, {"u"}, renamed)) == "Max(u0, v+1)"
+    assert renamed == {"u": "u0"}
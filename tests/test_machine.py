@@ -0,0 +1,62 @@
+import sys
+import pytest
+from lean4_lambda_calculator.machine import normalize, FuelExhausted
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, Lambda, App, BoundVar, print_expr_by_index
+
+A = Const("A")
+
+def test_normalize_beta():
+    identity = Lambda(Arg(A), BoundVar(0))
+    assert normalize(App(identity, Const("a"))) is Const("a")
+    # K a b = a
+    k = Lambda(Arg(A), Lambda(Arg(A), BoundVar(1)))
+    assert normalize(App(App(k, Const("a")), Const("b"))) is Const("a")
+
+def test_normalize_under_binders():
+    identity = Lambda(Arg(A), BoundVar(0))
+    expr = Lambda(Arg(A, "x"), Forall(Arg(A), App(identity, BoundVar(1))))
+    result = normalize(expr)
+    assert print_expr_by_index(result) == "A => (A -> #1)"
+    assert result.var_type.name == "x"
+
+def test_normalize_open_term():
+    # 自由变量的下标保持不变
+    expr = App(Lambda(Arg(A), App(BoundVar(0), BoundVar(2))), BoundVar(0))
+    assert normalize(expr) is App(BoundVar(0), BoundVar(1))
+
+def test_normalize_delta():
+    def_pool = {"id": Lambda(Arg(Sort(1)), BoundVar(0))}
+    expr = App(Const("id"), Const("A"))
+    assert normalize(expr) is expr
+    assert normalize(expr, def_pool) is A
+
+def test_normalize_sharing():
+    def_pool = {"dup": Lambda(Arg(A), App(App(Const("f"), BoundVar(0)), BoundVar(0)))}
+    expr = Const("a")
+    for _ in range(40):
+        expr = App(Const("dup"), expr)
+    # 按需调用时每层只化简一次, 按名调用需要 2^40 步
+    result = normalize(expr, def_pool, sharing=True)
+    assert result.func.arg is result.arg
+    small = App(Const("dup"), App(Const("dup"), Const("a")))
+    assert normalize(small, def_pool) is normalize(small, def_pool, sharing=True)
+
+def test_normalize_fuel():
+    omega = Lambda(Arg(A), App(BoundVar(0), BoundVar(0)))
+    with pytest.raises(FuelExhausted):
+        normalize(App(omega, omega), fuel=100)
+    assert normalize(App(Lambda(Arg(A), BoundVar(0)), Const("a")), fuel=1) is Const("a")
+
+def test_normalize_deep_chain():
+    depth = sys.getrecursionlimit() * 2
+    def_pool = {"B": A}
+    expr, expected = Const("B"), A
+    for _ in range(depth):
+        expr, expected = Forall(Arg(Const("B")), expr), Forall(Arg(A), expected)
+    assert normalize(expr, def_pool) is expected
+    assert normalize(expr, def_pool, sharing=True) is expected
+    # 很长的参数列表
+    spine = Const("f")
+    for i in range(depth):
+        spine = App(spine, App(Lambda(Arg(A), BoundVar(0)), Const("a")))
+    assert normalize(spine, sharing=True).arg is Const("a")
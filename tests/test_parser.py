@@ -0,0 +1,89 @@
+import os
+import sys
+from lark import Lark, UnexpectedInput
+from lean4_lambda_calculator import parser as parser_module
+from lean4_lambda_calculator.parser import Parser, PrattParser, TypeDef, EqDef, ThmDef
+from lean4_lambda_calculator.expr import Expr, print_expr_by_index
+
+HISTORY = os.path.join(os.path.dirname(__file__), "..", "history.txt")
+
+EDGE_CASES = [
+    "(x : A) => x -> x", "(a) => b", "f x => y", "A -> (x:A) => x", "(x:A) => (y:A) => x -> y",
+    "(x : A) -> x -> (x : B) -> x", "(x:(y:A)->y)->x", "(x:A) => #0:y", "(x:A)=>#0:z #0:w",
+    "Sort(u+1+2)", "Sort(Max(0, Max(u,v)))", "Sort(IMax(0,u))", "f Sort(0)", "x.y'z_1", "Max", "f def",
+    "def def : A", "def x : A := Proj a", "def x : A := b", "def x := (a:Prop)=>a", "thm t : (a:Prop)->a",
+    # 语法错误由 lark 报告
+    "Sort x", "(x:A)", "f (x:A) => x", "((x:A))=>x", "(x:A) => (y:B) -> C", "def := A", "thm", "f (",
+]
+
+def _same(left, right) -> bool:
+    # 节点经过 hash-consing, 结构和名字都相同时是同一个对象
+    if isinstance(left, (Expr, str)):
+        return left is right or (isinstance(left, str) and left == right)
+    if type(left) is not type(right) or left.name != right.name:
+        return False
+    if isinstance(left, EqDef):
+        return left.expr is right.expr
+    return left.type is right.type
+
+def test_grammar_table():
+    # 文法改变后必须重新生成 grammar_table.py
+    from lean4_lambda_calculator import grammar_table
+    assert grammar_table.GRAMMAR_SHA256 == parser_module.grammar_hash(), "run python -m lean4_lambda_calculator.parser --generate-table"
+    table = parser_module._load_table()
+    assert table is not None
+    compiled = Lark(parser_module.expr_grammar, parser="lalr", transformer=parser_module.ExprTransformer())
+    with open(HISTORY) as f:
+        lines = [line.strip() for line in f if line.strip() and line.strip() != ".giveup"]
+    for code in lines + EDGE_CASES:
+        try:
+            expected = compiled.parse(code)
+        except UnexpectedInput:
+            expected = None
+        try:
+            got = table.parse(code)
+        except UnexpectedInput:
+            got = None
+        assert repr(got) == repr(expected), code
+
+def test_grammar_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / "grammar.lark.cache")
+    monkeypatch.setattr(parser_module, "GRAMMAR_CACHE", path)
+    # 不使用随包发布的分析表, 测试编译和缓存
+    monkeypatch.setattr(parser_module, "_load_table", lambda: None)
+    monkeypatch.setattr(parser_module, "_lark", None)
+    code = "def a : (x : Sort(0)) -> x"
+    expected = Parser("lark").parse(code)
+    assert isinstance(expected, TypeDef)
+    with open(path, "rb") as f:
+        header = f.readline()
+    # 从缓存加载的分析器得到相同的结果
+    monkeypatch.setattr(parser_module, "_lark", None)
+    assert Parser("lark").parse(code).type == expected.type
+    # 文法改变时重新生成缓存
+    monkeypatch.setattr(parser_module, "expr_grammar", parser_module.expr_grammar + "\n// changed\n")
+    monkeypatch.setattr(parser_module, "_lark", None)
+    assert Parser("lark").parse(code).type == expected.type
+    with open(path, "rb") as f:
+        assert f.readline() != header
+    # 损坏的缓存文件被忽略
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+    monkeypatch.setattr(parser_module, "_lark", None)
+    assert Parser("lark").parse(code).type == expected.type
+
+def test_pratt_matches_lark():
+    lark, pratt = Parser("lark"), Parser("pratt")
+    with open(HISTORY) as f:
+        lines = [line.strip() for line in f if line.strip() and line.strip() != ".giveup"]
+    for code in lines:
+        # history 中的每一行都不需要退回到 lark
+        assert _same(PrattParser(code).parse(), lark.parse(code)), code
+    for code in EDGE_CASES:
+        assert _same(pratt.parse(code), lark.parse(code)), code
+
+def test_pratt_deep_chain():
+    depth = sys.getrecursionlimit() * 2
+    code = " -> ".join(f"(x{i} : A)" for i in range(depth)) + " -> f x0 x" + str(depth - 1)
+    expr = PrattParser(code).parse()
+    assert print_expr_by_index(expr).endswith(f"f #{depth - 1} #0")
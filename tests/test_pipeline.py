@@ -0,0 +1,56 @@
+import os
+from lean4_lambda_calculator.pipeline import parse_file, parse_lines, _parse_chunk, _decode, _EXPR, _TYPEDEF, _ERROR
+from lean4_lambda_calculator.parser import TypeDef, EqDef, ThmDef
+from lean4_lambda_calculator.expr import Expr
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def _fields(item) -> list:
+    if isinstance(item, (str, Expr)):
+        return [item]
+    rst = [type(item), item.name, item.type]
+    if isinstance(item, EqDef):
+        rst.append(item.expr)
+    if isinstance(item, ThmDef):
+        rst.append(item.proof)
+    return rst
+
+def _same(left, right) -> bool:
+    # 解码得到的节点经过 hash-consing, 与直接解析的节点是同一个对象
+    return all(a is b or (isinstance(a, str) and a == b) for a, b in zip(_fields(left), _fields(right)))
+
+def test_parallel_matches_sequential():
+    for name in ("query_const.lean", "history.txt"):
+        path = os.path.join(ROOT, name)
+        sequential = parse_file(path, jobs=1)
+        parallel = parse_file(path, jobs=2, chunksize=16)
+        assert len(parallel) == len(sequential) > 100
+        for left, right in zip(sequential, parallel):
+            assert (left.start, left.end, left.code) == (right.start, right.end, right.code)
+            assert _same(left.item, right.item)
+
+def test_spans():
+    lines = [
+        "axiom a : Prop\n",
+        "\n",
+        "theorem t : (p : Prop) -> p -> p :=\n",
+        "  -- 注释\n",
+        "  fun (p : Prop) => fun (h : p) => h\n",
+        "#print t\n",
+        "axiom b : Prop ->\n",
+    ]
+    parsed = parse_lines(lines, lean=True, jobs=1)
+    assert [(unit.start, unit.end) for unit in parsed] == [(1, 1), (3, 5), (7, 7)]
+    assert isinstance(parsed[0].item, TypeDef) and isinstance(parsed[1].item, ThmDef)
+    assert parsed[2].item.startswith("line 7, column 18:")
+
+def test_chunk_encoding():
+    units = [(1, "def f : (x : Sort(0)) -> x"), (2, "  f (f Sort(0))"), (3, "  .giveup"), (4, "f (")]
+    message = _parse_chunk(units, False)
+    # 传回主进程的是二进制格式的节点和整数编号
+    data, encoded = message
+    assert isinstance(data, bytes)
+    assert [kind for kind, _, _, _ in encoded] == [_TYPEDEF, _EXPR, _ERROR, _ERROR]
+    items = _decode(message)
+    assert isinstance(items[0], TypeDef) and items[0].name == "f"
+    assert items[2] == ".giveup" and isinstance(items[3], str)
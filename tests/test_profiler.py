@@ -0,0 +1,38 @@
+from lean4_lambda_calculator.profiler import Profiler, profiler, profile
+
+@profile
+def _fib(n: int) -> int:
+    return n if n < 2 else _fib(n - 1) + _fib(n - 2)
+
+def test_profiler_disabled():
+    profiler.disable()
+    profiler.reset()
+    assert _fib(10) == 55
+    assert profiler.stats == {}
+
+def test_profiler_counts():
+    profiler.reset()
+    profiler.enable()
+    try:
+        assert _fib(10) == 55
+        profiler.count("hits", 2)
+    finally:
+        profiler.disable()
+    stats = profiler.stats["_fib"]
+    assert stats.calls == 177
+    assert stats.sampled_calls == 177
+    # 递归调用只在最外层计入累计时间
+    assert 0 < stats.self_time <= stats.cumulative_time * 1.01
+    assert profiler.counters == {"hits": 2}
+    assert "_fib" in profiler.report()
+    profiler.reset()
+
+def test_profiler_sampling():
+    local = Profiler()
+    local.enable(sample_rate=4)
+    def leaf():
+        return 1
+    for _ in range(8):
+        local.call("leaf", leaf, (), {})
+    assert local.stats["leaf"].calls == 8
+    assert local.stats["leaf"].sampled_calls == 2
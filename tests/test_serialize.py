@@ -0,0 +1,96 @@
+import io
+import os
+import random
+import pytest
+from lean4_lambda_calculator.serialize import ExprWriter, ExprReader, dumps, loads, save_pools, load_pools
+from lean4_lambda_calculator.batch import check_file
+from lean4_lambda_calculator.expr import Sort, Const, BoundVar, Arg, Forall, Lambda, App
+from lean4_lambda_calculator.level import Level, SuccLevel, MaxLevel, IMaxLevel
+
+HISTORY = os.path.join(os.path.dirname(__file__), "..", "history.txt")
+
+NAMES = [None, "x", "h₁", "α", "a'"]
+
+def _random_level(rng: random.Random, depth: int = 2):
+    choice = rng.randrange(5 if depth > 0 else 2)
+    if choice == 0:
+        return Level(rng.randrange(3))
+    if choice == 1:
+        return Level(rng.choice(["u", "v", "u_1"]))
+    if choice == 2:
+        return SuccLevel(_random_level(rng, depth - 1))
+    if choice == 3:
+        return MaxLevel(_random_level(rng, depth - 1), _random_level(rng, depth - 1))
+    return IMaxLevel(_random_level(rng, depth - 1), _random_level(rng, depth - 1))
+
+def _random_expr(rng: random.Random, depth: int, pool: list):
+    # pool 中的子项会被重复使用, 产生共享
+    if pool and rng.random() < 0.2:
+        return rng.choice(pool)
+    choice = rng.randrange(6 if depth > 0 else 3)
+    if choice == 0:
+        expr = Sort(_random_level(rng))
+    elif choice == 1:
+        expr = Const(rng.choice(["f", "Eq", "Nat.succ", "«weird name»"]))
+    elif choice == 2:
+        expr = BoundVar(rng.randrange(4), rng.choice(NAMES))
+    elif choice == 3:
+        expr = App(_random_expr(rng, depth - 1, pool), _random_expr(rng, depth - 1, pool))
+    else:
+        binder = Forall if choice == 4 else Lambda
+        expr = binder(Arg(_random_expr(rng, depth - 1, pool), rng.choice(NAMES)), _random_expr(rng, depth - 1, pool))
+    pool.append(expr)
+    return expr
+
+def test_roundtrip_property():
+    for seed in range(300):
+        rng = random.Random(seed)
+        pool = []
+        exprs = [_random_expr(rng, rng.randrange(1, 7), pool) for _ in range(rng.randrange(1, 5))]
+        # 节点经过 hash-consing, 结构和名字都相同时是同一个对象
+        assert all(a is b for a, b in zip(loads(dumps(exprs)), exprs)), seed
+
+def test_streaming():
+    shared = Forall(Arg(Sort("u"), "α"), App(Const("f"), BoundVar(0, "α")))
+    stream = io.BytesIO()
+    writer = ExprWriter(stream)
+    writer.write_entry("a", shared)
+    writer.flush()
+    first = stream.tell()
+    writer.write_entry("b", App(shared, shared))
+    writer.flush()
+    # 第二次只写出新的节点和条目, 共享的子项用编号引用之前的记录
+    assert stream.tell() - first < 20
+    writer.close()
+    stream.seek(0)
+    reader = ExprReader(stream)
+    entries = iter(reader)
+    assert next(entries) == (0, "a", shared)
+    # 读取方按段推进, 第一个条目读出时第二段还没有读取
+    assert len(reader.decoder.nodes) == 6
+    kind, key, expr = next(entries)
+    assert key == "b" and expr is App(shared, shared)
+
+def test_deep_expr():
+    expr = Const("x")
+    for i in range(50000):
+        expr = Forall(Arg(Const("A"), f"x{i % 7}"), expr)
+    assert loads(dumps([expr]))[0] is expr
+
+def test_pools(tmp_path):
+    _, type_pool, def_pool = check_file(HISTORY, jobs=1)
+    path = str(tmp_path / "pools.lexpr")
+    with open(path, "wb") as f:
+        save_pools(f, type_pool, def_pool, flush_every=16)
+    with open(path, "rb") as f:
+        loaded_types, loaded_defs = load_pools(f)
+    assert list(loaded_types) == list(type_pool) and list(loaded_defs) == list(def_pool)
+    assert all(loaded_types[name] is type_pool[name] for name in type_pool)
+    assert all(loaded_defs[name] is def_pool[name] for name in def_pool)
+
+def test_bad_input():
+    data = dumps([Const("a")])
+    with pytest.raises(ValueError):
+        loads(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        loads(data[:-1])
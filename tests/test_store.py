@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from lean4_lambda_calculator.store import DeclarationStore, checker_version
+from lean4_lambda_calculator.batch import IncrementalChecker
+from lean4_lambda_calculator.expr import Sort, Const, Arg, Forall
+
+HISTORY = os.path.join(os.path.dirname(__file__), "..", "history.txt")
+
+def test_roundtrip_and_version(tmp_path):
+    store = DeclarationStore(str(tmp_path))
+    assert store.version == checker_version()
+    value = ("f", True, None, Forall(Arg(Sort(0), "a"), Const("A")), None)
+    assert store.get("digest") is None
+    store.put("digest", value)
+    assert "digest" in store
+    loaded = store.get("digest")
+    assert loaded == value
+    # 读出的节点经过 hash-consing, 与内存中的节点是同一个对象
+    assert loaded[3] is value[3]
+    # 检查器版本不同时不会命中
+    assert DeclarationStore(str(tmp_path), version="old").get("digest") is None
+    assert store.stats() == {"hits": 1, "misses": 1, "writes": 1}
+
+def test_corrupted_entry(tmp_path):
+    store = DeclarationStore(str(tmp_path))
+    store.put("digest", ("f", True, None, Sort(0), None))
+    with open(store._file("digest"), "wb") as f:
+        f.write(b"garbage")
+    assert store.get("digest") is None
+
+def test_deep_entry(tmp_path):
+    # 编码是迭代的, 很长的 Forall 链也会被保存
+    expr = Const("x")
+    for _ in range(50000):
+        expr = Forall(Arg(Const("A")), expr)
+    store = DeclarationStore(str(tmp_path))
+    store.put("deep", ("deep", True, None, expr, None))
+    assert store.writes == 1
+    assert store.get("deep")[3] is expr
+
+def _write_all(path: str) -> int:
+    store = DeclarationStore(path)
+    for i in range(50):
+        store.put(str(i), (str(i), True, None, Sort(i), None))
+    return store.writes
+
+def test_concurrent_writers(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(_write_all, [str(tmp_path)] * 4)) == [50] * 4
+    store = DeclarationStore(str(tmp_path))
+    assert all(store.get(str(i)) == (str(i), True, None, Sort(i), None) for i in range(50))
+    # 临时文件都已经被替换或删除
+    assert not any(name.startswith(".tmp-") for _, _, names in os.walk(tmp_path) for name in names)
+
+def test_checker_uses_store(tmp_path):
+    with open(HISTORY) as f:
+        lines = f.readlines()
+    first = IncrementalChecker(store=DeclarationStore(str(tmp_path)))
+    results, type_pool, def_pool = first.check(lines)
+    # 新的进程 (新的 checker) 从磁盘读取所有结果
+    second = IncrementalChecker(store=DeclarationStore(str(tmp_path)))
+    loaded, loaded_type_pool, loaded_def_pool = second.check(lines)
+    assert second.reused == len(results)
+    assert [(r.line, r.ok, r.error) for r in loaded] == [(r.line, r.ok, r.error) for r in results]
+    assert dict(loaded_type_pool) == dict(type_pool)
+    assert dict(loaded_def_pool) == dict(def_pool)
@@ -0,0 +1,107 @@
+import sys
+import pytest
+from lean4_lambda_calculator.traversal import walk, fold, replace, run, dag_size, tree_size
+from lean4_lambda_calculator.calculator import calc, infer_type, shift_expr, unshift_expr, instantiate_expr
+from lean4_lambda_calculator.expr import Const, Sort, Arg, Forall, Lambda, App, BoundVar, BOUNDVAR, CONST, Level, print_expr_by_name, print_expr_by_index, expr_clean_all_names, set_boundvar_name, const_to_boundvar, expr_todef, expr_rename_level
+
+A = Const("A")
+type_pool = {
+    "A": Sort(1),
+    "a": A,
+    "f": Forall(Arg(A), Forall(Arg(A), Sort(0))),
+}
+
+# 远大于默认递归上限的深度
+DEPTH = sys.getrecursionlimit() * 10
+
+def telescope(n: int):
+    body = App(App(Const("f"), BoundVar(0)), BoundVar(n - 1))
+    for index in range(n - 1, -1, -1):
+        body = Forall(Arg(A, f"x{index}"), body)
+    return body
+
+def test_walk_fold_replace():
+    expr = Lambda(Arg(A, "x"), App(App(Const("f"), BoundVar(0)), Const("a")))
+    assert [node.label for node in walk(expr) if node.tag == CONST] == ["A", "f", "a"]
+    # fold 的 binders 中下标 i 的 BoundVar 对应 binders[-1 - i]
+    used = []
+    fold(expr, lambda node, results, binders: used.append(binders[-1 - node.index].name) if node.tag == BOUNDVAR else None)
+    assert used == ["x"]
+    replaced = replace(expr, lambda node, depth: BoundVar(depth) if node.tag == CONST and node.label == "a" else None)
+    assert print_expr_by_index(replaced) == "A => f #0 #1"
+    # 没有变化时返回原节点
+    assert replace(expr, lambda node, depth: None) is expr
+
+def test_run_propagates_errors():
+    def task(n):
+        if n == 0:
+            raise ValueError("bottom")
+        try:
+            return (yield task(n - 1)) + 1
+        except KeyError:
+            return -1
+
+    def count(n):
+        if n == 0:
+            return 0
+        return (yield count(n - 1)) + 1
+
+    assert run(count(DEPTH)) == DEPTH
+    with pytest.raises(ValueError):
+        run(task(DEPTH))
+
+def test_deep_walkers():
+    expr = telescope(DEPTH)
+    text = print_expr_by_name(expr)
+    assert text.startswith("(x0 : A) -> (x1 : A) -> ") and text.endswith(f"f x{DEPTH - 1} x0")
+    assert print_expr_by_index(expr).endswith(f"f #0 #{DEPTH - 1}")
+    # 名字不同的深层项结构相等
+    assert expr == expr_clean_all_names(expr)
+    assert repr(expr).startswith("(x0 : A) -> ")
+    assert shift_expr(App(expr.body, BoundVar(0))).arg == BoundVar(1)
+
+def test_deep_parser_walkers():
+    body = App(App(Const("f"), Const("x0")), BoundVar(0, "y"))
+    for index in range(DEPTH - 1, -1, -1):
+        body = Forall(Arg(A, f"x{index}"), body)
+    expr = set_boundvar_name(const_to_boundvar(body, []))
+    assert print_expr_by_index(expr).endswith(f"f #{DEPTH - 1} #0")
+    inner = expr
+    while inner.tag != App.tag:
+        last = inner
+        inner = inner.body
+    assert last.var_type.name == "y"
+
+def test_deep_calc_and_infer():
+    expr = telescope(DEPTH)
+    _, expr_type = calc(expr, None, type_pool, {})
+    assert expr_type == Sort(0)
+    assert infer_type(expr, None, type_pool, {}) == Sort(0)
+    spine = Const("g")
+    g_type = A
+    for _ in range(DEPTH):
+        spine = App(spine, Const("a"))
+        g_type = Forall(Arg(A), g_type)
+    pool = dict(type_pool, g=g_type)
+    assert calc(spine, None, pool, {})[1] == A
+    assert infer_type(spine, None, pool, {}) == A
+
+def test_dag_sharing():
+    # t(k+1) = f t(k) t(k): 展开成树后有 2^k 个 t(0)
+    expr = BoundVar(0)
+    for _ in range(200):
+        expr = App(App(Const("f"), expr), expr)
+    # 先算出整数再断言, 避免断言失败时打印指数大小的项
+    size = dag_size(expr)
+    assert size == 2 * 200 + 2
+    # T(k+1) = 2 T(k) + 3
+    assert tree_size(expr) == 4 * 2 ** 200 - 3
+    closed = instantiate_expr(expr, [Sort(Level("u"))])
+    sizes = [
+        dag_size(shift_expr(expr)),
+        dag_size(unshift_expr(expr, 0, Const("a"))),
+        dag_size(closed),
+        dag_size(expr_todef(closed, {"f": Const("g")})),
+        dag_size(expr_rename_level(closed, {"u"})[0]),
+    ]
+    assert sizes == [size] * len(sizes)